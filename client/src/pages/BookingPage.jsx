@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { sessionsAPI } from '../services/api';
+import { listingsAPI, sessionsAPI } from '../services/api';
 
 function BookingPage() {
   const { user } = useAuth();
@@ -23,12 +23,10 @@ function BookingPage() {
 
   const fetchListing = async () => {
     try {
-      const response = await fetch(`${import.meta.env.VITE_API_URL || 'https://skillswap-production-0e78.up.railway.app'}/api/listings`);
-      const data = await response.json();
+      const response = await listingsAPI.getById(parseInt(listingId));
       
-      if (response.ok && data.listings) {
-        const foundListing = data.listings.find(l => l.id === parseInt(listingId));
-        setListing(foundListing);
+      if (response.data && response.data.listing) {
+        setListing(response.data.listing);
       } else {
         setListing(null);
       }
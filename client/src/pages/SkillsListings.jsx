@@ -1,11 +1,13 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { listingsAPI, skillsAPI } from '../services/api';
+import { listingsAPI, skillsAPI, batchAPI } from '../services/api';
 
 function SkillsListings() {
   const { user } = useAuth();
   const [listings, setListings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [skills, setSkills] = useState([]);
   const [showForm, setShowForm] = useState(false);
   const [loading, setLoading] = useState(true);
@@ -18,37 +20,69 @@ function SkillsListings() {
   });
 
   useEffect(() => {
-    fetchListings();
-    fetchSkills();
+    fetchPage();
   }, []);
 
+  // Listings and the skill dropdown in one round trip
+  const fetchPage = async () => {
+    try {
+      const response = await batchAPI.send([
+        { method: 'GET', path: '/api/listings' },
+        { method: 'GET', path: '/api/skills?limit=200' },
+      ]);
+      const [listingsResult, skillsResult] = response.data.results;
+      if (listingsResult.status === 200) {
+        setListings(listingsResult.body.listings || []);
+        setNextCursor(listingsResult.body.next_cursor || null);
+      } else {
+        console.error('Error fetching listings:', listingsResult.error);
+      }
+      if (skillsResult.status === 200) {
+        setSkills(await skillsAPI.getEvery(skillsResult.body));
+      } else {
+        console.error('Error fetching skills:', skillsResult.error);
+      }
+    } catch (error) {
+      console.error('Error loading page:', error);
+      setListings([]);
+      setNextCursor(null);
+      setSkills([]);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const fetchListings = async () => {
     try {
       const response = await listingsAPI.getAll();
       if (response.data && response.data.listings) {
         setListings(response.data.listings);
+        setNextCursor(response.data.next_cursor || null);
       } else {
         setListings([]);
+        setNextCursor(null);
       }
       setLoading(false);
     } catch (error) {
       console.error('Error fetching listings:', error);
       setListings([]);
+      setNextCursor(null);
       setLoading(false);
     }
   };
 
-  const fetchSkills = async () => {
+  // The API returns one page at a time; follow next_cursor for the rest
+  const loadMoreListings = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
     try {
-      const response = await skillsAPI.getAll();
-      if (response.data && response.data.skills) {
-        setSkills(response.data.skills);
-      } else {
-        setSkills([]);
-      }
+      const response = await listingsAPI.getAll({ cursor: nextCursor });
+      setListings(prev => [...prev, ...(response.data.listings || [])]);
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
-      console.error('Error fetching skills:', error);
-      setSkills([]);
+      console.error('Error loading more listings:', error);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
@@ -294,6 +328,18 @@ function SkillsListings() {
           ))}
         </div>
 
+        {nextCursor && (
+          <div className="text-center mt-8">
+            <button
+              onClick={loadMoreListings}
+              disabled={loadingMore}
+              className="bg-gray-800 hover:bg-gray-700 text-white px-6 py-3 rounded-lg disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
+
         {listings.length === 0 && (
           <div className="text-center py-16">
             <h3 className="text-2xl font-bold text-white mb-2">No listings yet</h3>
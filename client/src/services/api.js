@@ -54,7 +54,7 @@ export const authAPI = {
 };
 
 export const listingsAPI = {
-  getAll: () => api.get('/api/listings'),
+  getAll: (params) => api.get('/api/listings', { params }),
   getById: (id) => api.get(`/api/listings/${id}`),
   create: (listingData) => api.post('/api/listings', formatListingData(listingData)),
   update: (id, listingData) => api.put(`/api/listings/${id}`, formatListingData(listingData)),
@@ -63,13 +63,28 @@ export const listingsAPI = {
 };
 
 export const skillsAPI = {
-  getAll: () => api.get('/api/skills'),
+  getAll: (params) => api.get('/api/skills', { params }),
+  // Follows next_cursor so callers get every skill, not just the first page;
+  // pass a page already fetched (e.g. through batchAPI) to continue from it
+  getEvery: async (firstPage = null) => {
+    const skills = firstPage ? [...(firstPage.skills || [])] : [];
+    let cursor = firstPage ? firstPage.next_cursor || null : null;
+    if (firstPage && !cursor) return skills;
+    do {
+      const params = cursor ? { limit: 200, cursor } : { limit: 200 };
+      const response = await api.get('/api/skills', { params });
+      skills.push(...(response.data.skills || []));
+      cursor = response.data.next_cursor || null;
+    } while (cursor);
+    return skills;
+  },
 };
 
 export const sessionsAPI = {
   getAll: () => api.get('/api/sessions'),
   create: (sessionData) => api.post('/api/sessions', formatSessionData(sessionData)),
   getMySessions: () => api.get('/api/sessions/my-sessions'),
+  getCalendar: (params) => api.get('/api/sessions/calendar', { params }),
 };
 
 export const reviewsAPI = {
@@ -85,4 +100,9 @@ export const usersAPI = {
   getExperts: () => api.get('/api/users/experts'),
 };
 
+export const batchAPI = {
+  // [{ method, path, body }] in one round trip; results come back in request order
+  send: (requests) => api.post('/api/batch', { items: requests }),
+};
+
 export default api;
\ No newline at end of file
@@ -1,28 +1,101 @@
+import os
+import weakref
 from flask import Flask, jsonify
 from flask_cors import CORS
+from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
-from config import Config
+from config import Config, engine_options, replica_binds
 from database import db
+from cache import response_cache
+from instrumentation import query_instrumentation
+from metrics import metrics
+from recommendations import recommendation_index
+from replicas import replica_router
+from sqlite_mode import sqlite_mode
+from serializers import FastJSONProvider
+from compression import compression
+from multiplex import multiplexer
 from models import User
+from routes import auth_bp, skills_bp, listings_bp, sessions_bp, reviews_bp, users_bp, batch_bp
 from datetime import timedelta
 
-app = Flask(__name__)
-app.config.from_object(Config)
+jwt = JWTManager()
+migrate = Migrate()
 
-# CORS Configuration - THIS IS CRITICAL
-CORS(app, 
-     resources={r"/api/*": {"origins": "*"}},
-     supports_credentials=True,
-     allow_headers=["Content-Type", "Authorization"],
-     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
+# Every app built in this process, so forked children can drop their pools
+_apps = weakref.WeakSet()
 
-# Or for production, be more specific:
-# CORS(app, 
-#      resources={r"/api/*": {"origins": "https://skillswap-app.netlify.app"}},
-#      supports_credentials=True,
-#      allow_headers=["Content-Type", "Authorization"],
-#      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
-jwt = JWTManager(app)
+def _dispose_engines_after_fork():
+    # Pooled connections opened before the fork (e.g. by gunicorn --preload or
+    # a one-off query at import) share sockets with the parent; forget them
+    # without closing so the parent's connections stay usable
+    for app in list(_apps):
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
 
-# Rest of your app code...
\ No newline at end of file
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+
+def create_app(config=None):
+    """Build the application.
+
+    ``config`` is a config object or a dict of overrides on top of
+    :class:`Config`. Engine options default to the pool settings for the
+    configured database dialect unless ``SQLALCHEMY_ENGINE_OPTIONS`` is given.
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    app.config.setdefault('SQLALCHEMY_BINDS', replica_binds(app.config))
+
+    # CORS Configuration - THIS IS CRITICAL
+    CORS(app,
+         resources={r"/api/*": {"origins": "*"}},
+         supports_credentials=True,
+         allow_headers=["Content-Type", "Authorization"],
+         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
+
+    # Or for production, be more specific:
+    # CORS(app,
+    #      resources={r"/api/*": {"origins": "https://skillswap-app.netlify.app"}},
+    #      supports_credentials=True,
+    #      allow_headers=["Content-Type", "Authorization"],
+    #      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
+
+    jwt.init_app(app)
+
+    db.init_app(app)
+    replica_router.init_app(app)
+    sqlite_mode.init_app(app, db)
+    migrate.init_app(app, db)
+    response_cache.init_app(app, db)
+    query_instrumentation.init_app(app)
+    metrics.init_app(app, db)
+    recommendation_index.init_app(app)
+    compression.init_app(app)
+    multiplexer.init_app(app)
+
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(skills_bp, url_prefix='/api/skills')
+    app.register_blueprint(listings_bp, url_prefix='/api/listings')
+    app.register_blueprint(sessions_bp, url_prefix='/api/sessions')
+    app.register_blueprint(reviews_bp, url_prefix='/api/reviews')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+
+    _apps.add(app)
+    return app
+
+
+app = create_app()
+
+# Rest of your app code...
@@ -0,0 +1,64 @@
+from flask import request, jsonify
+
+MAX_BATCH_SIZE = 100
+
+
+class BatchError(ValueError):
+    pass
+
+
+def get_batch_items():
+    """The ``items`` list of a batch request body (a bare list also works)."""
+    data = request.get_json(silent=True)
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise BatchError('items must be a non-empty list')
+    if len(items) > MAX_BATCH_SIZE:
+        raise BatchError(f'A batch can contain at most {MAX_BATCH_SIZE} items')
+    if not all(isinstance(item, dict) for item in items):
+        raise BatchError('Every item must be an object')
+    return items
+
+
+def coerce_id(value):
+    """An id as the single-item endpoints accept it (an int or a numeric
+    string) as an int, or None when it can't be one."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+class BatchResults:
+    """Per-item outcomes, reported in request order.
+
+    Items are validated up front; the ones that pass are written together in
+    one transaction and the rest carry the error the single-item endpoint
+    would have returned.
+    """
+
+    def __init__(self, size):
+        self.results = [None] * size
+
+    def fail(self, index, error, status=400):
+        self.results[index] = {'index': index, 'status': status, 'error': error}
+
+    def ok(self, index, status=201, **fields):
+        self.results[index] = dict({'index': index, 'status': status}, **fields)
+
+    def failed(self, index):
+        return self.results[index] is not None and 'error' in self.results[index]
+
+    def response(self):
+        succeeded = sum(1 for result in self.results if 'error' not in result)
+        body = {
+            'results': self.results,
+            'succeeded': succeeded,
+            'failed': len(self.results) - succeeded
+        }
+        if succeeded < len(self.results):
+            return jsonify(body), 207
+        return jsonify(body), 201 if any(result['status'] == 201 for result in self.results) else 200
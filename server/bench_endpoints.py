@@ -0,0 +1,320 @@
+import sys
+import os
+import re
+import json
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, 'bench_baselines.json')
+
+# users, listings, sessions, reviews
+SCALES = {
+    'small': (200, 300, 600, 300),
+    'medium': (2000, 3000, 6000, 3000),
+    'large': (20000, 30000, 60000, 30000),
+}
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def endpoints(ctx):
+    """(blueprint, name, method, path, json body, needs auth, iterations weight)"""
+    booking_start = datetime(2030, 1, 1)
+    return [
+        ('auth', 'login', 'POST', '/api/auth/login',
+         lambda i: {'email': ctx['email'], 'password': ctx['password']}, False, 0.1),
+        ('auth', 'profile', 'GET', '/api/auth/profile', None, True, 1),
+        ('listings', 'listings', 'GET', '/api/listings', None, False, 1),
+        ('listings', 'listings_filtered', 'GET', '/api/listings?category=Technology&max_price=500', None, False, 1),
+        ('listings', 'listings_search', 'GET', '/api/listings/search?q=python', None, False, 1),
+        ('skills', 'skills', 'GET', '/api/skills', None, False, 1),
+        ('reviews', 'reviews', 'GET', '/api/reviews', None, False, 1),
+        ('reviews', 'session_reviews', 'GET', f'/api/reviews/session/{ctx["session_id"]}', None, False, 1),
+        ('users', 'user_profile', 'GET', f'/api/users/{ctx["teacher_id"]}', None, False, 1),
+        ('users', 'experts', 'GET', '/api/users/experts', None, False, 1),
+        ('users', 'recommendations', 'GET', f'/api/users/{ctx["student_id"]}/recommendations', None, True, 1),
+        ('sessions', 'sessions', 'GET', '/api/sessions', None, True, 1),
+        ('sessions', 'calendar', 'GET',
+         f'/api/sessions/calendar?from={ctx["calendar_from"]}&to={ctx["calendar_to"]}', None, True, 1),
+        ('sessions', 'availability', 'GET', f'/api/sessions/availability?teacher_id={ctx["teacher_id"]}', None, True, 1),
+        # Writes last so they don't change what the reads above see
+        ('sessions', 'book_session', 'POST', '/api/sessions',
+         lambda i: {
+             'listing_id': ctx['listing_id'],
+             'scheduled_date': (booking_start + timedelta(hours=9 * i)).isoformat(),
+             'duration_hours': 1.0
+         }, True, 1),
+    ]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark every blueprint at several data scales.')
+    parser.add_argument('--scales', default='small,medium', help=f'Comma separated presets: {", ".join(SCALES)}')
+    parser.add_argument('--requests', type=int, default=100, help='Requests per endpoint (login uses a tenth)')
+    parser.add_argument('--gunicorn', action='store_true', help='Run against a local gunicorn instead of the test client')
+    parser.add_argument('--gunicorn-workers', type=int, default=2)
+    parser.add_argument('--with-cache', action='store_true', help='Leave the response cache on')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Write results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='Fail if results regress against the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed p50 slowdown ratio; p95 is allowed twice this (default 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Ignore slowdowns smaller than this')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per endpoint before measuring')
+    parser.add_argument('--output', help='Also write results to this JSON file')
+    return parser.parse_args()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, queries, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries': max(queries) if queries and None not in queries else None,
+    }
+
+
+class TestClientRunner:
+    def __init__(self, app, engine):
+        from sqlalchemy import event
+
+        self.client = app.test_client()
+        self.query_count = 0
+
+        def count(*args):
+            self.query_count += 1
+        event.listen(engine, 'before_cursor_execute', count)
+
+    def request(self, method, path, body, headers):
+        self.query_count = 0
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True), self.query_count
+
+    def close(self):
+        pass
+
+
+class GunicornRunner:
+    def __init__(self, database_url, workers, extra_env=None):
+        import requests
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        env = dict(os.environ, DATABASE_URL=database_url, SQL_INSTRUMENTATION_ENABLED='true',
+                   RESPONSE_CACHE_ENABLED=os.environ.get('RESPONSE_CACHE_ENABLED', 'false'))
+        env.update(extra_env or {})
+        self.process = subprocess.Popen(
+            ['gunicorn', 'app:app', '-w', str(workers), '-b', f'127.0.0.1:{self.port}', '--log-level', 'error'],
+            cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.session = requests.Session()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        deadline = time.time() + 30
+        while True:
+            try:
+                self.session.get(self.base_url + '/api/skills?limit=1', timeout=5)
+                break
+            except (requests.ConnectionError, requests.Timeout):
+                if time.time() > deadline or self.process.poll() is not None:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.2)
+
+    def request(self, method, path, body, headers):
+        response = self.session.request(method, self.base_url + path, json=body, headers=headers)
+        match = SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        return response.status_code, payload, int(match.group(1)) if match else None
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def context_for(db):
+    from models import Listing, Session
+    from scheduling import MAX_CALENDAR_DAYS
+
+    listing = Listing.query.order_by(Listing.id).first()
+    session = Session.query.order_by(Session.id).first()
+    student = Session.query.filter(Session.student_id != listing.user_id).first().student
+    # The widest calendar window that starts at the student's first session,
+    # so the calendar benchmark pages through real rows
+    first = db.session.query(db.func.min(Session.scheduled_date)).filter(
+        (Session.student_id == student.id) | (Session.teacher_id == student.id)
+    ).scalar().replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        'calendar_from': first.date().isoformat(),
+        'calendar_to': (first + timedelta(days=MAX_CALENDAR_DAYS)).date().isoformat(),
+        'teacher_id': listing.user_id,
+        'listing_id': listing.id,
+        'session_id': session.id,
+        'student_id': student.id,
+        'email': student.email,
+        'password': 'password123',
+    }
+
+
+def run_scale(runner, ctx, requests_per_endpoint, warmup):
+    status, payload, _ = runner.request('POST', '/api/auth/login', {'email': ctx['email'], 'password': ctx['password']}, {})
+    if status != 200:
+        raise RuntimeError(f'Login failed with {status}: {payload}')
+    auth = {'Authorization': f'Bearer {payload["access_token"]}'}
+
+    results = {}
+    for blueprint, name, method, path, body, needs_auth, weight in endpoints(ctx):
+        iterations = max(3, int(requests_per_endpoint * weight))
+        # Writes aren't warmed up so every booking lands in a fresh slot
+        if method == 'GET':
+            for _ in range(warmup):
+                runner.request(method, path, None, auth if needs_auth else {})
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for i in range(iterations):
+            request_started = time.perf_counter()
+            status, _, query_count = runner.request(method, path, body(i) if body else None,
+                                                    auth if needs_auth else {})
+            latencies.append(time.perf_counter() - request_started)
+            queries.append(query_count)
+            if status >= 400:
+                errors += 1
+        elapsed = time.perf_counter() - started
+        results[f'{blueprint}.{name}'] = dict(summarize(latencies, queries, elapsed), errors=errors)
+        row = results[f'{blueprint}.{name}']
+        print(f'  {blueprint + "." + name:<28} {row["rps"]:>8.1f} {row["p50_ms"]:>8.2f} {row["p95_ms"]:>8.2f} '
+              f'{row["p99_ms"]:>8.2f} {str(row["queries"]):>7} {errors:>6}')
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    regressions = []
+    for scale, endpoints_results in results.items():
+        for endpoint, current in endpoints_results.items():
+            previous = baseline.get('results', {}).get(scale, {}).get(endpoint)
+            if previous is None:
+                continue
+            if current['queries'] is not None and previous.get('queries') is not None \
+                    and current['queries'] > previous['queries']:
+                regressions.append(f'{scale} {endpoint}: queries {previous["queries"]} -> {current["queries"]}')
+            # Tails are noisier than medians, so p95 gets twice the allowance
+            for key, allowance in (('p50_ms', threshold), ('p95_ms', threshold * 2)):
+                if current[key] > previous[key] * (1 + allowance) and current[key] - previous[key] > min_delta_ms:
+                    regressions.append(f'{scale} {endpoint}: {key[:3]} {previous[key]}ms -> {current[key]}ms')
+            if current['errors'] > previous.get('errors', 0):
+                regressions.append(f'{scale} {endpoint}: errors {previous.get("errors", 0)} -> {current["errors"]}')
+    return regressions
+
+
+def main():
+    args = parse_args()
+    scales = [scale.strip() for scale in args.scales.split(',') if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        print(f'❌ Unknown scales: {", ".join(unknown)}')
+        return 2
+
+    scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    scratch.close()
+    database_url = f'sqlite:///{scratch.name}'
+    os.environ['DATABASE_URL'] = database_url
+
+    from app import app
+    from cache import response_cache
+    from database import db
+    from seed import generate_dataset
+
+    if not args.with_cache:
+        response_cache.enabled = False
+        os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+    else:
+        os.environ['RESPONSE_CACHE_ENABLED'] = 'true'
+
+    results = {}
+    try:
+        for scale in scales:
+            users, listings, sessions, reviews = SCALES[scale]
+            print(f'\n📦 Scale {scale}: {users} users, {listings} listings, {sessions} sessions, {reviews} reviews')
+            generate_dataset(users, listings, sessions, reviews, seed=42)
+            with app.app_context():
+                ctx = context_for(db)
+                engine = db.engine
+
+            if args.gunicorn:
+                runner = GunicornRunner(database_url, args.gunicorn_workers)
+            else:
+                runner = TestClientRunner(app, engine)
+            print(f'  {"endpoint":<28} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>7} {"errors":>6}')
+            try:
+                results[scale] = run_scale(runner, ctx, args.requests, args.warmup)
+            finally:
+                runner.close()
+    finally:
+        os.unlink(scratch.name)
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'mode': 'gunicorn' if args.gunicorn else 'test_client',
+        'python': platform.python_version(),
+        'requests_per_endpoint': args.requests,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    status = 0
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f'\n❌ No baseline at {args.baseline}; run with --save-baseline first')
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f).get(report['mode'])
+        if baseline is None:
+            print(f'\n❌ No {report["mode"]} baseline in {args.baseline}; run with --save-baseline first')
+            return 1
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print('\n💥 Regressions against baseline:')
+            for regression in regressions:
+                print(f'  {regression}')
+            status = 1
+        else:
+            print('\n🎉 No regressions against baseline')
+
+    if args.save_baseline:
+        # One baseline per mode; in-process and gunicorn timings aren't comparable
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baselines = json.load(f)
+        baselines[report['mode']] = report
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\n💾 Baseline saved to {args.baseline}')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
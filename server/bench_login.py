@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure login throughput against the password hashing pool size.')
+    parser.add_argument('--workers', default='0,1,2,4', help='Comma separated PASSWORD_HASH_WORKERS values (0 hashes inline)')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent request threads')
+    parser.add_argument('--logins', type=int, default=64, help='Logins per run')
+    parser.add_argument('--rounds', type=int, default=12, help='BCRYPT_LOG_ROUNDS')
+    parser.add_argument('--queue-depth', type=int, default=16, help='PASSWORD_HASH_QUEUE_DEPTH')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    scratch.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch.name}'
+
+    import passwords
+    from app import app
+    from database import db
+    from models import User
+
+    app.config['BCRYPT_LOG_ROUNDS'] = args.rounds
+    app.config['PASSWORD_HASH_QUEUE_DEPTH'] = args.queue_depth
+    app.config['PASSWORD_HASH_WORKERS'] = 0
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@example.com', bio='')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        password_hash = user.password_hash
+
+    def login(_):
+        with app.test_client() as client:
+            response = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'password123'})
+            return response.status_code
+
+    print(f'🔐 bcrypt rounds={args.rounds}, clients={args.clients}, logins={args.logins}, queue depth={args.queue_depth}')
+    print(f'{"workers":>8} {"logins/s":>10} {"ok":>5} {"503":>5} {"seconds":>8}')
+    try:
+        for workers in [int(w) for w in args.workers.split(',')]:
+            passwords.shutdown()
+            app.config['PASSWORD_HASH_WORKERS'] = workers
+            if workers > 0:
+                # Start the pool's processes before timing
+                with app.app_context():
+                    passwords.check_password(password_hash, 'warmup')
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.clients) as executor:
+                statuses = list(executor.map(login, range(args.logins)))
+            elapsed = time.perf_counter() - started
+
+            ok = statuses.count(200)
+            rejected = statuses.count(503)
+            print(f'{workers:>8} {ok / elapsed:>10.1f} {ok:>5} {rejected:>5} {elapsed:>8.2f}')
+    finally:
+        passwords.shutdown()
+        os.unlink(scratch.name)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_endpoints import SCALES
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare encode time and payload size of the response encoders.')
+    parser.add_argument('--scale', default='medium', choices=sorted(SCALES), help='Dataset preset')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per collection')
+    parser.add_argument('--repeat', type=int, default=20, help='Encodes per encoder; the median is reported')
+    return parser.parse_args()
+
+
+def median_seconds(encode, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = encode()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2], len(body)
+
+
+def encoders(app, schema, names):
+    """(name, function from rows to the encoded body) for every encoder."""
+    import msgpack
+    from flask.json.provider import DefaultJSONProvider
+    from serializers import encode_default
+
+    stdlib = DefaultJSONProvider(app)
+
+    def field_by_field(row):
+        # What Schema.dump did before encoders were compiled
+        return {name: schema.fields[name].value(row) for name in names}
+
+    compiled = schema.encoder(names)
+    return [
+        ('per-field dict + stdlib json', lambda rows: stdlib.dumps([field_by_field(row) for row in rows],
+                                                                   separators=(',', ':')).encode('utf-8')),
+        ('compiled + stdlib json', lambda rows: json.dumps([compiled(row) for row in rows], default=encode_default,
+                                                           separators=(',', ':')).encode('utf-8')),
+        ('compiled + orjson', lambda rows: app.json.dumps([compiled(row) for row in rows]).encode('utf-8')),
+        ('compiled + msgpack', lambda rows: msgpack.packb([compiled(row) for row in rows], default=encode_default)),
+    ]
+
+
+def main():
+    args = parse_args()
+    scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    scratch.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch.name}'
+
+    from app import app
+    from schemas import listing_schema, review_schema, calendar_schema
+    from seed import generate_dataset
+
+    users, listings, sessions, reviews = SCALES[args.scale]
+    print(f'📦 Scale {args.scale}: {users} users, {listings} listings, {sessions} sessions, {reviews} reviews')
+    try:
+        generate_dataset(users, listings, sessions, reviews, seed=42)
+        print(f'{"collection":<10} {"encoder":<30} {"ms":>8} {"bytes":>10} {"vs baseline":>12}')
+        with app.app_context():
+            for collection, schema in (('listings', listing_schema), ('reviews', review_schema),
+                                       ('sessions', calendar_schema)):
+                names = tuple(schema.fields)
+                rows = schema.query(names).order_by(*schema.order_by()).limit(args.rows).all()
+                baseline = None
+                for name, encode in encoders(app, schema, names):
+                    seconds, size = median_seconds(lambda: encode(rows), args.repeat)
+                    baseline = baseline or seconds
+                    print(f'{collection:<10} {name:<30} {seconds * 1000:>8.2f} {size:>10} {baseline / seconds:>11.1f}x')
+    finally:
+        os.unlink(scratch.name)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
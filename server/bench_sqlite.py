@@ -0,0 +1,207 @@
+import sys
+import os
+import time
+import random
+import sqlite3
+import argparse
+import itertools
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_endpoints import SCALES, GunicornRunner, percentile
+
+READ_PATHS = ('/api/listings', '/api/skills', '/api/reviews', '/api/listings/search?q=python')
+
+# Legacy is SQLite as it was deployed before: rollback journal, default
+# pragmas and writers racing for the lock
+MODES = {
+    'legacy': {'SQLITE_TUNING_ENABLED': 'false'},
+    'tuned': {'SQLITE_TUNING_ENABLED': 'true'},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Read throughput across gunicorn workers while bookings and reviews are written.')
+    parser.add_argument('--scale', default='small', choices=sorted(SCALES), help='Dataset preset')
+    parser.add_argument('--workers', default='1,2,4', help='Comma separated gunicorn worker counts')
+    parser.add_argument('--modes', default='legacy,tuned', help=f'Comma separated: {", ".join(MODES)}')
+    parser.add_argument('--readers', type=int, default=8, help='Concurrent reading clients')
+    parser.add_argument('--writers', type=int, default=4, help='Concurrent clients booking sessions and posting reviews')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per run')
+    return parser.parse_args()
+
+
+def writer_work(app, db):
+    """Tokens and targets for writes that can't conflict with each other."""
+    from flask_jwt_extended import create_access_token
+    from models import Listing, Session, Review
+
+    with app.app_context():
+        listings = [(listing_id, teacher_id) for listing_id, teacher_id in
+                    db.session.query(Listing.id, Listing.user_id).order_by(Listing.id).limit(200)]
+        reviewed = {(session_id, reviewer_id) for session_id, reviewer_id in
+                    db.session.query(Review.session_id, Review.reviewer_id)}
+        sessions = [(session_id, student_id, teacher_id) for session_id, student_id, teacher_id in
+                    db.session.query(Session.id, Session.student_id, Session.teacher_id).order_by(Session.id)
+                    if (session_id, student_id) not in reviewed]
+        user_ids = {user_id for _, user_id in listings} | {student_id for _, student_id, _ in sessions}
+        tokens = {user_id: create_access_token(identity=user_id) for user_id in user_ids}
+    students = sorted({student_id for _, student_id, _ in sessions})
+    return listings, sessions, students, tokens
+
+
+class Load:
+    def __init__(self, runner, work, teacher_id, duration):
+        self.runner = runner
+        self.listings, self.sessions, self.students, self.tokens = work
+        self.teacher_id = teacher_id
+        self.deadline = time.perf_counter() + duration
+        # Every booking gets its own slot and every review its own session,
+        # so neither is ever refused as a conflict or duplicate
+        self.slots = itertools.count()
+        self.reviews = iter(self.sessions)
+        self.lock = threading.Lock()
+        self.reads, self.writes = [], []
+        self.errors = 0
+
+    def record(self, latencies, started, status):
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            latencies.append(elapsed)
+            if status is None or status >= 500:
+                self.errors += 1
+
+    def request(self, method, path, body=None, user_id=None):
+        headers = {'Authorization': f'Bearer {self.tokens[user_id]}'} if user_id else {}
+        try:
+            status, _, _ = self.runner.request(method, path, body, headers)
+            return status
+        except Exception:
+            return None
+
+    def read(self, seed):
+        rng = random.Random(seed)
+        paths = list(READ_PATHS) + [f'/api/users/{self.teacher_id}']
+        while time.perf_counter() < self.deadline:
+            started = time.perf_counter()
+            self.record(self.reads, started, self.request('GET', rng.choice(paths)))
+
+    def write(self, seed):
+        rng = random.Random(seed)
+        start = datetime(2031, 1, 1)
+        while time.perf_counter() < self.deadline:
+            with self.lock:
+                review = next(self.reviews, None) if rng.random() < 0.5 else None
+                slot = next(self.slots)
+            started = time.perf_counter()
+            if review is not None:
+                session_id, student_id, teacher_id = review
+                status = self.request('POST', '/api/reviews', {
+                    'session_id': session_id, 'reviewee_id': teacher_id, 'rating': rng.randint(1, 5), 'comment': 'bench'
+                }, student_id)
+            else:
+                listing_id, teacher_id = rng.choice(self.listings)
+                student_id = rng.choice([s for s in self.students[:50] if s != teacher_id])
+                status = self.request('POST', '/api/sessions', {
+                    'listing_id': listing_id,
+                    'scheduled_date': (start + timedelta(hours=3 * slot)).isoformat(),
+                    'duration_hours': 1.0
+                }, student_id)
+            self.record(self.writes, started, status)
+
+
+def copy_database(source, target, journal_mode):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(target + suffix):
+            os.unlink(target + suffix)
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+        dst.execute(f'PRAGMA journal_mode={journal_mode}')
+
+
+class ThreadedRunner(GunicornRunner):
+    """GunicornRunner with one HTTP session per client thread."""
+
+    def __init__(self, *args, **kwargs):
+        self.local = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def request(self, method, path, body, headers):
+        import requests
+
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        response = self.local.session.request(method, self.base_url + path, json=body, headers=headers)
+        return response.status_code, None, None
+
+
+def run(database_path, mode, workers, work, teacher_id, args):
+    env = dict(MODES[mode], SQL_INSTRUMENTATION_ENABLED='false', RESPONSE_CACHE_ENABLED='false',
+               RECOMMENDATIONS_REFRESH_SECONDS='3600')
+    runner = ThreadedRunner(f'sqlite:///{database_path}', workers, env)
+    load = Load(runner, work, teacher_id, args.duration)
+    threads = [threading.Thread(target=load.read, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=load.write, args=(1000 + i,)) for i in range(args.writers)]
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        runner.close()
+    elapsed = time.perf_counter() - started
+
+    reads, writes = sorted(load.reads), sorted(load.writes)
+    print(f'{mode:>8} {workers:>8} {len(reads) / elapsed:>9.1f} {percentile(reads, 95) * 1000:>11.1f} '
+          f'{len(writes) / elapsed:>10.1f} {percentile(writes, 95) * 1000:>12.1f} {load.errors:>7}')
+
+
+def main():
+    args = parse_args()
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        print(f'❌ Unknown modes: {", ".join(unknown)}')
+        return 2
+
+    scratch = tempfile.mkdtemp(prefix='skillswap-bench-')
+    seed_path = os.path.join(scratch, 'seed.db')
+    run_path = os.path.join(scratch, 'run.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{seed_path}'
+
+    from app import app
+    from database import db
+    from models import Listing
+    from seed import generate_dataset
+
+    users, listings, sessions, reviews = SCALES[args.scale]
+    print(f'📦 Scale {args.scale}: {users} users, {listings} listings, {sessions} sessions, {reviews} reviews')
+    generate_dataset(users, listings, sessions, reviews, seed=42)
+    work = writer_work(app, db)
+    with app.app_context():
+        teacher_id = Listing.query.order_by(Listing.id).first().user_id
+    with app.app_context():
+        # The seeding connections hold the copy source open in WAL mode
+        for engine in db.engines.values():
+            engine.dispose()
+
+    print(f'👥 {args.readers} readers, {args.writers} writers, {args.duration:.0f}s per run')
+    print(f'{"mode":>8} {"workers":>8} {"reads/s":>9} {"read p95 ms":>11} {"writes/s":>10} {"write p95 ms":>12} {"errors":>7}')
+    try:
+        for mode in modes:
+            for workers in [int(w) for w in args.workers.split(',')]:
+                copy_database(seed_path, run_path, 'wal' if mode == 'tuned' else 'delete')
+                run(run_path, mode, workers, work, teacher_id, args)
+    finally:
+        for name in os.listdir(scratch):
+            os.unlink(os.path.join(scratch, name))
+        os.rmdir(scratch)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
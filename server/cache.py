@@ -0,0 +1,261 @@
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, make_response
+from sqlalchemy import event
+from serializers import negotiated_mimetype
+from replicas import served_by_replica
+
+# Where the cache lives when several workers share it and RESPONSE_CACHE_DIR is unset
+SHARED_DIRECTORY = os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+                                'skillswap-response-cache')
+
+
+class MemoryBackend:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires'] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def generation(self, table):
+        return self.generations.get(table, 0)
+
+    def bump(self, table):
+        with self.lock:
+            self.generations[table] = self.generations.get(table, 0) + 1
+
+
+class FileBackend:
+    """Cache shared by every worker process through a directory.
+
+    Point it at a tmpfs such as /dev/shm to keep it in shared memory.
+    Generations are append-only files whose size is the counter, so bumps
+    from concurrent workers never lose an increment.
+    """
+
+    def __init__(self, directory, max_entries):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(os.path.join(directory, 'entries'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'generations'), exist_ok=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, 'entries', hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if entry['key'] != key or entry['expires'] <= time.time():
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def set(self, key, entry):
+        path = self._entry_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(dict(entry, key=key), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries_dir = os.path.join(self.directory, 'entries')
+        try:
+            names = os.listdir(entries_dir)
+        except OSError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        stats = []
+        for name in names:
+            try:
+                stats.append((os.stat(os.path.join(entries_dir, name)).st_mtime, name))
+            except OSError:
+                pass
+        stats.sort()
+        for _, name in stats[:len(stats) - self.max_entries]:
+            try:
+                os.unlink(os.path.join(entries_dir, name))
+            except OSError:
+                pass
+
+    def _generation_path(self, table):
+        return os.path.join(self.directory, 'generations', table)
+
+    def generation(self, table):
+        try:
+            return os.stat(self._generation_path(table)).st_size
+        except OSError:
+            return 0
+
+    def bump(self, table):
+        fd = os.open(self._generation_path(table), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, b'.')
+        finally:
+            os.close(fd)
+
+
+class ResponseCache:
+    def __init__(self, app=None):
+        self.backend = None
+        self.enabled = False
+        self.ttl = 60
+        self._watching = False
+        self.session = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, db=None):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 512)
+        directory = app.config.get('RESPONSE_CACHE_DIR')
+        if not directory and app.config.get('WEB_CONCURRENCY', 1) > 1:
+            # Per-process generations would miss the other workers' writes
+            directory = SHARED_DIRECTORY
+        if directory:
+            self.backend = FileBackend(directory, max_entries)
+        else:
+            self.backend = MemoryBackend(max_entries)
+
+        # The listeners live on the shared scoped session, so hook it once no
+        # matter how many apps the factory builds
+        if db is not None and not self._watching:
+            self._watch_writes(db.session)
+            self._watching = True
+        if db is not None:
+            self.session = db.session
+        app.extensions['response_cache'] = self
+
+    def _watch_writes(self, session):
+        # Collect the tables touched by a transaction and bump their
+        # generations only once it commits
+        @event.listens_for(session, 'after_flush')
+        def collect_flushed(session, flush_context):
+            tables = session.info.setdefault('response_cache_tables', set())
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                table = getattr(obj, '__tablename__', None)
+                if table:
+                    tables.add(table)
+
+        @event.listens_for(session, 'do_orm_execute')
+        def collect_bulk(orm_execute_state):
+            if orm_execute_state.is_update or orm_execute_state.is_delete:
+                table = getattr(orm_execute_state.statement, 'table', None)
+                if table is not None:
+                    orm_execute_state.session.info.setdefault('response_cache_tables', set()).add(table.name)
+
+        @event.listens_for(session, 'after_commit')
+        def bump_committed(session):
+            self.invalidate(*session.info.pop('response_cache_tables', ()))
+
+        @event.listens_for(session, 'after_rollback')
+        def discard_rolled_back(session):
+            session.info.pop('response_cache_tables', None)
+
+    def invalidate(self, *tables):
+        if self.backend is None:
+            return
+        for table in tables:
+            self.backend.bump(table)
+
+    def make_key(self, tables):
+        generations = ','.join(f'{table}={self.backend.generation(table)}' for table in tables)
+        query = '&'.join(sorted(request.query_string.decode('utf-8').split('&')))
+        # JSON and MessagePack renderings of the same page are separate entries
+        return f'{request.path}?{query}|{negotiated_mimetype()}|{generations}'
+
+    def cached(self, *tables):
+        """Cache a GET view's 200 responses until TTL, LRU eviction or a
+        committed write to any of ``tables``, answering If-None-Match with 304.
+        Pages read from a replica are served but not stored (X-Cache: BYPASS).
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or self.backend is None or request.method not in ('GET', 'HEAD'):
+                    return view(*args, **kwargs)
+
+                key = self.make_key(tables)
+                entry = self.backend.get(key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+                        return response
+                    body = response.get_data()
+                    entry = {
+                        'body': body,
+                        'etag': hashlib.sha1(body).hexdigest(),
+                        'mimetype': response.mimetype,
+                        'vary': list(response.vary),
+                        'expires': time.time() + self.ttl,
+                    }
+                    cache_status = 'MISS'
+                    # A lagging replica can answer with rows older than the
+                    # generation in the key; only the primary fills the cache
+                    if self.session is not None and served_by_replica(self.session()):
+                        cache_status = 'BYPASS'
+                else:
+                    response = make_response(entry['body'], 200)
+                    response.mimetype = entry['mimetype']
+                    response.vary.update(entry['vary'])
+                    cache_status = 'HIT'
+
+                # Compressed variants are kept with the entry so a hot page is
+                # compressed once per encoding, not on every hit
+                etag = entry['etag']
+                changed = cache_status == 'MISS'
+                compression = current_app.extensions.get('compression')
+                encoding = compression.negotiate(response, len(entry['body'])) if compression else None
+                if encoding is not None:
+                    variants = entry.setdefault('variants', {})
+                    if encoding not in variants:
+                        variants[encoding] = compression.compress(entry['body'], encoding)
+                        changed = True
+                    response.set_data(variants[encoding])
+                    response.headers['Content-Encoding'] = encoding
+                    response.vary.add('Accept-Encoding')
+                    etag = f'{etag}-{encoding}'
+                if changed and cache_status != 'BYPASS':
+                    self.backend.set(key, entry)
+
+                response.set_etag(etag)
+                response.headers['X-Cache'] = cache_status
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,192 @@
+import sys
+import os
+import re
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoints exercised by the check. Every statement they issue is EXPLAINed.
+ENDPOINTS = [
+    ('GET', '/api/listings', False),
+    ('GET', '/api/listings?skill_id=1', False),
+    ('GET', '/api/listings?teacher_id=1', False),
+    ('GET', '/api/listings?stream=ndjson&skill_id=1', False),
+    ('GET', '/api/listings?fields=id,title,teacher_username', False),
+    ('GET', '/api/listings?sort=price', False),
+    ('GET', '/api/listings?sort=-rating', False),
+    ('GET', '/api/listings?sort=-created_at&category=Programming', False),
+    ('GET', '/api/listings/1', False),
+    ('GET', '/api/listings/search?q=python', False),
+    ('GET', '/api/skills', False),
+    ('GET', '/api/skills?category=Technology', False),
+    ('GET', '/api/reviews', False),
+    ('GET', '/api/reviews?reviewee_id=1', False),
+    ('GET', '/api/reviews?stream=ndjson&reviewee_id=1', False),
+    ('GET', '/api/reviews/session/1', False),
+    ('GET', '/api/users/1', False),
+    ('GET', '/api/users/experts', False),
+    ('GET', '/api/users/experts?category=Technology', False),
+    ('GET', '/api/sessions', True),
+    ('GET', '/api/sessions/my-sessions', True),
+    ('GET', '/api/sessions/calendar?role=teacher&from=2024-01-01&to=2024-12-31', True),
+    ('GET', '/api/sessions/calendar?role=student&status=scheduled', True),
+    ('GET', '/api/sessions/availability?teacher_id=1', True),
+    ('POST', '/api/sessions', True),
+    ('POST', '/api/reviews', True),
+    ('POST', '/api/sessions/batch', True),
+    ('POST', '/api/reviews/batch', True),
+    ('POST', '/api/users/me/skills/batch', True),
+]
+
+# Unfiltered first pages walk the primary key under a LIMIT, which SQLite
+# reports as a plain SCAN even though it stops after one page.
+ALLOWED_SCANS = {
+    '/api/skills': {'skills'},
+}
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX| USING INTEGER PRIMARY KEY| VIRTUAL TABLE INDEX \d+:M)')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fail if any endpoint query falls back to a full table scan.')
+    parser.add_argument('--database-url', help='Scratch database to migrate and fill (defaults to a temporary SQLite file)')
+    return parser.parse_args()
+
+def load_fixtures(db):
+    from models import User, Skill, Listing, UserSkill, Session, Review
+    from leaderboard import refresh_leaderboard
+
+    teacher = User(username='teacher', email='teacher@example.com', bio='Teacher')
+    student = User(username='student', email='student@example.com', bio='Student')
+    for user in (teacher, student):
+        user.set_password('password123')
+        db.session.add(user)
+    skill = Skill(name='Python Programming', category='Technology')
+    db.session.add(skill)
+    db.session.flush()
+
+    db.session.add(UserSkill(user_id=teacher.id, skill_id=skill.id, proficiency_level='expert', years_experience=5))
+    listing = Listing(title='Python', description='Learn Python', price_per_hour=100, user_id=teacher.id, skill_id=skill.id)
+    db.session.add(listing)
+    db.session.flush()
+
+    session = Session(student_id=student.id, teacher_id=teacher.id, listing_id=listing.id,
+                      scheduled_date=datetime.utcnow() + timedelta(days=1), duration_hours=1.0)
+    db.session.add(session)
+    db.session.flush()
+
+    db.session.add(Review(rating=5, comment='Great', reviewer_id=student.id, reviewee_id=teacher.id, session_id=session.id))
+    db.session.commit()
+    refresh_leaderboard()
+    return student.id, {
+        '/api/sessions': {
+            'listing_id': listing.id,
+            'scheduled_date': (datetime.utcnow() + timedelta(days=2)).isoformat(),
+            'duration_hours': 1.0
+        },
+        '/api/reviews': {'rating': 4, 'reviewee_id': teacher.id, 'session_id': session.id},
+        '/api/sessions/batch': {'items': [
+            {'listing_id': listing.id, 'scheduled_date': (datetime.utcnow() + timedelta(days=day)).isoformat()}
+            for day in (3, 10)
+        ]},
+        '/api/reviews/batch': {'items': [{'rating': 4, 'reviewee_id': teacher.id, 'session_id': session.id}]},
+        '/api/users/me/skills/batch': {'items': [{'skill_id': skill.id, 'proficiency_level': 'beginner'}]},
+    }
+
+def explain(connection, dialect, statement, parameters):
+    from sqlalchemy import text
+
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        lines = [row[-1] for row in rows]
+        return lines, {m.group(1) for line in lines for m in [SQLITE_SCAN.search(line)] if m}
+
+    # Small fixture tables always look cheapest to seq-scan, so forbid it and
+    # see whether the planner still has to fall back to one.
+    connection.execute(text('SET enable_seqscan = off'))
+    try:
+        rows = connection.exec_driver_sql('EXPLAIN ' + statement, parameters).fetchall()
+    finally:
+        connection.execute(text('SET enable_seqscan = on'))
+    lines = [row[0] for row in rows]
+    return lines, {m.group(1) for line in lines for m in [POSTGRES_SCAN.search(line)] if m}
+
+def main():
+    args = parse_args()
+    scratch_path = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        scratch.close()
+        scratch_path = scratch.name
+        os.environ['DATABASE_URL'] = f'sqlite:///{scratch_path}'
+
+    from flask_jwt_extended import create_access_token
+    from flask_migrate import upgrade
+    from sqlalchemy import event
+    from app import app
+    from database import db
+
+    failures = []
+    with app.app_context():
+        upgrade(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+        student_id, payloads = load_fixtures(db)
+        token = create_access_token(identity=student_id)
+        engine = db.engine
+        dialect = engine.dialect.name
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if not executemany and statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, parameters))
+
+        event.listen(engine, 'before_cursor_execute', capture)
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+
+        for method, url, needs_auth in ENDPOINTS:
+            del captured[:]
+            failed_before = len(failures)
+            if method == 'GET':
+                response = client.get(url, headers=headers if needs_auth else None)
+            else:
+                response = client.post(url, json=payloads[url], headers=headers)
+            if response.status_code >= 500:
+                failures.append(f'{method} {url} returned {response.status_code}')
+                print(f'❌ {method} {url}')
+                continue
+
+            statements = list(captured)
+            allowed = ALLOWED_SCANS.get(url.split('?')[0], set()) if '?' not in url else set()
+            with engine.connect() as connection:
+                for statement, parameters in statements:
+                    lines, scanned = explain(connection, dialect, statement, parameters)
+                    scanned -= allowed
+                    if scanned:
+                        failures.append(
+                            f'{method} {url} full-scans {", ".join(sorted(scanned))}:\n'
+                            f'  {" ".join(statement.split())}\n  ' + '\n  '.join(lines)
+                        )
+            print(f'{"❌" if len(failures) > failed_before else "✅"} {method} {url} ({len(statements)} queries)')
+
+        event.remove(engine, 'before_cursor_execute', capture)
+        db.session.remove()
+        engine.dispose()
+
+    if scratch_path:
+        os.unlink(scratch_path)
+
+    if failures:
+        print('\n💥 Full table scans found:')
+        for failure in failures:
+            print(failure)
+        return 1
+    print('\n🎉 Every endpoint query is served by an index')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # br is simply not offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is simply not offered
+    zstandard = None
+
+# Preference when the client accepts several at the same quality: zstd and
+# brotli beat gzip on ratio, zstd at a fraction of brotli's CPU
+PREFERENCE = ('zstd', 'br', 'gzip')
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'application/msgpack')
+
+
+class Compressor:
+    """Incremental compressor for one response; ``flush`` ends a chunk so
+    the client can decode everything sent so far."""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self.engine = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == 'br':
+            self.engine = brotli.Compressor(quality=level)
+        else:
+            self.engine = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self.engine.process(data)
+        return self.engine.compress(data)
+
+    def flush(self):
+        if self.encoding == 'gzip':
+            return self.engine.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == 'br':
+            return self.engine.flush()
+        return self.engine.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        if self.encoding == 'gzip':
+            return self.engine.flush(zlib.Z_FINISH)
+        if self.encoding == 'br':
+            return self.engine.finish()
+        return self.engine.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+class Compression:
+    """gzip/brotli/zstd response compression negotiated from Accept-Encoding.
+
+    Bodies under ``COMPRESSION_MIN_SIZE`` bytes go out as they are; streamed
+    responses are compressed and flushed chunk by chunk. Responses that
+    already carry a Content-Encoding (e.g. cached compressed variants) are
+    left alone.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.min_size = 1024
+        self.levels = {}
+        self.encodings = ()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESSION_ENABLED', True)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.levels = {
+            'gzip': app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+            'br': app.config.get('COMPRESSION_BROTLI_QUALITY', 4),
+            'zstd': app.config.get('COMPRESSION_ZSTD_LEVEL', 3),
+        }
+        available = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+        self.encodings = tuple(encoding for encoding in PREFERENCE if available[encoding])
+        if self.enabled:
+            app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    def negotiate(self, response, size=None):
+        """The encoding to send ``response`` (``size`` bytes long, unknown
+        when streamed) in, or None to send it as it is."""
+        if not self.enabled or response.status_code < 200 or response.status_code in (204, 304):
+            return None
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return None
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES and not response.mimetype.startswith('text/'):
+            return None
+        if size is not None and size < self.min_size:
+            return None
+        encoding = request.accept_encodings.best_match(self.encodings)
+        return encoding if encoding in self.encodings else None
+
+    def compress(self, data, encoding):
+        compressor = Compressor(encoding, self.levels[encoding])
+        return compressor.compress(data) + compressor.finish()
+
+    def _compress_chunks(self, chunks, encoding):
+        compressor = Compressor(encoding, self.levels[encoding])
+        for chunk in chunks:
+            compressed = compressor.compress(chunk) + compressor.flush()
+            if compressed:
+                yield compressed
+        yield compressor.finish()
+
+    def compress_response(self, response):
+        response.vary.add('Accept-Encoding')
+        if response.is_streamed:
+            encoding = self.negotiate(response)
+            if encoding is None:
+                return response
+            response.response = self._compress_chunks(response.iter_encoded(), encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            encoding = self.negotiate(response, len(body))
+            if encoding is None:
+                return response
+            response.set_data(self.compress(body, encoding))
+            if response.get_etag()[0]:
+                etag, weak = response.get_etag()
+                response.set_etag(f'{etag}-{encoding}', weak)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+compression = Compression()
@@ -1,4 +1,6 @@
 import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
 
 class Config:
     # Use Railway's PostgreSQL database or fallback to SQLite
@@ -8,5 +10,112 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or 'sqlite:///skillswap.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Optional comma-separated read replicas for GET requests on the catalog blueprints
+    REPLICA_DATABASE_URLS = [
+        url.strip().replace('postgres://', 'postgresql://', 1)
+        for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+    ]
+    READ_REPLICA_BLUEPRINTS = ('listings', 'skills', 'reviews', 'users')
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_SECONDS = float(os.environ.get('REPLICA_LAG_CHECK_SECONDS', 1))
+    
+    # Connection pool per worker process; SQLALCHEMY_ENGINE_OPTIONS is derived from these per dialect
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # File-backed SQLite: WAL and pragmas on every connection, writers take turns through a queue
+    SQLITE_TUNING_ENABLED = os.environ.get('SQLITE_TUNING_ENABLED', 'true').lower() == 'true'
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', 5))
+    SQLITE_WRITER_QUEUE = os.environ.get('SQLITE_WRITER_QUEUE', 'true').lower() == 'true'
     SECRET_KEY = os.environ.get('SECRET_KEY', 'skillswap-secret-key')
-    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-skillswap-secret')
\ No newline at end of file
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-skillswap-secret')
+    
+    # bcrypt cost factor and the process pool that runs hashing off the request thread
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_DEPTH = int(os.environ.get('PASSWORD_HASH_QUEUE_DEPTH', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))
+    
+    # Cached catalog responses. Without RESPONSE_CACHE_DIR each process keeps its own cache and
+    # write generations, so a write served by one worker leaves the others serving stale pages for
+    # up to RESPONSE_CACHE_TTL; with WEB_CONCURRENCY > 1 the cache is shared through a directory
+    # under /dev/shm (or the temp dir) instead
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512))
+    RESPONSE_CACHE_DIR = os.environ.get('RESPONSE_CACHE_DIR') or None
+    
+    # gzip/brotli/zstd negotiated from Accept-Encoding for bodies of at least COMPRESSION_MIN_SIZE bytes
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+    COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+    
+    # POST /api/batch: sub-requests per batch and threads running their reads
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 4))
+    # gthread threads per gunicorn worker (Procfile); each holds a pooled connection per request
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))
+    # gunicorn worker processes; gunicorn reads the same variable for its default --workers
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+    
+    # Per-request query counts, DB time and N+1 warnings (Server-Timing header + JSON log line)
+    SQL_INSTRUMENTATION_ENABLED = os.environ.get('SQL_INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 3))
+    
+    # Most rows one ?stream= response sends (and its default ?limit); longer
+    # exports resume from the next_cursor it ends with
+    STREAM_MAX_ROWS = int(os.environ.get('STREAM_MAX_ROWS', 100000))
+    
+    # Prometheus exposition at /api/metrics, served only with METRICS_TOKEN set and
+    # scraped with Authorization: Bearer <METRICS_TOKEN>
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+    
+    # In-memory recommendation matrices: check for new rows / rebuild from scratch (seconds)
+    RECOMMENDATIONS_REFRESH_SECONDS = float(os.environ.get('RECOMMENDATIONS_REFRESH_SECONDS', 5))
+    RECOMMENDATIONS_REBUILD_SECONDS = float(os.environ.get('RECOMMENDATIONS_REBUILD_SECONDS', 3600))
+
+
+def engine_options(config, uri=None):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database (or ``uri``)."""
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # Every thread must share the one connection that holds the database
+            return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+        # Opening a file connection is cheap but throws away its page cache, so
+        # keep one per request thread and batch read thread; no overflow beyond
+        # what SQLite can serialize
+        return {
+            'pool_size': max(config['DB_POOL_SIZE'], config['WEB_THREADS'] * (1 + config['BATCH_WORKERS'])),
+            'max_overflow': 0,
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'connect_args': {'check_same_thread': False},
+        }
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        # Recycle before server/proxy idle timeouts and test connections on checkout
+        # so a restarted database or dropped connection doesn't surface as a 500
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entries for the configured read replicas."""
+    return {
+        f'replica_{index}': dict(engine_options(config, uri), url=uri)
+        for index, uri in enumerate(config['REPLICA_DATABASE_URLS'])
+    }
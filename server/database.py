@@ -1,5 +1,4 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
+from replicas import RoutingSession
 
-db = SQLAlchemy()
-bcrypt = Bcrypt()
\ No newline at end of file
+db = SQLAlchemy(session_options={'class_': RoutingSession})
@@ -0,0 +1,16 @@
+import os
+import shutil
+import tempfile
+
+# Shared directory for prometheus_client multiprocess mode; must be set
+# before the app (and prometheus_client) is imported by any worker
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'skillswap-metrics'))
+
+def on_starting(server):
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
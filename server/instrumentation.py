@@ -0,0 +1,108 @@
+import json
+import time
+import logging
+from collections import Counter
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryInstrumentation:
+    """Counts SQL statements and DB time per request.
+
+    Adds a ``Server-Timing`` header and logs one JSON line per request,
+    flagging statement shapes repeated at least ``SQL_N_PLUS_ONE_THRESHOLD``
+    times as likely N+1 queries. For streamed responses the header only counts
+    the queries run before the body starts; the log line is written once the
+    body has been sent and counts all of them. Nothing is hooked unless
+    ``SQL_INSTRUMENTATION_ENABLED`` is set.
+    """
+
+    def __init__(self, app=None):
+        self.threshold = 3
+        self._engine_hooked = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('SQL_INSTRUMENTATION_ENABLED', False):
+            return
+        self.threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 3)
+        self.logger = app.logger
+        if not self.logger.level:
+            self.logger.setLevel(logging.INFO)
+
+        if not self._engine_hooked:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._engine_hooked = True
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.extensions['query_instrumentation'] = self
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'sql_stats' in g:
+            conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context() or 'sql_stats' not in g:
+            return
+        starts = conn.info.get('query_start_time')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = g.sql_stats
+        stats['count'] += 1
+        stats['duration'] += elapsed
+        stats['shapes'][' '.join(statement.split())] += 1
+
+    def _start_request(self):
+        g.sql_stats = {'count': 0, 'duration': 0.0, 'shapes': Counter(), 'started': time.perf_counter()}
+
+    def _finish_request(self, response):
+        stats = g.get('sql_stats')
+        if stats is None:
+            return response
+
+        record = {
+            'event': 'sql_stats',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+        }
+        if response.is_streamed:
+            # A streamed body reads its rows after this hook, in the same app
+            # context, so they keep landing in ``stats``: the header can only
+            # show the queries run so far, the log line waits for the last chunk
+            response.headers.add('Server-Timing', self._server_timing(stats, ' before streaming'))
+            response.call_on_close(lambda: self._log(record, stats))
+        else:
+            g.pop('sql_stats')
+            response.headers.add('Server-Timing', self._server_timing(stats))
+            self._log(record, stats)
+        return response
+
+    def _server_timing(self, stats, note=''):
+        total_ms = (time.perf_counter() - stats['started']) * 1000
+        db_ms = stats['duration'] * 1000
+        return f'db;dur={db_ms:.2f};desc="{stats["count"]} queries{note}", app;dur={total_ms:.2f}'
+
+    def _log(self, record, stats):
+        total_ms = (time.perf_counter() - stats['started']) * 1000
+        db_ms = stats['duration'] * 1000
+        repeated = [
+            {'statement': shape, 'count': count}
+            for shape, count in stats['shapes'].most_common()
+            if count >= self.threshold
+        ]
+
+        record = dict(record, queries=stats['count'], db_ms=round(db_ms, 2), total_ms=round(total_ms, 2))
+        if repeated:
+            record['n_plus_one'] = repeated
+            self.logger.warning(json.dumps(record))
+        else:
+            self.logger.info(json.dumps(record))
+
+query_instrumentation = QueryInstrumentation()
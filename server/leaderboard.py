@@ -0,0 +1,113 @@
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+from sqlalchemy import case, func, insert
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import db
+from models import User, UserSkill, Skill, Listing, ExpertRanking
+
+PROFICIENCY_SCORES = {'expert': 2, 'advanced': 1}
+EXPERT_LEVELS = tuple(PROFICIENCY_SCORES)
+
+def compute_rankings():
+    """Rank experts per skill category and overall in two grouped queries.
+
+    Experts are ordered by average rating, then review count, then
+    proficiency and years of experience. Returns ``{category: [row, ...]}``
+    with ``None`` as the overall category.
+    """
+    proficiency = case(
+        *[(UserSkill.proficiency_level == level, score) for level, score in PROFICIENCY_SCORES.items()],
+        else_=0
+    )
+    skill_rows = db.session.query(
+        UserSkill.user_id,
+        Skill.category,
+        func.max(proficiency),
+        func.max(func.coalesce(UserSkill.years_experience, 0)),
+        User.rating_sum,
+        User.rating_count
+    ).join(Skill, UserSkill.skill_id == Skill.id) \
+     .join(User, UserSkill.user_id == User.id) \
+     .filter(UserSkill.proficiency_level.in_(EXPERT_LEVELS)) \
+     .group_by(UserSkill.user_id, Skill.category, User.rating_sum, User.rating_count) \
+     .all()
+
+    listing_counts = dict(((user_id, category), count) for user_id, category, count in db.session.query(
+        Listing.user_id, Skill.category, func.count(Listing.id)
+    ).join(Skill, Listing.skill_id == Skill.id).group_by(Listing.user_id, Skill.category))
+
+    entries = {}
+    overall = {}
+    for user_id, category, proficiency_score, years, rating_sum, rating_count in skill_rows:
+        average = round(rating_sum / rating_count, 1) if rating_count else 0
+        entry = {
+            'user_id': user_id,
+            'average_rating': average,
+            'review_count': rating_count,
+            'proficiency_score': proficiency_score,
+            'years_experience': years,
+            'listings_count': listing_counts.get((user_id, category), 0)
+        }
+        entries.setdefault(category, []).append(entry)
+
+        best = overall.setdefault(user_id, dict(entry, listings_count=0))
+        best['proficiency_score'] = max(best['proficiency_score'], proficiency_score)
+        best['years_experience'] = max(best['years_experience'], years)
+
+    for (user_id, category), count in listing_counts.items():
+        if user_id in overall:
+            overall[user_id]['listings_count'] += count
+    entries[None] = list(overall.values())
+
+    def sort_key(entry):
+        return (-entry['average_rating'], -entry['review_count'], -entry['proficiency_score'],
+                -entry['years_experience'], entry['user_id'])
+
+    for category, rows in entries.items():
+        rows.sort(key=sort_key)
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+            row['category'] = category
+    return entries
+
+def refresh_leaderboard():
+    entries = compute_rankings()
+    refreshed_at = datetime.utcnow()
+    rows = [dict(row, refreshed_at=refreshed_at) for category_rows in entries.values() for row in category_rows]
+
+    # Swap the whole table in one transaction so readers never see a partial ranking
+    db.session.query(ExpertRanking).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(insert(ExpertRanking), rows)
+    db.session.commit()
+    return len(entries[None])
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Rebuild the precomputed experts leaderboard')
+    parser.add_argument('--every', type=int, metavar='SECONDS',
+                        help='Keep running and refresh on this interval')
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    from app import app
+
+    args = parse_args()
+    with app.app_context():
+        while True:
+            try:
+                ranked = refresh_leaderboard()
+                print(f"✅ Leaderboard refreshed: {ranked} experts ranked")
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Error refreshing leaderboard: {e}")
+                if not args.every:
+                    sys.exit(1)
+            if not args.every:
+                break
+            db.session.remove()
+            time.sleep(args.every)
@@ -0,0 +1,179 @@
+import sys
+import os
+import time
+from sqlalchemy import event
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# listing_cards is the read model behind GET /api/listings: one row per
+# listing with its skill, teacher and rating aggregates copied in, so a page
+# of cards is a single-table index scan in any sort order. Like
+# listing_search it is kept in sync by database triggers, so every write
+# path (routes, seed, rating aggregate updates, bulk loads) maintains it.
+
+CARD_COLUMNS = (
+    'listing_id, title, description, price_per_hour, user_id, skill_id, created_at, '
+    'skill_name, skill_category, teacher_username, teacher_bio, '
+    'teacher_rating_sum, teacher_rating_count, teacher_average_rating'
+)
+
+
+def _average(users):
+    return f'CASE WHEN {users}.rating_count > 0 THEN {users}.rating_sum * 1.0 / {users}.rating_count ELSE 0 END'
+
+
+def _card_select(listing):
+    """SELECT list of one card built from ``listing`` (a row alias) and the
+    joined ``skills`` and ``users`` rows."""
+    return (
+        f'{listing}.id, {listing}.title, {listing}.description, {listing}.price_per_hour, '
+        f'{listing}.user_id, {listing}.skill_id, {listing}.created_at, '
+        f'skills.name, skills.category, users.username, users.bio, '
+        f'users.rating_sum, users.rating_count, {_average("users")}'
+    )
+
+
+CARD_OF_NEW_LISTING = f"""
+    SELECT {_card_select('new')} FROM skills, users
+    WHERE skills.id = new.skill_id AND users.id = new.user_id"""
+
+TEACHER_UPDATE = f"""
+    UPDATE listing_cards SET teacher_username = new.username, teacher_bio = new.bio,
+        teacher_rating_sum = new.rating_sum, teacher_rating_count = new.rating_count,
+        teacher_average_rating = {_average('new')}
+    WHERE user_id = new.id"""
+
+SKILL_UPDATE = """
+    UPDATE listing_cards SET skill_name = new.name, skill_category = new.category
+    WHERE skill_id = new.id"""
+
+SQLITE_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_listing_insert AFTER INSERT ON listings BEGIN
+        INSERT OR REPLACE INTO listing_cards ({CARD_COLUMNS}) {CARD_OF_NEW_LISTING};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_listing_update AFTER UPDATE ON listings BEGIN
+        DELETE FROM listing_cards WHERE listing_id = old.id;
+        INSERT INTO listing_cards ({CARD_COLUMNS}) {CARD_OF_NEW_LISTING};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_cards_listing_delete AFTER DELETE ON listings BEGIN
+        DELETE FROM listing_cards WHERE listing_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_skill_update
+    AFTER UPDATE OF name, category ON skills BEGIN {SKILL_UPDATE};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_user_update
+    AFTER UPDATE OF username, bio, rating_sum, rating_count ON users BEGIN {TEACHER_UPDATE};
+    END""",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS listing_cards_user_update",
+    "DROP TRIGGER IF EXISTS listing_cards_skill_update",
+    "DROP TRIGGER IF EXISTS listing_cards_listing_delete",
+    "DROP TRIGGER IF EXISTS listing_cards_listing_update",
+    "DROP TRIGGER IF EXISTS listing_cards_listing_insert",
+]
+
+# Deleting a listing cascades to its card through the foreign key
+POSTGRES_DDL = [
+    f"""CREATE OR REPLACE FUNCTION listing_cards_refresh_listing() RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO listing_cards ({CARD_COLUMNS}) {CARD_OF_NEW_LISTING}
+        ON CONFLICT (listing_id) DO UPDATE SET
+            title = EXCLUDED.title, description = EXCLUDED.description,
+            price_per_hour = EXCLUDED.price_per_hour, user_id = EXCLUDED.user_id,
+            skill_id = EXCLUDED.skill_id, created_at = EXCLUDED.created_at,
+            skill_name = EXCLUDED.skill_name, skill_category = EXCLUDED.skill_category,
+            teacher_username = EXCLUDED.teacher_username, teacher_bio = EXCLUDED.teacher_bio,
+            teacher_rating_sum = EXCLUDED.teacher_rating_sum, teacher_rating_count = EXCLUDED.teacher_rating_count,
+            teacher_average_rating = EXCLUDED.teacher_average_rating;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION listing_cards_refresh_skill() RETURNS TRIGGER AS $$
+    BEGIN
+        {SKILL_UPDATE};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION listing_cards_refresh_user() RETURNS TRIGGER AS $$
+    BEGIN
+        {TEACHER_UPDATE};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS listing_cards_listing ON listings",
+    """CREATE TRIGGER listing_cards_listing AFTER INSERT OR UPDATE ON listings
+    FOR EACH ROW EXECUTE PROCEDURE listing_cards_refresh_listing()""",
+    "DROP TRIGGER IF EXISTS listing_cards_skill ON skills",
+    """CREATE TRIGGER listing_cards_skill AFTER UPDATE OF name, category ON skills
+    FOR EACH ROW EXECUTE PROCEDURE listing_cards_refresh_skill()""",
+    "DROP TRIGGER IF EXISTS listing_cards_user ON users",
+    """CREATE TRIGGER listing_cards_user AFTER UPDATE OF username, bio, rating_sum, rating_count ON users
+    FOR EACH ROW EXECUTE PROCEDURE listing_cards_refresh_user()""",
+]
+
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS listing_cards_user ON users",
+    "DROP TRIGGER IF EXISTS listing_cards_skill ON skills",
+    "DROP TRIGGER IF EXISTS listing_cards_listing ON listings",
+    "DROP FUNCTION IF EXISTS listing_cards_refresh_user()",
+    "DROP FUNCTION IF EXISTS listing_cards_refresh_skill()",
+    "DROP FUNCTION IF EXISTS listing_cards_refresh_listing()",
+]
+
+REBUILD = [
+    "DELETE FROM listing_cards",
+    f"""INSERT INTO listing_cards ({CARD_COLUMNS})
+    SELECT {_card_select('listings')}
+    FROM listings
+    JOIN skills ON skills.id = listings.skill_id
+    JOIN users ON users.id = listings.user_id""",
+]
+
+
+def _statements(dialect, sqlite, postgres):
+    if dialect == 'sqlite':
+        return sqlite
+    if dialect == 'postgresql':
+        return postgres
+    return []
+
+
+def create_listing_cards(connection):
+    """Install the sync triggers and fill the table from the source tables."""
+    for statement in _statements(connection.dialect.name, SQLITE_DDL, POSTGRES_DDL) + REBUILD:
+        connection.exec_driver_sql(statement)
+
+
+def drop_listing_cards(connection):
+    """Remove the sync triggers (the table itself belongs to the models)."""
+    for statement in _statements(connection.dialect.name, SQLITE_DROP, POSTGRES_DROP):
+        connection.exec_driver_sql(statement)
+
+
+def rebuild_listing_cards(connection):
+    for statement in REBUILD:
+        connection.exec_driver_sql(statement)
+    return connection.exec_driver_sql("SELECT COUNT(*) FROM listing_cards").scalar()
+
+
+def register_listing_cards(metadata):
+    # Keep db.create_all()/drop_all() (used by seed.py) in step with the migrations
+    event.listen(metadata, 'after_create', lambda target, connection, **kw: create_listing_cards(connection))
+    event.listen(metadata, 'before_drop', lambda target, connection, **kw: drop_listing_cards(connection))
+
+
+if __name__ == "__main__":
+    from app import app
+    from database import db
+
+    with app.app_context():
+        try:
+            started = time.perf_counter()
+            with db.engine.begin() as connection:
+                count = rebuild_listing_cards(connection)
+            print(f"✅ Listing cards rebuilt: {count} cards in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            print(f"❌ Error rebuilding listing cards: {e}")
+            sys.exit(1)
@@ -0,0 +1,119 @@
+import os
+import hmac
+import time
+from flask import g, jsonify, request, Response
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, REGISTRY,
+    generate_latest, CONTENT_TYPE_LATEST, multiprocess
+)
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py) makes every
+# worker write its samples to a shared directory that the scrape aggregates.
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    'skillswap_http_request_duration_seconds',
+    'Request latency by blueprint and route',
+    ['blueprint', 'route', 'method'],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_COUNT = Counter(
+    'skillswap_http_requests_total',
+    'Requests by blueprint, route and response status',
+    ['blueprint', 'route', 'method', 'status']
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'skillswap_http_requests_in_progress',
+    'Requests currently being handled',
+    ['blueprint', 'route', 'method'],
+    multiprocess_mode='livesum'
+)
+POOL_CHECKED_OUT = Gauge(
+    'skillswap_db_pool_checked_out',
+    'Connections checked out of the SQLAlchemy pool',
+    multiprocess_mode='liveall'
+)
+POOL_OVERFLOW = Gauge(
+    'skillswap_db_pool_overflow',
+    'Connections open beyond the pool size',
+    multiprocess_mode='liveall'
+)
+POOL_SIZE = Gauge(
+    'skillswap_db_pool_size',
+    'Configured SQLAlchemy pool size',
+    multiprocess_mode='liveall'
+)
+
+
+class Metrics:
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.token = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db=None):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        self.db = db
+        app.before_request(self._start_request)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish_request)
+        # Pool sizes, routes and traffic are not for the public: the scrape
+        # endpoint only exists when a token to guard it is configured
+        self.token = app.config.get('METRICS_TOKEN')
+        if self.token:
+            app.add_url_rule('/api/metrics', 'metrics', self.expose, methods=['GET'])
+        app.extensions['metrics'] = self
+
+    def _labels(self):
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        return request.blueprint or 'app', route, request.method
+
+    def _start_request(self):
+        g.metrics_labels = self._labels()
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(*g.metrics_labels).inc()
+
+    def _record_status(self, response):
+        g.metrics_status = response.status_code
+        return response
+
+    def _finish_request(self, exc):
+        labels = g.pop('metrics_labels', None)
+        if labels is None:
+            return
+        REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - g.pop('metrics_started'))
+        REQUEST_COUNT.labels(*labels, str(g.pop('metrics_status', 500))).inc()
+        REQUESTS_IN_PROGRESS.labels(*labels).dec()
+        self._update_pool_gauges()
+
+    def _update_pool_gauges(self):
+        if self.db is None:
+            return
+        pool = self.db.engine.pool
+        # NullPool/StaticPool (e.g. in-memory SQLite) don't track checkouts
+        if hasattr(pool, 'checkedout'):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+            POOL_SIZE.set(pool.size())
+
+    def _authorized(self):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(token.encode('utf-8'), self.token.encode('utf-8'))
+
+    def expose(self):
+        if not self._authorized():
+            return jsonify({'error': 'A valid metrics token is required'}), 401
+        self._update_pool_gauges()
+        if MULTIPROCESS:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+metrics = Metrics()
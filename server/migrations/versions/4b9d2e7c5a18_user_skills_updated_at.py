@@ -0,0 +1,30 @@
+"""user_skills updated_at
+
+Revision ID: 4b9d2e7c5a18
+Revises: 8f4a6c2d1e93
+Create Date: 2026-10-18 21:12:40.518233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b9d2e7c5a18'
+down_revision = '8f4a6c2d1e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_skills', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_user_skills_updated_at', ['updated_at'], unique=False)
+
+    op.execute("UPDATE user_skills SET updated_at = created_at")
+
+
+def downgrade():
+    with op.batch_alter_table('user_skills', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_skills_updated_at')
+        batch_op.drop_column('updated_at')
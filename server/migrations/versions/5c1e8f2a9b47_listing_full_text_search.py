@@ -0,0 +1,139 @@
+"""listing full-text search
+
+Revision ID: 5c1e8f2a9b47
+Revises: d3b2d3e6847e
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e8f2a9b47'
+down_revision = 'd3b2d3e6847e'
+branch_labels = None
+depends_on = None
+
+
+# The DDL as of this revision; search.py may move on, this must not.
+# SQLite uses an FTS5 table keyed by listing rowid; PostgreSQL a tsvector
+# column with a GIN index. Triggers keep it in sync with listings and skills.
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS listing_search USING fts5(
+        title, description, skill_name, skill_category,
+        tokenize = 'porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_listing_insert AFTER INSERT ON listings BEGIN
+        INSERT INTO listing_search (rowid, title, description, skill_name, skill_category)
+        SELECT new.id, new.title, new.description, skills.name, skills.category
+        FROM skills WHERE skills.id = new.skill_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_listing_update
+    AFTER UPDATE OF title, description, skill_id ON listings BEGIN
+        DELETE FROM listing_search WHERE rowid = old.id;
+        INSERT INTO listing_search (rowid, title, description, skill_name, skill_category)
+        SELECT new.id, new.title, new.description, skills.name, skills.category
+        FROM skills WHERE skills.id = new.skill_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_listing_delete AFTER DELETE ON listings BEGIN
+        DELETE FROM listing_search WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_skill_update
+    AFTER UPDATE OF name, category ON skills BEGIN
+        UPDATE listing_search SET skill_name = new.name, skill_category = new.category
+        WHERE rowid IN (SELECT id FROM listings WHERE skill_id = new.id);
+    END""",
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM listing_search",
+    """INSERT INTO listing_search (rowid, title, description, skill_name, skill_category)
+    SELECT listings.id, listings.title, listings.description, skills.name, skills.category
+    FROM listings JOIN skills ON skills.id = listings.skill_id""",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS listing_search_skill_update",
+    "DROP TRIGGER IF EXISTS listing_search_listing_delete",
+    "DROP TRIGGER IF EXISTS listing_search_listing_update",
+    "DROP TRIGGER IF EXISTS listing_search_listing_insert",
+    "DROP TABLE IF EXISTS listing_search",
+]
+
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS listing_search (
+        listing_id INTEGER PRIMARY KEY REFERENCES listings (id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_listing_search_document ON listing_search USING GIN (document)",
+    """CREATE OR REPLACE FUNCTION listing_search_document(title TEXT, description TEXT, skill_name TEXT, skill_category TEXT)
+    RETURNS TSVECTOR AS $$
+        SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(skill_name, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(skill_category, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    $$ LANGUAGE sql IMMUTABLE""",
+    """CREATE OR REPLACE FUNCTION listing_search_refresh_listing() RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO listing_search (listing_id, document)
+        SELECT NEW.id, listing_search_document(NEW.title, NEW.description, skills.name, skills.category)
+        FROM skills WHERE skills.id = NEW.skill_id
+        ON CONFLICT (listing_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION listing_search_refresh_skill() RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE listing_search
+        SET document = listing_search_document(listings.title, listings.description, NEW.name, NEW.category)
+        FROM listings
+        WHERE listings.skill_id = NEW.id AND listing_search.listing_id = listings.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS listing_search_listing ON listings",
+    """CREATE TRIGGER listing_search_listing
+    AFTER INSERT OR UPDATE OF title, description, skill_id ON listings
+    FOR EACH ROW EXECUTE PROCEDURE listing_search_refresh_listing()""",
+    "DROP TRIGGER IF EXISTS listing_search_skill ON skills",
+    """CREATE TRIGGER listing_search_skill
+    AFTER UPDATE OF name, category ON skills
+    FOR EACH ROW EXECUTE PROCEDURE listing_search_refresh_skill()""",
+]
+
+POSTGRES_REBUILD = [
+    "DELETE FROM listing_search",
+    """INSERT INTO listing_search (listing_id, document)
+    SELECT listings.id, listing_search_document(listings.title, listings.description, skills.name, skills.category)
+    FROM listings JOIN skills ON skills.id = listings.skill_id""",
+]
+
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS listing_search_skill ON skills",
+    "DROP TRIGGER IF EXISTS listing_search_listing ON listings",
+    "DROP TABLE IF EXISTS listing_search",
+    "DROP FUNCTION IF EXISTS listing_search_refresh_skill()",
+    "DROP FUNCTION IF EXISTS listing_search_refresh_listing()",
+    "DROP FUNCTION IF EXISTS listing_search_document(TEXT, TEXT, TEXT, TEXT)",
+]
+
+
+def _statements(dialect, sqlite, postgres):
+    if dialect == 'sqlite':
+        return sqlite
+    if dialect == 'postgresql':
+        return postgres
+    return []
+
+
+def upgrade():
+    connection = op.get_bind()
+    statements = _statements(connection.dialect.name, SQLITE_DDL + SQLITE_REBUILD, POSTGRES_DDL + POSTGRES_REBUILD)
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def downgrade():
+    connection = op.get_bind()
+    for statement in _statements(connection.dialect.name, SQLITE_DROP, POSTGRES_DROP):
+        connection.exec_driver_sql(statement)
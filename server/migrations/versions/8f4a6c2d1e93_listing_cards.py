@@ -0,0 +1,201 @@
+"""listing cards
+
+Revision ID: 8f4a6c2d1e93
+Revises: ddb1818edf12
+Create Date: 2026-10-18 18:05:12.441902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f4a6c2d1e93'
+down_revision = 'ddb1818edf12'
+branch_labels = None
+depends_on = None
+
+
+# The trigger DDL as of this revision; listing_cards.py may move on, this
+# must not.
+CARD_COLUMNS = (
+    'listing_id, title, description, price_per_hour, user_id, skill_id, created_at, '
+    'skill_name, skill_category, teacher_username, teacher_bio, '
+    'teacher_rating_sum, teacher_rating_count, teacher_average_rating'
+)
+
+
+def _average(users):
+    return f'CASE WHEN {users}.rating_count > 0 THEN {users}.rating_sum * 1.0 / {users}.rating_count ELSE 0 END'
+
+
+def _card_select(listing):
+    """SELECT list of one card built from ``listing`` (a row alias) and the
+    joined ``skills`` and ``users`` rows."""
+    return (
+        f'{listing}.id, {listing}.title, {listing}.description, {listing}.price_per_hour, '
+        f'{listing}.user_id, {listing}.skill_id, {listing}.created_at, '
+        f'skills.name, skills.category, users.username, users.bio, '
+        f'users.rating_sum, users.rating_count, {_average("users")}'
+    )
+
+
+CARD_OF_NEW_LISTING = f"""
+    SELECT {_card_select('new')} FROM skills, users
+    WHERE skills.id = new.skill_id AND users.id = new.user_id"""
+
+TEACHER_UPDATE = f"""
+    UPDATE listing_cards SET teacher_username = new.username, teacher_bio = new.bio,
+        teacher_rating_sum = new.rating_sum, teacher_rating_count = new.rating_count,
+        teacher_average_rating = {_average('new')}
+    WHERE user_id = new.id"""
+
+SKILL_UPDATE = """
+    UPDATE listing_cards SET skill_name = new.name, skill_category = new.category
+    WHERE skill_id = new.id"""
+
+SQLITE_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_listing_insert AFTER INSERT ON listings BEGIN
+        INSERT OR REPLACE INTO listing_cards ({CARD_COLUMNS}) {CARD_OF_NEW_LISTING};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_listing_update AFTER UPDATE ON listings BEGIN
+        DELETE FROM listing_cards WHERE listing_id = old.id;
+        INSERT INTO listing_cards ({CARD_COLUMNS}) {CARD_OF_NEW_LISTING};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_cards_listing_delete AFTER DELETE ON listings BEGIN
+        DELETE FROM listing_cards WHERE listing_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_skill_update
+    AFTER UPDATE OF name, category ON skills BEGIN {SKILL_UPDATE};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listing_cards_user_update
+    AFTER UPDATE OF username, bio, rating_sum, rating_count ON users BEGIN {TEACHER_UPDATE};
+    END""",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS listing_cards_user_update",
+    "DROP TRIGGER IF EXISTS listing_cards_skill_update",
+    "DROP TRIGGER IF EXISTS listing_cards_listing_delete",
+    "DROP TRIGGER IF EXISTS listing_cards_listing_update",
+    "DROP TRIGGER IF EXISTS listing_cards_listing_insert",
+]
+
+# Deleting a listing cascades to its card through the foreign key
+POSTGRES_DDL = [
+    f"""CREATE OR REPLACE FUNCTION listing_cards_refresh_listing() RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO listing_cards ({CARD_COLUMNS}) {CARD_OF_NEW_LISTING}
+        ON CONFLICT (listing_id) DO UPDATE SET
+            title = EXCLUDED.title, description = EXCLUDED.description,
+            price_per_hour = EXCLUDED.price_per_hour, user_id = EXCLUDED.user_id,
+            skill_id = EXCLUDED.skill_id, created_at = EXCLUDED.created_at,
+            skill_name = EXCLUDED.skill_name, skill_category = EXCLUDED.skill_category,
+            teacher_username = EXCLUDED.teacher_username, teacher_bio = EXCLUDED.teacher_bio,
+            teacher_rating_sum = EXCLUDED.teacher_rating_sum, teacher_rating_count = EXCLUDED.teacher_rating_count,
+            teacher_average_rating = EXCLUDED.teacher_average_rating;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION listing_cards_refresh_skill() RETURNS TRIGGER AS $$
+    BEGIN
+        {SKILL_UPDATE};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION listing_cards_refresh_user() RETURNS TRIGGER AS $$
+    BEGIN
+        {TEACHER_UPDATE};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS listing_cards_listing ON listings",
+    """CREATE TRIGGER listing_cards_listing AFTER INSERT OR UPDATE ON listings
+    FOR EACH ROW EXECUTE PROCEDURE listing_cards_refresh_listing()""",
+    "DROP TRIGGER IF EXISTS listing_cards_skill ON skills",
+    """CREATE TRIGGER listing_cards_skill AFTER UPDATE OF name, category ON skills
+    FOR EACH ROW EXECUTE PROCEDURE listing_cards_refresh_skill()""",
+    "DROP TRIGGER IF EXISTS listing_cards_user ON users",
+    """CREATE TRIGGER listing_cards_user AFTER UPDATE OF username, bio, rating_sum, rating_count ON users
+    FOR EACH ROW EXECUTE PROCEDURE listing_cards_refresh_user()""",
+]
+
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS listing_cards_user ON users",
+    "DROP TRIGGER IF EXISTS listing_cards_skill ON skills",
+    "DROP TRIGGER IF EXISTS listing_cards_listing ON listings",
+    "DROP FUNCTION IF EXISTS listing_cards_refresh_user()",
+    "DROP FUNCTION IF EXISTS listing_cards_refresh_skill()",
+    "DROP FUNCTION IF EXISTS listing_cards_refresh_listing()",
+]
+
+REBUILD = [
+    "DELETE FROM listing_cards",
+    f"""INSERT INTO listing_cards ({CARD_COLUMNS})
+    SELECT {_card_select('listings')}
+    FROM listings
+    JOIN skills ON skills.id = listings.skill_id
+    JOIN users ON users.id = listings.user_id""",
+]
+
+
+def _statements(dialect, sqlite, postgres):
+    if dialect == 'sqlite':
+        return sqlite
+    if dialect == 'postgresql':
+        return postgres
+    return []
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('listing_cards',
+    sa.Column('listing_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('price_per_hour', sa.Float(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('skill_name', sa.String(length=100), nullable=False),
+    sa.Column('skill_category', sa.String(length=50), nullable=False),
+    sa.Column('teacher_username', sa.String(length=80), nullable=False),
+    sa.Column('teacher_bio', sa.Text(), nullable=True),
+    sa.Column('teacher_rating_sum', sa.Integer(), nullable=False),
+    sa.Column('teacher_rating_count', sa.Integer(), nullable=False),
+    sa.Column('teacher_average_rating', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('listing_id')
+    )
+    with op.batch_alter_table('listing_cards', schema=None) as batch_op:
+        batch_op.create_index('ix_listing_cards_created_at_listing_id', ['created_at', 'listing_id'], unique=False)
+        batch_op.create_index('ix_listing_cards_price_per_hour_listing_id', ['price_per_hour', 'listing_id'], unique=False)
+        batch_op.create_index('ix_listing_cards_teacher_average_rating_listing_id', ['teacher_average_rating', 'listing_id'], unique=False)
+        batch_op.create_index('ix_listing_cards_skill_id_created_at', ['skill_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_listing_cards_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_listing_cards_skill_category_created_at', ['skill_category', 'created_at'], unique=False)
+
+    # ### end Alembic commands ###
+
+    # Sync triggers on listings, skills and users, then fill from existing rows
+    connection = op.get_bind()
+    for statement in _statements(connection.dialect.name, SQLITE_DDL, POSTGRES_DDL) + REBUILD:
+        connection.exec_driver_sql(statement)
+
+
+def downgrade():
+    connection = op.get_bind()
+    for statement in _statements(connection.dialect.name, SQLITE_DROP, POSTGRES_DROP):
+        connection.exec_driver_sql(statement)
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('listing_cards', schema=None) as batch_op:
+        batch_op.drop_index('ix_listing_cards_skill_category_created_at')
+        batch_op.drop_index('ix_listing_cards_user_id_created_at')
+        batch_op.drop_index('ix_listing_cards_skill_id_created_at')
+        batch_op.drop_index('ix_listing_cards_teacher_average_rating_listing_id')
+        batch_op.drop_index('ix_listing_cards_price_per_hour_listing_id')
+        batch_op.drop_index('ix_listing_cards_created_at_listing_id')
+
+    op.drop_table('listing_cards')
+    # ### end Alembic commands ###
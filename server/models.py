@@ -1,13 +1,21 @@
 import os
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from flask_bcrypt import Bcrypt
+from sqlalchemy import bindparam, update
 from database import db
+from search import register_search_index
+from listing_cards import register_listing_cards
+import passwords
 
-bcrypt = Bcrypt()
+PROFICIENCY_LEVELS = ('beginner', 'intermediate', 'advanced', 'expert')
 
 class UserSkill(db.Model):
     __tablename__ = 'user_skills'
+    __table_args__ = (
+        db.Index('ix_user_skills_user_id_skill_id', 'user_id', 'skill_id'),
+        db.Index('ix_user_skills_proficiency_level_user_id', 'proficiency_level', 'user_id'),
+        db.Index('ix_user_skills_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -15,6 +23,8 @@ class UserSkill(db.Model):
     proficiency_level = db.Column(db.String(50))
     years_experience = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Lets every worker's recommendation index see in-place edits
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     user = db.relationship('User', backref='user_skills')
     skill = db.relationship('Skill', backref='user_skills')
@@ -29,27 +39,68 @@ class User(db.Model):
     bio = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     listings = db.relationship('Listing', backref='user', lazy=True)
     reviews_given = db.relationship('Review', foreign_keys='Review.reviewer_id', backref='reviewer', lazy=True)
     reviews_received = db.relationship('Review', foreign_keys='Review.reviewee_id', backref='reviewee', lazy=True)
     
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = passwords.hash_password(password)
     
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'bio': self.bio,
-            'created_at': self.created_at.isoformat()
-        }
+        return passwords.check_password(self.password_hash, password)
+    
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.rating_count, 1) if self.rating_count else 0
+    
+    @property
+    def rating_histogram(self):
+        return {str(star): getattr(self, f'rating_{star}_count') for star in range(1, 6)}
+    
+    @classmethod
+    def record_rating(cls, user_id, rating):
+        cls.record_ratings([(user_id, rating)])
+    
+    @classmethod
+    def record_ratings(cls, ratings):
+        """Add ``(user_id, rating)`` pairs to the aggregates in one executemany."""
+        deltas = {}
+        for user_id, rating in ratings:
+            row = deltas.setdefault(user_id, dict(
+                {'user_id': user_id, 'add_sum': 0, 'add_count': 0},
+                **{f'add_{star}': 0 for star in range(1, 6)}
+            ))
+            row['add_sum'] += rating
+            row['add_count'] += 1
+            row[f'add_{rating}'] += 1
+        if not deltas:
+            return
+        
+        # Increment in SQL so concurrent reviews for the same user don't lose updates
+        users = cls.__table__
+        db.session.execute(
+            update(users).where(users.c.id == bindparam('user_id')).values(
+                rating_sum=users.c.rating_sum + bindparam('add_sum'),
+                rating_count=users.c.rating_count + bindparam('add_count'),
+                **{f'rating_{star}_count': users.c[f'rating_{star}_count'] + bindparam(f'add_{star}')
+                   for star in range(1, 6)}
+            ),
+            list(deltas.values())
+        )
 
 class Skill(db.Model):
     __tablename__ = 'skills'
+    __table_args__ = (
+        db.Index('ix_skills_category', 'category'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
@@ -68,6 +119,11 @@ class Skill(db.Model):
 
 class Listing(db.Model):
     __tablename__ = 'listings'
+    __table_args__ = (
+        db.Index('ix_listings_created_at_id', 'created_at', 'id'),
+        db.Index('ix_listings_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_listings_skill_id_created_at', 'skill_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -76,20 +132,14 @@ class Listing(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'price_per_hour': self.price_per_hour,
-            'user_id': self.user_id,
-            'skill_id': self.skill_id,
-            'created_at': self.created_at.isoformat()
-        }
 
 class Session(db.Model):
     __tablename__ = 'sessions'
+    __table_args__ = (
+        db.Index('ix_sessions_teacher_id_scheduled_date', 'teacher_id', 'scheduled_date'),
+        db.Index('ix_sessions_student_id_scheduled_date', 'student_id', 'scheduled_date'),
+        db.Index('ix_sessions_listing_id', 'listing_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -104,22 +154,15 @@ class Session(db.Model):
     student = db.relationship('User', foreign_keys=[student_id], backref='sessions_as_student')
     teacher = db.relationship('User', foreign_keys=[teacher_id], backref='sessions_as_teacher')
     listing = db.relationship('Listing', backref='sessions')
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'student_id': self.student_id,
-            'teacher_id': self.teacher_id,
-            'listing_id': self.listing_id,
-            'scheduled_date': self.scheduled_date.isoformat(),
-            'duration_hours': self.duration_hours,
-            'status': self.status,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat()
-        }
 
 class Review(db.Model):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        db.Index('ix_reviews_reviewee_id_created_at', 'reviewee_id', 'created_at'),
+        db.Index('ix_reviews_reviewer_id_created_at', 'reviewer_id', 'created_at'),
+        db.Index('ix_reviews_session_id_reviewer_id', 'session_id', 'reviewer_id'),
+        db.Index('ix_reviews_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     rating = db.Column(db.Integer, nullable=False)
@@ -130,14 +173,63 @@ class Review(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     session = db.relationship('Session', backref='reviews')
+
+class ExpertRanking(db.Model):
+    """Precomputed experts leaderboard, rebuilt by leaderboard.py.
+
+    One row per expert per skill category plus one row per expert with a
+    NULL category for the overall ranking.
+    """
+    __tablename__ = 'expert_rankings'
+    __table_args__ = (
+        db.Index('ix_expert_rankings_category_rank', 'category', 'rank'),
+    )
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'rating': self.rating,
-            'comment': self.comment,
-            'reviewer_id': self.reviewer_id,
-            'reviewee_id': self.reviewee_id,
-            'session_id': self.session_id,
-            'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50))
+    rank = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    average_rating = db.Column(db.Float, nullable=False)
+    review_count = db.Column(db.Integer, nullable=False)
+    proficiency_score = db.Column(db.Integer, nullable=False)
+    years_experience = db.Column(db.Integer, nullable=False)
+    listings_count = db.Column(db.Integer, nullable=False)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+    
+    user = db.relationship('User')
+
+class ListingCard(db.Model):
+    """Denormalized listing with its skill and teacher, the read model of
+    GET /api/listings.
+
+    Written only by the triggers in listing_cards.py and rebuilt from
+    scratch with ``python listing_cards.py``.
+    """
+    __tablename__ = 'listing_cards'
+    __table_args__ = (
+        db.Index('ix_listing_cards_created_at_listing_id', 'created_at', 'listing_id'),
+        db.Index('ix_listing_cards_price_per_hour_listing_id', 'price_per_hour', 'listing_id'),
+        db.Index('ix_listing_cards_teacher_average_rating_listing_id', 'teacher_average_rating', 'listing_id'),
+        db.Index('ix_listing_cards_skill_id_created_at', 'skill_id', 'created_at'),
+        db.Index('ix_listing_cards_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_listing_cards_skill_category_created_at', 'skill_category', 'created_at'),
+    )
+    
+    listing_id = db.Column(db.Integer, db.ForeignKey('listings.id', ondelete='CASCADE'), primary_key=True,
+                           autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    price_per_hour = db.Column(db.Float, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    skill_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime)
+    skill_name = db.Column(db.String(100), nullable=False)
+    skill_category = db.Column(db.String(50), nullable=False)
+    teacher_username = db.Column(db.String(80), nullable=False)
+    teacher_bio = db.Column(db.Text)
+    teacher_rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    teacher_rating_count = db.Column(db.Integer, nullable=False, default=0)
+    teacher_average_rating = db.Column(db.Float, nullable=False, default=0)
+
+register_search_index(db.metadata)
+register_listing_cards(db.metadata)
\ No newline at end of file
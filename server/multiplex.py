@@ -0,0 +1,198 @@
+import os
+import threading
+from http import HTTPStatus
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, request
+from flask_jwt_extended import decode_token
+from sqlalchemy.pool import StaticPool
+from werkzeug.test import EnvironBuilder
+from batch import get_batch_items, BatchResults, BatchError
+from database import db
+
+METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+BATCH_PATH = '/api/batch'
+
+
+def _item_error(item):
+    method = item.get('method', 'GET')
+    path = item.get('path')
+    if not isinstance(method, str) or method.upper() not in METHODS:
+        return f"method must be one of: {', '.join(METHODS)}"
+    if not isinstance(path, str) or not path.startswith('/api/'):
+        return 'path must be an API path starting with /api/'
+    if path.split('?')[0].rstrip('/') == BATCH_PATH:
+        return 'Batches cannot be nested'
+    return None
+
+
+class Multiplexer:
+    """Runs the sub-requests of POST /api/batch through the app's own views.
+
+    Sub-requests are dispatched in order. Writes run on the request thread
+    in the batch's DB session, so later sub-requests see them; each run of
+    consecutive GETs between writes is fanned out to a thread pool, one
+    session per thread since sessions can't be shared across threads.
+    Fan-out threads only take the pooled connections the request threads
+    leave free, counted by a per-process semaphore: a batch that can't
+    claim any runs its reads in order on its own session rather than
+    waiting out the pool timeout.
+    Before/after request hooks (metrics, instrumentation, compression) run
+    once, for the batch as a whole.
+    """
+
+    def __init__(self, app=None):
+        self.max_requests = 20
+        self.workers = 4
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._pool = None
+        self._slots = None
+        self._pool_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_requests = app.config.get('BATCH_MAX_REQUESTS', 20)
+        self.workers = app.config.get('BATCH_WORKERS', 4)
+        options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        threads = app.config.get('WEB_THREADS', 4)
+        if 'pool_size' in options:
+            # Every request thread may be holding a connection of its own
+            self.connections = max(options['pool_size'] + options.get('max_overflow', 0) - threads, 0)
+        else:
+            self.connections = threads * self.workers
+        app.extensions['multiplexer'] = self
+
+    def _get_pool(self):
+        with self._lock:
+            # A pool inherited through fork (gunicorn --preload) has no live threads
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch')
+                self._slots = threading.BoundedSemaphore(self.connections)
+                self._pool_pid = os.getpid()
+            return self._pool, self._slots
+
+    def _claim(self, slots, wanted):
+        """Take up to ``wanted`` free connection slots without waiting."""
+        claimed = 0
+        while claimed < wanted and slots.acquire(blocking=False):
+            claimed += 1
+        return claimed
+
+    def token(self):
+        """The batch's bearer token, or None."""
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        return token if scheme.lower() == 'bearer' and token else None
+
+    def verify(self):
+        """Decode the batch's token once up front, so a bad or expired token
+        fails the whole batch with the usual JWT error instead of every item."""
+        token = self.token()
+        if token is not None:
+            decode_token(token)
+
+    def requested(self):
+        items = get_batch_items()
+        if len(items) > self.max_requests:
+            raise BatchError(f'A batch can contain at most {self.max_requests} requests')
+        return items
+
+    def _environ(self, item):
+        headers = {'Accept': 'application/json'}
+        if request.headers.get('Authorization'):
+            headers['Authorization'] = request.headers['Authorization']
+        builder = EnvironBuilder(
+            path=item['path'],
+            method=item.get('method', 'GET').upper(),
+            json=item.get('body'),
+            headers=headers,
+            environ_base={'REMOTE_ADDR': request.remote_addr},
+        )
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+        return environ
+
+    def _dispatch(self, app, environ, session=None, primary=False):
+        # A fresh app context keeps each sub-request's ``g`` to itself;
+        # ``session`` lends it the batch's DB session for the duration
+        with app.app_context():
+            if session is not None:
+                db.session.registry.set(session)
+            elif primary:
+                # Read what the batch wrote, not a lagging replica
+                db.session().info['replica_wrote'] = True
+            try:
+                with app.request_context(environ):
+                    try:
+                        response = app.full_dispatch_request()
+                    except Exception as e:
+                        print(f"Batch sub-request error: {e}")
+                        return 500, None
+                    body = response.get_json(silent=True) if response.is_json else None
+                    return response.status_code, body
+            finally:
+                if session is not None:
+                    # Leave the batch's session open for the next sub-request
+                    db.session.registry.clear()
+
+    def dispatch(self, items):
+        """Run ``items`` and collect their outcomes as :class:`BatchResults`."""
+        app = current_app._get_current_object()
+        session = db.session()
+        # One in-memory SQLite connection (StaticPool) can't serve threads at once
+        concurrent = self.workers > 0 and not isinstance(db.engine.pool, StaticPool)
+
+        results = BatchResults(len(items))
+        reads = []
+
+        def record(index, status, body):
+            if status < 400:
+                results.ok(index, status, body=body)
+            else:
+                # Views answer {'error': ...}; flask-jwt-extended answers {'msg': ...}
+                error = (body.get('error') or body.get('msg')) if isinstance(body, dict) else None
+                results.fail(index, error or HTTPStatus(status).phrase, status)
+
+        def run_share(share, primary):
+            return [(index, *self._dispatch(app, environ, primary=primary)) for index, environ in share]
+
+        def run_reads():
+            claimed = 0
+            if concurrent and len(reads) > 1:
+                pool, slots = self._get_pool()
+                claimed = self._claim(slots, min(len(reads), self.workers))
+            try:
+                if claimed > 1:
+                    # One thread per claimed connection, each running its share in turn
+                    primary = session.info.get('replica_wrote', False)
+                    futures = [pool.submit(run_share, reads[start::claimed], primary) for start in range(claimed)]
+                    for future in futures:
+                        for index, status, body in future.result():
+                            record(index, status, body)
+                else:
+                    for index, environ in reads:
+                        record(index, *self._dispatch(app, environ, session))
+            finally:
+                for _ in range(claimed):
+                    slots.release()
+            reads.clear()
+
+        for index, item in enumerate(items):
+            error = _item_error(item)
+            if error:
+                results.fail(index, error)
+                continue
+            environ = self._environ(item)
+            if environ['REQUEST_METHOD'] == 'GET':
+                reads.append((index, environ))
+                continue
+            # A write waits for the reads before it and is seen by the ones after
+            run_reads()
+            record(index, *self._dispatch(app, environ, session))
+        run_reads()
+        return results
+
+
+multiplexer = Multiplexer()
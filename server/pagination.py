@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import tuple_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def get_limit(default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    raw = request.args.get('limit')
+    if raw is None or raw == '':
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be at least 1')
+    return min(limit, maximum)
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError
+        values = []
+        for column, value in zip(columns, payload):
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        raise PaginationError('Invalid cursor')
+
+
+def keyset(query, columns, descending=False):
+    """Order ``query`` on ``columns``, resuming after ``?cursor=`` if given."""
+    cursor = request.args.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if descending:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+    if descending:
+        return query.order_by(*[column.desc() for column in columns])
+    return query.order_by(*columns)
+
+
+def paginate(query, columns, key=None, descending=False):
+    """Keyset-paginate ``query`` on ``columns`` using ``?limit=&cursor=``.
+
+    ``columns`` must end with a unique column (normally the primary key) so
+    the ordering is total. ``key`` extracts the cursor values from a result
+    row and defaults to reading the column attributes off an ORM instance.
+    ``descending`` walks every column from high to low.
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    limit = get_limit()
+    rows = keyset(query, columns, descending).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = row_cursor(rows[-1], columns, key)
+
+    return rows, next_cursor
+
+
+def row_cursor(row, columns, key=None):
+    """The cursor resuming after ``row``; ``key`` as for :func:`paginate`."""
+    if key is None:
+        values = [getattr(row, column.key) for column in columns]
+    else:
+        values = key(row)
+    return encode_cursor(values)
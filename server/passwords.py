@@ -0,0 +1,87 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+import bcrypt
+from flask import current_app, has_app_context
+
+DEFAULTS = {
+    'BCRYPT_LOG_ROUNDS': 12,
+    'PASSWORD_HASH_WORKERS': 2,
+    'PASSWORD_HASH_QUEUE_DEPTH': 16,
+    'PASSWORD_HASH_TIMEOUT': 5.0,
+}
+
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+_slots = None
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password_hash, password):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def _setting(name):
+    if has_app_context():
+        return current_app.config.get(name, DEFAULTS[name])
+    return DEFAULTS[name]
+
+
+def _get_pool():
+    global _pool, _pool_pid, _slots
+    with _lock:
+        # A pool inherited through fork (gunicorn --preload) has no live workers
+        if _pool is None or _pool_pid != os.getpid():
+            workers = _setting('PASSWORD_HASH_WORKERS')
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(_setting('PASSWORD_HASH_QUEUE_DEPTH'))
+        return _pool, _slots
+
+
+def _run(func, *args):
+    if _setting('PASSWORD_HASH_WORKERS') <= 0:
+        return func(*args)
+
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy('Too many password operations in progress')
+    try:
+        future = pool.submit(func, *args)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=_setting('PASSWORD_HASH_TIMEOUT'))
+    except TimeoutError:
+        future.cancel()
+        raise PasswordHasherBusy('Password operation timed out')
+
+
+def hash_password(password):
+    return _run(_hash, password, _setting('BCRYPT_LOG_ROUNDS'))
+
+
+def check_password(password_hash, password):
+    return _run(_check, password_hash, password)
+
+
+def shutdown():
+    global _pool, _pool_pid, _slots
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_pid = None
+        _slots = None
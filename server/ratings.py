@@ -0,0 +1,41 @@
+import sys
+import os
+from sqlalchemy import func, update
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import db
+from models import User, Review
+
+RATING_COLUMNS = ['rating_sum', 'rating_count'] + [f'rating_{star}_count' for star in range(1, 6)]
+
+def rebuild_rating_aggregates():
+    totals = {}
+    stats = db.session.query(
+        Review.reviewee_id, Review.rating, func.count(Review.id)
+    ).group_by(Review.reviewee_id, Review.rating).all()
+    
+    for user_id, rating, count in stats:
+        row = totals.setdefault(user_id, dict.fromkeys(RATING_COLUMNS, 0))
+        row['rating_sum'] += rating * count
+        row['rating_count'] += count
+        star = min(max(int(round(rating)), 1), 5)
+        row[f'rating_{star}_count'] += count
+    
+    db.session.query(User).update(dict.fromkeys(RATING_COLUMNS, 0), synchronize_session=False)
+    if totals:
+        db.session.execute(update(User), [dict(id=user_id, **row) for user_id, row in totals.items()])
+    db.session.commit()
+    return len(totals)
+
+if __name__ == "__main__":
+    from app import app
+    
+    with app.app_context():
+        try:
+            updated = rebuild_rating_aggregates()
+            print(f"✅ Rating aggregates rebuilt for {updated} users")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error rebuilding rating aggregates: {e}")
+            sys.exit(1)
@@ -0,0 +1,348 @@
+import time
+import threading
+from datetime import timedelta
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, or_
+from database import db
+from models import User, UserSkill, Listing, Session, Review
+from scheduling import INACTIVE_STATUSES
+
+# Users are rows and skills columns of two sparse matrices held per process:
+# what each user can teach (proficiency, years, listings, sessions taught) and
+# what each user wants to learn (sessions booked, beginner/intermediate
+# skills). Teachers are ranked by cosine similarity between the learner's
+# interest row and every teaching row, weighted by a Bayesian average rating.
+
+PROFICIENCY_WEIGHTS = {'beginner': 1.0, 'intermediate': 2.0, 'advanced': 3.0, 'expert': 4.0}
+LEARNING_LEVELS = ('beginner', 'intermediate')
+LISTING_WEIGHT = 2.0
+BOOKING_WEIGHT = 2.0
+# Shrink averages from few reviews towards the prior
+RATING_PRIOR_MEAN = 3.5
+RATING_PRIOR_COUNT = 5
+# Past this many changed users a full rebuild is cheaper than patching rows
+MAX_INCREMENTAL_USERS = 1000
+
+WATERMARK_TABLES = {
+    'users': (User.id, (User.id,)),
+    'user_skills': (UserSkill.id, (UserSkill.user_id,)),
+    'listings': (Listing.id, (Listing.user_id,)),
+    'sessions': (Session.id, (Session.student_id, Session.teacher_id)),
+    'reviews': (Review.id, (Review.reviewee_id,)),
+}
+# Rows edited in place are found by updated_at, shared by every worker.
+# (Rating aggregates only move along with a new review, which the reviews
+# watermark already sees.) Rows stamped up to UPDATE_OVERLAP before the last
+# mark are read again, since a transaction can commit after a later one did.
+UPDATED_TABLES = {
+    'user_skills': (UserSkill.id, UserSkill.updated_at, (UserSkill.user_id,)),
+}
+UPDATE_OVERLAP = timedelta(seconds=60)
+
+def _triplets(rows):
+    rows = list(rows)
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64)
+    users, skills, weights = zip(*rows)
+    return np.array(users, np.int64), np.array(skills, np.int64), np.array(weights, np.float64)
+
+
+def _filtered(query, column, user_ids):
+    return query if user_ids is None else query.filter(column.in_(user_ids))
+
+
+def load_vectors(user_ids=None):
+    """Read teaching and interest weights for ``user_ids`` (or everyone)."""
+    teaching, interests = [], []
+
+    skills = _filtered(db.session.query(
+        UserSkill.user_id, UserSkill.skill_id, UserSkill.proficiency_level, UserSkill.years_experience
+    ), UserSkill.user_id, user_ids)
+    for user_id, skill_id, level, years in skills:
+        weight = PROFICIENCY_WEIGHTS.get(level, 1.0) * (1 + np.log1p(years or 0) / 3)
+        teaching.append((user_id, skill_id, weight))
+        if level in LEARNING_LEVELS:
+            interests.append((user_id, skill_id, 1.0))
+
+    listings = _filtered(db.session.query(Listing.user_id, Listing.skill_id).distinct(), Listing.user_id, user_ids)
+    teachers = set()
+    for user_id, skill_id in listings:
+        teaching.append((user_id, skill_id, LISTING_WEIGHT))
+        teachers.add(user_id)
+
+    active = or_(Session.status.is_(None), Session.status.notin_(INACTIVE_STATUSES))
+    for role, rows in ((Session.teacher_id, teaching), (Session.student_id, interests)):
+        history = _filtered(db.session.query(role, Listing.skill_id, func.count(Session.id))
+                            .join(Listing, Session.listing_id == Listing.id)
+                            .filter(active)
+                            .group_by(role, Listing.skill_id), role, user_ids)
+        weight = 1.0 if rows is teaching else BOOKING_WEIGHT
+        rows.extend((user_id, skill_id, weight * np.log1p(count)) for user_id, skill_id, count in history)
+
+    ratings = {user_id: (rating_sum, rating_count) for user_id, rating_sum, rating_count in
+               _filtered(db.session.query(User.id, User.rating_sum, User.rating_count), User.id, user_ids)}
+    return _triplets(teaching), _triplets(interests), teachers, ratings
+
+
+class Snapshot:
+    """Immutable compiled matrices; readers keep using the old one while a
+    refresh builds its replacement."""
+
+    def __init__(self, user_ids, skill_ids, teaching, interests, teachers, rating_weights):
+        self.user_ids = user_ids
+        self.user_rows = {user_id: row for row, user_id in enumerate(user_ids.tolist())}
+        self.skill_ids = skill_ids
+        self.teachers = teachers
+        self.rating_weights = rating_weights
+
+        rows, cols, vals = teaching
+        # Column-major teaching matrix: one slice per skill lists its teachers
+        order = np.argsort(cols, kind='stable')
+        self.teach_rows, self.teach_vals = rows[order], vals[order]
+        self.teach_colptr = np.searchsorted(cols[order], np.arange(len(skill_ids) + 1))
+        self.teach_norms = np.sqrt(np.bincount(rows, vals ** 2, minlength=len(user_ids)))
+
+        rows, cols, vals = interests
+        # Row-major interest matrix: one slice per learner
+        order = np.argsort(rows, kind='stable')
+        self.interest_cols, self.interest_vals = cols[order], vals[order]
+        self.interest_rowptr = np.searchsorted(rows[order], np.arange(len(user_ids) + 1))
+
+    def interest_row(self, user_id):
+        row = self.user_rows.get(user_id)
+        if row is None:
+            return np.empty(0, np.int64), np.empty(0, np.float64)
+        start, end = self.interest_rowptr[row], self.interest_rowptr[row + 1]
+        return self.interest_cols[start:end], self.interest_vals[start:end]
+
+    def similarities(self, user_ids):
+        """Cosine similarity of each learner in ``user_ids`` to every user,
+        as a ``len(user_ids) x users`` array."""
+        batch = [self.interest_row(user_id) for user_id in user_ids]
+        support = np.unique(np.concatenate([cols for cols, _ in batch] + [np.empty(0, np.int64)]))
+        queries = np.zeros((len(batch), len(support)))
+        for i, (cols, vals) in enumerate(batch):
+            queries[i, np.searchsorted(support, cols)] = vals
+
+        dots = np.zeros((len(batch), len(self.user_ids)))
+        for j, col in enumerate(support):
+            start, end = self.teach_colptr[col], self.teach_colptr[col + 1]
+            dots[:, self.teach_rows[start:end]] += np.outer(queries[:, j], self.teach_vals[start:end])
+
+        learner_norms = np.linalg.norm(queries, axis=1)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = dots / (learner_norms * self.teach_norms[None, :])
+        return np.nan_to_num(similarity, nan=0.0, posinf=0.0)
+
+    def shared_skills(self, user_id, teacher_row):
+        cols, _ = self.interest_row(user_id)
+        shared = []
+        for col in cols.tolist():
+            start, end = self.teach_colptr[col], self.teach_colptr[col + 1]
+            if teacher_row in self.teach_rows[start:end]:
+                shared.append(int(self.skill_ids[col]))
+        return shared
+
+
+def _rating_weight(rating_sum, rating_count):
+    average = (rating_sum + RATING_PRIOR_MEAN * RATING_PRIOR_COUNT) / (rating_count + RATING_PRIOR_COUNT)
+    return average / 5
+
+
+class RecommendationIndex:
+    """Per-process recommendation matrices.
+
+    Refreshes and rebuilds run on a background thread and swap the new
+    snapshot in whole; requests keep ranking against the current one
+    meanwhile. Only the very first build is waited for.
+    """
+
+    def __init__(self, app=None):
+        self.snapshot = None
+        self.raw = None
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.refreshing = False
+        self.worker = None
+        self.refresh_seconds = 5
+        self.rebuild_seconds = 3600
+        self.built_at = None
+        self.checked_at = None
+        self.watermarks = {}
+        self.updated = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get('RECOMMENDATIONS_REFRESH_SECONDS', 5)
+        self.rebuild_seconds = app.config.get('RECOMMENDATIONS_REBUILD_SECONDS', 3600)
+        app.extensions['recommendations'] = self
+
+    def _watermarks(self):
+        return {table: db.session.query(func.max(id_column)).scalar() or 0
+                for table, (id_column, _) in WATERMARK_TABLES.items()}
+
+    def _changed_users(self, watermarks, updated):
+        """Users with rows inserted past ``watermarks`` or stamped since
+        ``updated``; both are advanced in place."""
+        # Ids only grow, so rows past the last watermark are the new writes from every worker
+        changed = set()
+        for table, (id_column, user_columns) in WATERMARK_TABLES.items():
+            rows = db.session.query(id_column, *user_columns).filter(id_column > watermarks.get(table, 0))
+            for id_value, *user_ids in rows:
+                watermarks[table] = max(watermarks.get(table, 0), id_value)
+                changed.update(user_ids)
+
+        for table, (id_column, updated_column, user_columns) in UPDATED_TABLES.items():
+            mark, seen = updated.get(table, (None, {}))
+            rows = db.session.query(id_column, updated_column, *user_columns).filter(updated_column.isnot(None))
+            if mark is not None:
+                rows = rows.filter(updated_column > mark - UPDATE_OVERLAP)
+            recent = {}
+            for id_value, updated_at, *user_ids in rows:
+                # Rows already applied at this stamp come back within the overlap
+                if seen.get(id_value) != updated_at:
+                    changed.update(user_ids)
+                recent[id_value] = updated_at
+            mark = max(recent.values(), default=mark)
+            updated[table] = (mark, {id_value: updated_at for id_value, updated_at in recent.items()
+                                     if updated_at > mark - UPDATE_OVERLAP})
+        return changed
+
+    def _compile(self, user_ids, skill_ids, teaching, interests, teachers, ratings):
+        user_ids = np.array(sorted(user_ids), np.int64)
+        skill_ids = np.array(sorted(skill_ids), np.int64)
+
+        def to_matrix(triplets):
+            users, skills, weights = triplets
+            rows = np.searchsorted(user_ids, users)
+            cols = np.searchsorted(skill_ids, skills)
+            # Several sources can weight the same (user, skill); sum them
+            keys, inverse = np.unique(rows * len(skill_ids) + cols, return_inverse=True)
+            return keys // len(skill_ids), keys % len(skill_ids), np.bincount(inverse, weights)
+
+        totals = np.zeros((len(user_ids), 2))
+        if ratings:
+            rated = np.fromiter(ratings, np.int64, len(ratings))
+            totals[np.searchsorted(user_ids, rated)] = np.array(list(ratings.values()), np.float64)
+        rating_weights = _rating_weight(totals[:, 0], totals[:, 1])
+        is_teacher = np.isin(user_ids, np.array(sorted(teachers), np.int64))
+        return Snapshot(user_ids, skill_ids, to_matrix(teaching), to_matrix(interests), is_teacher, rating_weights)
+
+    def _compile_raw(self, raw):
+        teaching, interests, teachers, ratings = raw
+        user_ids = set(ratings) | set(teaching[0].tolist()) | set(interests[0].tolist())
+        skill_ids = set(teaching[1].tolist()) | set(interests[1].tolist())
+        return self._compile(user_ids, skill_ids, teaching, interests, teachers, ratings)
+
+    def _swap(self, raw, snapshot, watermarks, updated):
+        with self.lock:
+            self.raw, self.snapshot = raw, snapshot
+            self.watermarks, self.updated = watermarks, updated
+
+    def rebuild(self):
+        # Marks first: a write landing during the read is picked up next time
+        watermarks, updated = self._watermarks(), {}
+        self._changed_users(dict(watermarks), updated)
+        raw = load_vectors()
+        self._swap(raw, self._compile_raw(raw), watermarks, updated)
+        self.built_at = self.checked_at = time.monotonic()
+
+    def refresh(self):
+        with self.lock:
+            raw = self.raw
+            watermarks = dict(self.watermarks)
+            updated = dict(self.updated)
+        changed = self._changed_users(watermarks, updated)
+        if not changed:
+            self._swap(raw, self.snapshot, watermarks, updated)
+            return
+        if len(changed) > MAX_INCREMENTAL_USERS:
+            self.rebuild()
+            return
+
+        ids = sorted(changed)
+        new_teaching, new_interests, new_teachers, new_ratings = load_vectors(ids)
+        teaching, interests, teachers, ratings = raw
+        changed_array = np.array(ids, np.int64)
+
+        def replace(old, new):
+            keep = ~np.isin(old[0], changed_array)
+            return tuple(np.concatenate([o[keep], n]) for o, n in zip(old, new))
+
+        raw = (
+            replace(teaching, new_teaching),
+            replace(interests, new_interests),
+            (teachers - changed) | new_teachers,
+            {**ratings, **new_ratings}
+        )
+        self._swap(raw, self._compile_raw(raw), watermarks, updated)
+
+    def _run(self, app, rebuild):
+        try:
+            with app.app_context():
+                if rebuild:
+                    self.rebuild()
+                else:
+                    self.refresh()
+        except Exception as e:
+            print(f"Recommendation refresh error: {e}")
+        finally:
+            self.refreshing = False
+
+    def current(self):
+        if self.snapshot is None:
+            # Nothing to serve yet: the first caller builds, the rest wait for it
+            with self.build_lock:
+                if self.snapshot is None:
+                    self.rebuild()
+            return self.snapshot
+
+        now = time.monotonic()
+        with self.lock:
+            # Claim the refresh so only one thread runs it
+            rebuild = now - self.built_at > self.rebuild_seconds
+            due = not self.refreshing and (rebuild or now - self.checked_at > self.refresh_seconds)
+            if due:
+                self.refreshing = True
+                self.checked_at = now
+        if due:
+            app = current_app._get_current_object()
+            self.worker = threading.Thread(target=self._run, args=(app, rebuild),
+                                           name='recommendations', daemon=True)
+            self.worker.start()
+        return self.snapshot
+
+    def recommend(self, user_ids, limit):
+        """Top ``limit`` teachers for each learner in ``user_ids``.
+
+        Returns one list of ``(teacher_id, score, shared_skill_ids)`` per
+        learner. Learners with no interests yet get the best-rated teachers.
+        """
+        snapshot = self.current()
+        similarity = snapshot.similarities(user_ids)
+        results = []
+        for i, user_id in enumerate(user_ids):
+            scores = similarity[i] * snapshot.rating_weights
+            if not scores.any():
+                scores = snapshot.rating_weights.copy()
+            scores[~snapshot.teachers] = -np.inf
+            own_row = snapshot.user_rows.get(user_id)
+            if own_row is not None:
+                scores[own_row] = -np.inf
+
+            k = min(limit, int(np.isfinite(scores).sum()))
+            if k == 0:
+                results.append([])
+                continue
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            results.append([
+                (int(snapshot.user_ids[row]), float(scores[row]), snapshot.shared_skills(user_id, row))
+                for row in top.tolist()
+            ])
+        return results
+
+
+recommendation_index = RecommendationIndex()
@@ -0,0 +1,123 @@
+import itertools
+import threading
+import time
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+# Seconds the replica is behind the primary; 0 when it has replayed
+# everything it received (an idle primary leaves the replay timestamp old)
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+READ_METHODS = ('GET', 'HEAD')
+
+
+class ReplicaRouter:
+    """Sends reads of GET requests on the catalog blueprints to read replicas.
+
+    Each request sticks to one replica, picked round-robin among those whose
+    lag is within ``REPLICA_MAX_LAG_SECONDS`` (checked at most every
+    ``REPLICA_LAG_CHECK_SECONDS``); with none in bounds it reads the primary.
+    Everything else, and every read after the request's first write, uses
+    the primary.
+    """
+
+    def __init__(self, app=None):
+        self.keys = []
+        self.blueprints = ()
+        self.max_lag = 5
+        self.check_seconds = 1
+        self.lag = {}
+        self.checked_at = {}
+        self.lock = threading.Lock()
+        self.turn = itertools.count()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.keys = [key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica_')]
+        self.blueprints = tuple(app.config.get('READ_REPLICA_BLUEPRINTS', ()))
+        self.max_lag = app.config.get('REPLICA_MAX_LAG_SECONDS', 5)
+        self.check_seconds = app.config.get('REPLICA_LAG_CHECK_SECONDS', 1)
+        app.extensions['replicas'] = self
+
+    def measure_lag(self, engine):
+        if engine.dialect.name != 'postgresql':
+            # Nothing to measure (e.g. two SQLite files kept in sync by hand)
+            return 0
+        with engine.connect() as conn:
+            return float(conn.execute(POSTGRES_LAG_SQL).scalar() or 0)
+
+    def healthy(self, key, engine):
+        now = time.monotonic()
+        with self.lock:
+            # Claim the check so other threads keep using the last result
+            # instead of queueing behind a slow replica
+            due = now - self.checked_at.get(key, float('-inf')) >= self.check_seconds
+            if due:
+                self.checked_at[key] = now
+        if due:
+            try:
+                lag = self.measure_lag(engine)
+            except Exception as e:
+                print(f"Replica {key} unavailable: {e}")
+                lag = float('inf')
+            with self.lock:
+                self.lag[key] = lag
+        # Unmeasured yet (first check still running elsewhere): use the primary
+        return self.lag.get(key, float('inf')) <= self.max_lag
+
+    def pick(self, engines):
+        """The replica key for this request, or None to use the primary."""
+        if not self.keys:
+            return None
+        start = next(self.turn)
+        for offset in range(len(self.keys)):
+            key = self.keys[(start + offset) % len(self.keys)]
+            if self.healthy(key, engines[key]):
+                return key
+        return None
+
+    def allowed(self):
+        return (
+            bool(self.keys)
+            and has_request_context()
+            and request.method in READ_METHODS
+            and request.blueprint in self.blueprints
+        )
+
+
+def served_by_replica(session):
+    """Whether ``session`` has read from a replica during this request."""
+    return session.info.get('replica_key') is not None
+
+
+class RoutingSession(Session):
+    """``db.session`` that can read from a replica; see :class:`ReplicaRouter`."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._writing(clause):
+            replica = self._replica()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _writing(self, clause):
+        # Once a request writes, it reads its own writes from the primary
+        if self._flushing or getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None:
+            self.info['replica_wrote'] = True
+        return self.info.get('replica_wrote', False)
+
+    def _replica(self):
+        router = current_app.extensions.get('replicas') if has_request_context() else None
+        if router is None or not router.allowed():
+            return None
+        if 'replica_key' not in self.info:
+            self.info['replica_key'] = router.pick(self._db.engines)
+        key = self.info['replica_key']
+        return self._db.engines[key] if key is not None else None
+
+
+replica_router = ReplicaRouter()
@@ -4,5 +4,6 @@ from .listings import listings_bp
 from .sessions import sessions_bp
 from .reviews import reviews_bp
 from .users_routes import users_bp
+from .batch_routes import batch_bp
 
-__all__ = ['auth_bp', 'skills_bp', 'listings_bp', 'sessions_bp', 'reviews_bp', 'users_bp']
\ No newline at end of file
+__all__ = ['auth_bp', 'skills_bp', 'listings_bp', 'sessions_bp', 'reviews_bp', 'users_bp', 'batch_bp']
\ No newline at end of file
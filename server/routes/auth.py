@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from database import db
 from models import User
+from passwords import PasswordHasherBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -44,6 +45,9 @@ def register():
             }
         }), 201
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({"error": "Server busy, please retry"}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -74,6 +78,8 @@ def login():
             }
         }), 200
         
+    except PasswordHasherBusy as e:
+        return jsonify({"error": "Server busy, please retry"}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+from batch import BatchError
+from multiplex import multiplexer
+
+batch_bp = Blueprint('batch', __name__)
+
+@batch_bp.route('', methods=['POST'])
+def dispatch_batch():
+    # JWT errors propagate to flask-jwt-extended's handlers (401/422)
+    multiplexer.verify()
+    try:
+        try:
+            items = multiplexer.requested()
+        except BatchError as e:
+            return jsonify({'error': str(e)}), 400
+        return multiplexer.dispatch(items).response()
+    except Exception as e:
+        print(f"Batch request error: {e}")
+        return jsonify({'error': 'Failed to run batch'}), 500
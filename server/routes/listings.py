@@ -1,30 +1,103 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import db
-from models import Listing, Skill, User, Review
+from cache import response_cache
+from models import ListingCard
+from pagination import paginate, get_limit, encode_cursor, PaginationError
+from search import search_listing_matches, decode_search_cursor
+from schemas import listing_schema, listing_sort, FieldsError, SortError
+from streaming import stream_rows, stream_format, StreamingError
 
 listings_bp = Blueprint('listings', __name__)
 
 @listings_bp.route('', methods=['GET'])
+@response_cache.cached('listings', 'skills', 'users')
 def get_all_listings():
     try:
-        listings = Listing.query.all()
-        result = []
-        for listing in listings:
-            listing_data = listing.to_dict()
-            listing_data['skill_name'] = listing.skill.name
-            listing_data['skill_category'] = listing.skill.category
-            listing_data['teacher_username'] = listing.user.username
-            listing_data['teacher_id'] = listing.user_id
-            
-            reviews = Review.query.filter_by(reviewee_id=listing.user_id).all()
-            avg_rating = sum(r.rating for r in reviews) / len(reviews) if reviews else 0
-            listing_data['teacher_rating'] = round(avg_rating, 1)
-            listing_data['teacher_review_count'] = len(reviews)
-            result.append(listing_data)
-        
-        return jsonify({'listings': result}), 200
+        schema, descending = listing_sort()
+        fields = schema.requested()
+        query = schema.query(fields)
+        
+        skill_id = request.args.get('skill_id', type=int)
+        if skill_id is not None:
+            query = query.filter(ListingCard.skill_id == skill_id)
+        category = request.args.get('category')
+        if category:
+            query = query.filter(ListingCard.skill_category == category)
+        teacher_id = request.args.get('teacher_id', type=int)
+        if teacher_id is not None:
+            query = query.filter(ListingCard.user_id == teacher_id)
+        min_price = request.args.get('min_price', type=float)
+        if min_price is not None:
+            query = query.filter(ListingCard.price_per_hour >= min_price)
+        max_price = request.args.get('max_price', type=float)
+        if max_price is not None:
+            query = query.filter(ListingCard.price_per_hour <= max_price)
+        
+        columns = schema.order_by()
+        fmt = stream_format()
+        if fmt:
+            return stream_rows(query, columns, schema.encoder(fields), fmt, 'listings',
+                               key=schema.cursor_key, descending=descending)
+        
+        rows, next_cursor = paginate(query, columns, key=schema.cursor_key, descending=descending)
+        
+        result = list(map(schema.encoder(fields), rows))
+        
+        return jsonify({'listings': result, 'next_cursor': next_cursor}), 200
+    except (PaginationError, StreamingError, FieldsError, SortError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch listings'}), 500
 
-# ... rest of your existing code
\ No newline at end of file
+@listings_bp.route('/<int:listing_id>', methods=['GET'])
+@response_cache.cached('listings', 'skills', 'users')
+def get_listing(listing_id):
+    try:
+        fields = listing_schema.requested()
+        row = listing_schema.query(fields).filter(ListingCard.listing_id == listing_id).first()
+        if row is None:
+            return jsonify({'error': 'Listing not found'}), 404
+        
+        return jsonify({'listing': listing_schema.encoder(fields)(row)}), 200
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Get listing error: {e}")
+        return jsonify({'error': 'Failed to fetch listing'}), 500
+
+@listings_bp.route('/search', methods=['GET'])
+@response_cache.cached('listings', 'skills', 'users')
+def search_listings():
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'error': 'Search query is required'}), 400
+        
+        fields = listing_schema.requested()
+        limit = get_limit()
+        cursor = request.args.get('cursor')
+        after = decode_search_cursor(cursor) if cursor else None
+        matches = search_listing_matches(db.session, q, limit + 1, after)
+        
+        next_cursor = None
+        if len(matches) > limit:
+            matches = matches[:limit]
+            next_cursor = encode_cursor([matches[-1].score, matches[-1].listing_id])
+        if not matches:
+            return jsonify({'listings': [], 'next_cursor': None}), 200
+        
+        listing_ids = [match.listing_id for match in matches]
+        rows = listing_schema.query(fields).filter(ListingCard.listing_id.in_(listing_ids)).all()
+        by_id = {row.id: row for row in rows}
+        encode = listing_schema.encoder(fields)
+        result = [encode(by_id[listing_id]) for listing_id in listing_ids if listing_id in by_id]
+        
+        return jsonify({'listings': result, 'next_cursor': next_cursor}), 200
+    except (PaginationError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Search listings error: {e}")
+        return jsonify({'error': 'Failed to search listings'}), 500
+
+# ... rest of your existing code
@@ -1,25 +1,52 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import db
-from models import Review, Session
+from models import Review, Session, User
+from batch import get_batch_items, coerce_id, BatchResults, BatchError
+from pagination import paginate, PaginationError
+from schemas import review_schema, FieldsError
+from streaming import stream_rows, stream_format, StreamingError
 
 reviews_bp = Blueprint('reviews', __name__)
 
+def review_error(data):
+    required_fields = ['rating', 'reviewee_id', 'session_id']
+    for field in required_fields:
+        if not data.get(field):
+            return f'{field} is required'
+    
+    rating = data['rating']
+    if isinstance(rating, bool) or not isinstance(rating, (int, float)) or rating < 1 or rating > 5:
+        return 'Rating must be between 1 and 5'
+    
+    if int(rating) != rating:
+        return 'Rating must be a whole number'
+    return None
+
 @reviews_bp.route('', methods=['GET'])
 def get_all_reviews():
     try:
-        reviews = Review.query.all()
+        fields = review_schema.requested()
+        query = review_schema.query(fields)
+        reviewee_id = request.args.get('reviewee_id', type=int)
+        if reviewee_id is not None:
+            query = query.filter(Review.reviewee_id == reviewee_id)
+        reviewer_id = request.args.get('reviewer_id', type=int)
+        if reviewer_id is not None:
+            query = query.filter(Review.reviewer_id == reviewer_id)
+        
+        columns = review_schema.order_by()
+        fmt = stream_format()
+        if fmt:
+            return stream_rows(query, columns, review_schema.encoder(fields), fmt, 'reviews', key=review_schema.cursor_key)
+        
+        rows, next_cursor = paginate(query, columns, key=review_schema.cursor_key)
         return jsonify({
-            'reviews': [{
-                'id': review.id,
-                'rating': review.rating,
-                'comment': review.comment,
-                'reviewer': {'username': review.reviewer.username},
-                'reviewee': {'username': review.reviewee.username},
-                'session_id': review.session_id,
-                'created_at': review.created_at.isoformat()
-            } for review in reviews]
+            'reviews': list(map(review_schema.encoder(fields), rows)),
+            'next_cursor': next_cursor
         }), 200
+    except (PaginationError, StreamingError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get reviews error: {e}")
         return jsonify({'error': 'Failed to fetch reviews'}), 500
@@ -33,13 +60,9 @@ def create_review():
         
         print(f"Creating review by user {current_user_id}")
         
-        required_fields = ['rating', 'reviewee_id', 'session_id']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
-        
-        if data['rating'] < 1 or data['rating'] > 5:
-            return jsonify({'error': 'Rating must be between 1 and 5'}), 400
+        error = review_error(data)
+        if error:
+            return jsonify({'error': error}), 400
         
         session = Session.query.get(data['session_id'])
         if not session:
@@ -63,6 +86,7 @@ def create_review():
         )
         
         db.session.add(review)
+        User.record_rating(review.reviewee_id, int(review.rating))
         db.session.commit()
         
         return jsonify({
@@ -79,6 +103,64 @@ def create_review():
         print(f"Create review error: {e}")
         return jsonify({'error': 'Failed to create review'}), 500
 
+@reviews_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_reviews_batch():
+    try:
+        current_user_id = get_jwt_identity()
+        try:
+            items = get_batch_items()
+        except BatchError as e:
+            return jsonify({'error': str(e)}), 400
+        results = BatchResults(len(items))
+        
+        session_ids = {coerce_id(item.get('session_id')) for item in items} - {None}
+        existing_sessions = set()
+        already_reviewed = set()
+        if session_ids:
+            existing_sessions = {session_id for (session_id,) in
+                                 db.session.query(Session.id).filter(Session.id.in_(session_ids))}
+            already_reviewed = {session_id for (session_id,) in db.session.query(Review.session_id).filter(
+                Review.session_id.in_(session_ids),
+                Review.reviewer_id == current_user_id
+            )}
+        
+        created = []
+        for index, item in enumerate(items):
+            error = review_error(item)
+            session_id = coerce_id(item.get('session_id'))
+            if error:
+                results.fail(index, error)
+            elif session_id not in existing_sessions:
+                results.fail(index, 'Session not found', 404)
+            elif session_id in already_reviewed:
+                results.fail(index, 'You have already reviewed this session')
+            elif coerce_id(item['reviewee_id']) is None:
+                results.fail(index, 'reviewee_id must be a user id')
+            else:
+                # Later duplicates in the same batch count as already reviewed
+                already_reviewed.add(session_id)
+                created.append((index, Review(
+                    rating=item['rating'],
+                    comment=item.get('comment', ''),
+                    reviewer_id=current_user_id,
+                    reviewee_id=coerce_id(item['reviewee_id']),
+                    session_id=session_id
+                )))
+        
+        db.session.add_all([review for _, review in created])
+        User.record_ratings([(review.reviewee_id, int(review.rating)) for _, review in created])
+        db.session.flush()
+        for index, review in created:
+            results.ok(index, review_id=review.id)
+        db.session.commit()
+        return results.response()
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Create reviews batch error: {e}")
+        return jsonify({'error': 'Failed to create reviews'}), 500
+
 @reviews_bp.route('/session/<int:session_id>', methods=['GET'])
 def get_session_reviews(session_id):
     try:
@@ -2,10 +2,58 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import db
 from models import Session, Listing, User
-from datetime import datetime
+from datetime import datetime, timedelta
+from pagination import paginate, PaginationError
+from schemas import session_schema, calendar_schema, FieldsError
+from batch import get_batch_items, coerce_id, BatchResults, BatchError
+from scheduling import (
+    parse_datetime, parse_window, parse_duration, lock_participants, find_conflict, free_slots,
+    sessions_in_window, calendar_filter, BusyCalendar, WindowError, DurationError, MAX_AVAILABILITY_DAYS,
+    DEFAULT_CALENDAR_DAYS, MAX_CALENDAR_DAYS, MAX_SESSION_HOURS, CALENDAR_ROLES
+)
 
 sessions_bp = Blueprint('sessions', __name__)
 
+class BookingError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def parse_booking(data, student_id, get_listing):
+    """Validate one booking request; returns ``(listing, scheduled_date, duration_hours)``."""
+    if not data:
+        raise BookingError('No data provided')
+    if not data.get('listing_id'):
+        raise BookingError('Listing ID is required')
+    if not data.get('scheduled_date'):
+        raise BookingError('Scheduled date is required')
+    
+    listing = get_listing(data['listing_id'])
+    if not listing:
+        raise BookingError('Listing not found', 404)
+    
+    if student_id == listing.user_id:
+        raise BookingError('Cannot book your own listing')
+    
+    try:
+        scheduled_date = parse_datetime(data['scheduled_date'])
+    except (ValueError, AttributeError):
+        raise BookingError('Invalid date format')
+    
+    # Validate date is in future
+    if scheduled_date <= datetime.utcnow():
+        raise BookingError('Scheduled date must be in the future')
+    
+    try:
+        duration_hours = float(data.get('duration_hours', 1.0))
+    except (TypeError, ValueError):
+        raise BookingError('Duration must be a number of hours')
+    # Written as a range check so NaN fails it too
+    if not 0.5 <= duration_hours <= MAX_SESSION_HOURS:
+        raise BookingError(f'Duration must be between 0.5 and {MAX_SESSION_HOURS} hours')
+    
+    return listing, scheduled_date, duration_hours
+
 @sessions_bp.route('', methods=['POST'])
 @jwt_required()
 def create_session():
@@ -13,37 +61,26 @@ def create_session():
         data = request.get_json()
         student_id = get_jwt_identity()
         
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        if not data.get('listing_id'):
-            return jsonify({'error': 'Listing ID is required'}), 400
-        if not data.get('scheduled_date'):
-            return jsonify({'error': 'Scheduled date is required'}), 400
-        
-        listing = Listing.query.get(data['listing_id'])
-        if not listing:
-            return jsonify({'error': 'Listing not found'}), 404
-        
-        if student_id == listing.user_id:
-            return jsonify({'error': 'Cannot book your own listing'}), 400
-        
         try:
-            scheduled_date = datetime.fromisoformat(data['scheduled_date'].replace('Z', '+00:00'))
-        except ValueError:
-            return jsonify({'error': 'Invalid date format'}), 400
+            listing, scheduled_date, duration_hours = parse_booking(data, student_id, Listing.query.get)
+        except BookingError as e:
+            return jsonify({'error': str(e)}), e.status
         
-        # Validate date is in future
-        if scheduled_date <= datetime.utcnow():
-            return jsonify({'error': 'Scheduled date must be in the future'}), 400
+        # Lock both calendars so a concurrent booking can't slip in between
+        # the overlap check and the insert
+        lock_participants(db.session, [student_id, listing.user_id])
         
-        duration_hours = float(data.get('duration_hours', 1.0))
-        if duration_hours < 0.5 or duration_hours > 8:
-            return jsonify({'error': 'Duration must be between 0.5 and 8 hours'}), 400
+        if find_conflict(listing.user_id, scheduled_date, duration_hours):
+            db.session.rollback()
+            return jsonify({'error': 'Teacher already has a session at that time'}), 409
+        if find_conflict(student_id, scheduled_date, duration_hours):
+            db.session.rollback()
+            return jsonify({'error': 'You already have a session at that time'}), 409
         
         session = Session(
             student_id=student_id,
             teacher_id=listing.user_id,
-            listing_id=data['listing_id'],
+            listing_id=listing.id,
             scheduled_date=scheduled_date,
             duration_hours=duration_hours,
             status='scheduled',
@@ -62,58 +99,155 @@ def create_session():
         db.session.rollback()
         return jsonify({'error': 'Failed to book session: ' + str(e)}), 500
 
+@sessions_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_sessions_batch():
+    try:
+        student_id = get_jwt_identity()
+        try:
+            items = get_batch_items()
+        except BatchError as e:
+            return jsonify({'error': str(e)}), 400
+        results = BatchResults(len(items))
+        
+        listing_ids = {coerce_id(item.get('listing_id')) for item in items} - {None}
+        listings = {listing.id: listing for listing in Listing.query.filter(Listing.id.in_(listing_ids))} if listing_ids else {}
+        
+        def get_listing(listing_id):
+            return listings.get(coerce_id(listing_id))
+        
+        bookings = []
+        for index, item in enumerate(items):
+            try:
+                bookings.append((index, item) + parse_booking(item, student_id, get_listing))
+            except BookingError as e:
+                results.fail(index, str(e), e.status)
+        
+        created = []
+        if bookings:
+            # One lock and one calendar read for every participant in the batch
+            participants = {student_id} | {listing.user_id for _, _, listing, _, _ in bookings}
+            lock_participants(db.session, participants)
+            window_start = min(start for _, _, _, start, _ in bookings)
+            window_end = max(start + timedelta(hours=hours) for _, _, _, start, hours in bookings)
+            calendar = BusyCalendar(sessions_in_window(participants, window_start, window_end))
+            
+            for index, item, listing, scheduled_date, duration_hours in bookings:
+                end = scheduled_date + timedelta(hours=duration_hours)
+                if calendar.conflicts(listing.user_id, scheduled_date, end):
+                    results.fail(index, 'Teacher already has a session at that time', 409)
+                    continue
+                if calendar.conflicts(student_id, scheduled_date, end):
+                    results.fail(index, 'You already have a session at that time', 409)
+                    continue
+                calendar.add((listing.user_id, student_id), scheduled_date, end)
+                created.append((index, Session(
+                    student_id=student_id,
+                    teacher_id=listing.user_id,
+                    listing_id=listing.id,
+                    scheduled_date=scheduled_date,
+                    duration_hours=duration_hours,
+                    status='scheduled',
+                    notes=item.get('notes', '')
+                )))
+        
+        db.session.add_all([session for _, session in created])
+        db.session.flush()
+        for index, session in created:
+            results.ok(index, session_id=session.id)
+        db.session.commit()
+        return results.response()
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to book sessions: ' + str(e)}), 500
+
+@sessions_bp.route('/my-sessions', methods=['GET'])
 @sessions_bp.route('', methods=['GET'])
 @jwt_required()
 def get_user_sessions():
+    """Every session of the caller, past and future, keyset-paged in
+    booking order. ``/calendar`` is the date-windowed view."""
     try:
         user_id = get_jwt_identity()
-        sessions = Session.query.filter(
+        fields = session_schema.requested()
+        query = session_schema.query(fields).filter(
             (Session.student_id == user_id) | (Session.teacher_id == user_id)
-        ).all()
-        result = []
-        for session in sessions:
-            result.append({
-                'id': session.id,
-                'student': {'id': session.student.id, 'username': session.student.username},
-                'teacher': {'id': session.teacher.id, 'username': session.teacher.username},
-                'listing': {
-                    'id': session.listing.id,
-                    'title': session.listing.title,
-                    'skill': {'name': session.listing.skill.name}
-                },
-                'scheduled_time': session.scheduled_date.isoformat(),
-                'duration_hours': session.duration_hours,
-                'status': session.status,
-                'notes': session.notes
-            })
-        return jsonify({'sessions': result}), 200
+        )
+        status = request.args.get('status')
+        if status:
+            query = query.filter(Session.status == status)
+        teacher_id = request.args.get('teacher_id', type=int)
+        if teacher_id is not None:
+            query = query.filter(Session.teacher_id == teacher_id)
+        
+        rows, next_cursor = paginate(query, session_schema.order_by(), key=session_schema.cursor_key)
+        return jsonify({
+            'sessions': list(map(session_schema.encoder(fields), rows)),
+            'next_cursor': next_cursor
+        }), 200
+    except (PaginationError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@sessions_bp.route('/my-sessions', methods=['GET'])
+@sessions_bp.route('/calendar', methods=['GET'])
 @jwt_required()
-def get_my_sessions():
+def get_calendar():
+    """The caller's sessions starting in ``?from=&to=`` (default: the next
+    month from today), optionally as ``?role=student|teacher``, ``?status=``
+    or with one ``?teacher_id=``, ordered by start time and keyset-paged."""
     try:
         user_id = get_jwt_identity()
-        sessions = Session.query.filter(
-            (Session.student_id == user_id) | (Session.teacher_id == user_id)
-        ).all()
-        result = []
-        for session in sessions:
-            result.append({
-                'id': session.id,
-                'student': {'id': session.student.id, 'username': session.student.username},
-                'teacher': {'id': session.teacher.id, 'username': session.teacher.username},
-                'listing': {
-                    'id': session.listing.id,
-                    'title': session.listing.title,
-                    'skill': {'name': session.listing.skill.name}
-                },
-                'scheduled_time': session.scheduled_date.isoformat(),
-                'duration_hours': session.duration_hours,
-                'status': session.status,
-                'notes': session.notes
-            })
-        return jsonify({'sessions': result}), 200
+        fields = calendar_schema.requested()
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start, end = parse_window(request.args, today, DEFAULT_CALENDAR_DAYS, MAX_CALENDAR_DAYS)
+        role = request.args.get('role') or None
+        if role is not None and role not in CALENDAR_ROLES:
+            return jsonify({'error': f"role must be one of: {', '.join(CALENDAR_ROLES)}"}), 400
+        
+        query = calendar_schema.query(fields).filter(calendar_filter(user_id, start, end, role))
+        status = request.args.get('status')
+        if status:
+            query = query.filter(Session.status == status)
+        teacher_id = request.args.get('teacher_id', type=int)
+        if teacher_id is not None:
+            query = query.filter(Session.teacher_id == teacher_id)
+        
+        rows, next_cursor = paginate(query, calendar_schema.order_by(), key=calendar_schema.cursor_key)
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'sessions': list(map(calendar_schema.encoder(fields), rows)),
+            'next_cursor': next_cursor
+        }), 200
+    except (PaginationError, FieldsError, WindowError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@sessions_bp.route('/availability', methods=['GET'])
+@jwt_required()
+def get_availability():
+    try:
+        teacher_id = request.args.get('teacher_id', type=int)
+        if teacher_id is None:
+            return jsonify({'error': 'teacher_id is required'}), 400
+        
+        try:
+            start, end = parse_window(request.args, datetime.utcnow(), 7, MAX_AVAILABILITY_DAYS)
+            duration_hours = parse_duration(request.args.get('duration_hours'))
+        except (WindowError, DurationError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        busy, free = free_slots(teacher_id, start, end, duration_hours)
+        
+        return jsonify({
+            'teacher_id': teacher_id,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'busy': [{'start': s.isoformat(), 'end': e.isoformat()} for s, e in busy],
+            'free': [{'start': s.isoformat(), 'end': e.isoformat()} for s, e in free]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
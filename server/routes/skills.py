@@ -1,22 +1,33 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from database import db
+from cache import response_cache
 from models import Skill
+from pagination import paginate, PaginationError
 
 skills_bp = Blueprint('skills', __name__)
 
 @skills_bp.route('', methods=['GET'])
+@response_cache.cached('skills')
 def get_all_skills():
     try:
-        skills = Skill.query.all()
+        query = Skill.query
+        category = request.args.get('category')
+        if category:
+            query = query.filter(Skill.category == category)
+        
+        skills, next_cursor = paginate(query, [Skill.id])
         return jsonify({
             'skills': [{
                 'id': skill.id,
                 'name': skill.name,
                 'category': skill.category,
                 'description': skill.description
-            } for skill in skills]
+            } for skill in skills],
+            'next_cursor': next_cursor
         }), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Skills error: {e}")
         return jsonify({'error': 'Failed to fetch skills'}), 500
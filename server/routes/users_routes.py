@@ -1,67 +1,64 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import db
-from models import User, UserSkill, Skill, Listing, Review
+from cache import response_cache
+from sqlalchemy.orm import selectinload
+from models import User, UserSkill, Skill, ExpertRanking, PROFICIENCY_LEVELS
+from batch import get_batch_items, coerce_id, BatchResults, BatchError
+from leaderboard import compute_rankings, EXPERT_LEVELS
+from pagination import get_limit, PaginationError
+from recommendations import recommendation_index
+from schemas import user_schema, FieldsError
 
 users_bp = Blueprint('users', __name__)
 
+DEFAULT_RECOMMENDATIONS = 10
+MAX_RECOMMENDATIONS = 50
+
 @users_bp.route('/<int:user_id>', methods=['GET'])
 def get_user_profile(user_id):
     try:
-        user = User.query.get(user_id)
+        fields = user_schema.requested()
+        user = user_schema.query(fields).filter(User.id == user_id).first()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        user_skills = []
-        for us in user.user_skills:
-            skill_data = {
-                'id': us.skill.id,
-                'name': us.skill.name,
-                'category': us.skill.category,
-                'proficiency_level': us.proficiency_level,
-                'years_experience': us.years_experience
-            }
-            user_skills.append(skill_data)
-        
-        listings_data = []
-        for listing in user.listings:
-            listing_data = {
-                'id': listing.id,
-                'title': listing.title,
-                'description': listing.description,
-                'price_per_hour': listing.price_per_hour,
-                'skill_name': listing.skill.name
-            }
-            listings_data.append(listing_data)
-        
-        reviews = Review.query.filter_by(reviewee_id=user_id).all()
-        avg_rating = sum(r.rating for r in reviews) / len(reviews) if reviews else 0
-        
-        user_data = {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'bio': user.bio,
-            'created_at': user.created_at.isoformat(),
-            'skills': user_skills,
-            'listings': listings_data,
-            'average_rating': round(avg_rating, 1),
-            'total_reviews': len(reviews)
-        }
+        user_data = user_schema.dump(user, fields)
         
         return jsonify({'user': user_data}), 200
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch user profile'}), 500
 
 @users_bp.route('/experts', methods=['GET'])
+@response_cache.cached('users', 'user_skills', 'skills', 'listings', 'expert_rankings')
 def get_experts():
     try:
-        experts = User.query.join(UserSkill).filter(
-            UserSkill.proficiency_level.in_(['expert', 'advanced'])
-        ).distinct().all()
+        category = request.args.get('category') or None
+        limit = get_limit()
+        
+        ranked = db.session.query(ExpertRanking, User) \
+            .join(User, ExpertRanking.user_id == User.id) \
+            .options(selectinload(User.user_skills).joinedload(UserSkill.skill)) \
+            .filter(ExpertRanking.category == category if category else ExpertRanking.category.is_(None)) \
+            .order_by(ExpertRanking.rank) \
+            .limit(limit) \
+            .all()
+        rows = [(ranking.rank, ranking.listings_count, user) for ranking, user in ranked]
+        
+        if not rows and not db.session.query(ExpertRanking.id).limit(1).first():
+            # Leaderboard not built yet: rank live with the same grouped queries.
+            # Once it exists, a category without rows (unknown, misspelled or
+            # simply empty) gets an empty list rather than a full-table ranking
+            live = compute_rankings().get(category, [])[:limit]
+            users = {user.id: user for user in User.query.options(
+                selectinload(User.user_skills).joinedload(UserSkill.skill)
+            ).filter(User.id.in_([row['user_id'] for row in live]))}
+            rows = [(row['rank'], row['listings_count'], users[row['user_id']]) for row in live]
         
         result = []
-        for expert in experts:
+        for rank, listings_count, expert in rows:
             expert_data = {
                 'id': expert.id,
                 'username': expert.username,
@@ -72,7 +69,7 @@ def get_experts():
             
             user_skills = []
             for us in expert.user_skills:
-                if us.proficiency_level in ['expert', 'advanced']:
+                if us.proficiency_level in EXPERT_LEVELS and (category is None or us.skill.category == category):
                     skill_data = {
                         'id': us.skill.id,
                         'name': us.skill.name,
@@ -82,17 +79,112 @@ def get_experts():
                     }
                     user_skills.append(skill_data)
             
-            listings = Listing.query.filter_by(user_id=expert.id).all()
-            reviews = Review.query.filter_by(reviewee_id=expert.id).all()
-            
+            expert_data['rank'] = rank
             expert_data['skills'] = user_skills
-            expert_data['listings_count'] = len(listings)
-            expert_data['average_rating'] = round(sum(r.rating for r in reviews) / len(reviews), 1) if reviews else 0
-            expert_data['total_reviews'] = len(reviews)
+            expert_data['listings_count'] = listings_count
+            expert_data['average_rating'] = expert.average_rating
+            expert_data['total_reviews'] = expert.rating_count
             
             result.append(expert_data)
         
         return jsonify({'experts': result}), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get experts error: {e}")
-        return jsonify({'error': 'Failed to fetch experts'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to fetch experts'}), 500
+
+@users_bp.route('/me/skills/batch', methods=['POST'])
+@jwt_required()
+def upsert_my_skills_batch():
+    try:
+        user_id = get_jwt_identity()
+        try:
+            items = get_batch_items()
+        except BatchError as e:
+            return jsonify({'error': str(e)}), 400
+        results = BatchResults(len(items))
+        
+        skill_ids = {coerce_id(item.get('skill_id')) for item in items} - {None}
+        known_skills = set()
+        user_skills = {}
+        if skill_ids:
+            known_skills = {skill_id for (skill_id,) in db.session.query(Skill.id).filter(Skill.id.in_(skill_ids))}
+            user_skills = {us.skill_id: us for us in UserSkill.query.filter(
+                UserSkill.user_id == user_id, UserSkill.skill_id.in_(skill_ids)
+            )}
+        
+        written = []
+        seen = set()
+        for index, item in enumerate(items):
+            skill_id = coerce_id(item.get('skill_id'))
+            years = item.get('years_experience')
+            if not skill_id:
+                results.fail(index, 'skill_id is required')
+            elif item.get('proficiency_level') not in PROFICIENCY_LEVELS:
+                results.fail(index, f"proficiency_level must be one of: {', '.join(PROFICIENCY_LEVELS)}")
+            elif years is not None and (isinstance(years, bool) or not isinstance(years, int) or years < 0):
+                results.fail(index, 'years_experience must be a non-negative whole number')
+            elif skill_id not in known_skills:
+                results.fail(index, 'Skill not found', 404)
+            elif skill_id in seen:
+                results.fail(index, 'Skill appears more than once in this batch')
+            else:
+                seen.add(skill_id)
+                user_skill = user_skills.get(skill_id)
+                status = 200
+                if user_skill is None:
+                    user_skill = UserSkill(user_id=user_id, skill_id=skill_id)
+                    db.session.add(user_skill)
+                    status = 201
+                user_skill.proficiency_level = item['proficiency_level']
+                # Leave the stored years alone when the item doesn't mention them
+                if 'years_experience' in item:
+                    user_skill.years_experience = years
+                written.append((index, status, user_skill))
+        
+        db.session.flush()
+        for index, status, user_skill in written:
+            results.ok(index, status, user_skill_id=user_skill.id, skill_id=user_skill.skill_id)
+        db.session.commit()
+        return results.response()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Update skills batch error: {e}")
+        return jsonify({'error': 'Failed to update skills'}), 500
+
+@users_bp.route('/<int:user_id>/recommendations', methods=['GET'])
+@jwt_required()
+def get_recommendations(user_id):
+    try:
+        if get_jwt_identity() != user_id:
+            return jsonify({'error': 'You can only view your own recommendations'}), 403
+        
+        limit = request.args.get('limit', DEFAULT_RECOMMENDATIONS, type=int)
+        limit = max(1, min(limit, MAX_RECOMMENDATIONS))
+        ranked = recommendation_index.recommend([user_id], limit)[0]
+        
+        teacher_ids = [teacher_id for teacher_id, _, _ in ranked]
+        skill_ids = {skill_id for _, _, shared in ranked for skill_id in shared}
+        teachers = {row.id: row for row in db.session.query(
+            User.id, User.username, User.rating_sum, User.rating_count
+        ).filter(User.id.in_(teacher_ids))}
+        skill_names = dict(db.session.query(Skill.id, Skill.name).filter(Skill.id.in_(skill_ids))) if skill_ids else {}
+        
+        result = []
+        for teacher_id, score, shared in ranked:
+            teacher = teachers.get(teacher_id)
+            if teacher is None:
+                continue
+            result.append({
+                'teacher': {'id': teacher.id, 'username': teacher.username},
+                'score': round(score, 4),
+                'average_rating': round(teacher.rating_sum / teacher.rating_count, 1) if teacher.rating_count else 0,
+                'total_reviews': teacher.rating_count,
+                'shared_skills': [{'id': skill_id, 'name': skill_names.get(skill_id)} for skill_id in shared]
+            })
+        
+        return jsonify({'user_id': user_id, 'recommendations': result}), 200
+    except Exception as e:
+        print(f"Get recommendations error: {e}")
+        return jsonify({'error': 'Failed to fetch recommendations'}), 500
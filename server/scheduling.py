@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_, text
+from models import Session
+
+# create_session caps durations at 8 hours, so any session overlapping a
+# window must start no earlier than this before the window opens. That bound
+# turns overlap detection into a range scan on (user_id, scheduled_date).
+MAX_SESSION_HOURS = 8
+MAX_AVAILABILITY_DAYS = 31
+DEFAULT_CALENDAR_DAYS = 31
+MAX_CALENDAR_DAYS = 366
+INACTIVE_STATUSES = ('cancelled',)
+CALENDAR_ROLES = ('student', 'teacher')
+
+
+class WindowError(ValueError):
+    pass
+
+
+class DurationError(ValueError):
+    pass
+
+
+def parse_datetime(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    # Stored datetimes are naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_window(args, default_start, default_days, max_days):
+    """The ``[from, to)`` window of a request, defaulting to ``default_days``
+    from ``default_start`` and capped at ``max_days``."""
+    try:
+        start = parse_datetime(args['from']) if args.get('from') else default_start
+        end = parse_datetime(args['to']) if args.get('to') else start + timedelta(days=default_days)
+    except ValueError:
+        raise WindowError('Invalid date format')
+    if end <= start:
+        raise WindowError('to must be after from')
+    if end - start > timedelta(days=max_days):
+        raise WindowError(f'Window cannot exceed {max_days} days')
+    return start, end
+
+
+def parse_duration(value, default=1.0):
+    """Hours from a ``duration_hours`` parameter, in (0, MAX_SESSION_HOURS]."""
+    if value is None or value == '':
+        return default
+    try:
+        hours = float(value)
+    except (TypeError, ValueError):
+        raise DurationError('duration_hours must be a number of hours')
+    # Written as a range check so NaN fails it too
+    if not 0 < hours <= MAX_SESSION_HOURS:
+        raise DurationError(f'duration_hours must be more than 0 and at most {MAX_SESSION_HOURS}')
+    return hours
+
+
+def lock_participants(session, user_ids):
+    """Serialize bookings that involve any of ``user_ids`` until commit."""
+    user_ids = sorted(set(user_ids))
+    bind = session.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # Row locks in a fixed order so two bookings can't deadlock
+        session.execute(
+            text('SELECT id FROM users WHERE id = ANY(:ids) ORDER BY id FOR UPDATE'),
+            {'ids': user_ids}
+        )
+    elif bind.dialect.name == 'sqlite':
+        # SQLite has no row locks: take the database write lock (and the
+        # writer queue's turn) before the overlap check instead of at the
+        # INSERT. pysqlite only opens a transaction at the first write, so
+        # one that is already open holds the lock.
+        connection = session.connection()
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def sessions_in_window(user_ids, start, end):
+    """Active sessions taught or attended by any of ``user_ids`` that may overlap [start, end)."""
+    user_ids = list(user_ids)
+    earliest = start - timedelta(hours=MAX_SESSION_HOURS)
+    return Session.query.filter(
+        or_(
+            Session.teacher_id.in_(user_ids) & (Session.scheduled_date > earliest) & (Session.scheduled_date < end),
+            Session.student_id.in_(user_ids) & (Session.scheduled_date > earliest) & (Session.scheduled_date < end)
+        ),
+        or_(Session.status.is_(None), Session.status.notin_(INACTIVE_STATUSES))
+    ).order_by(Session.scheduled_date).all()
+
+
+def calendar_filter(user_id, start, end, role=None):
+    """Sessions of ``user_id`` in ``role`` (or either) starting in [start, end).
+
+    Each role repeats the window so it stays a range scan on its
+    (user_id, scheduled_date) index however long the user's history is.
+    """
+    in_window = (Session.scheduled_date >= start) & (Session.scheduled_date < end)
+    if role == 'student':
+        return (Session.student_id == user_id) & in_window
+    if role == 'teacher':
+        return (Session.teacher_id == user_id) & in_window
+    return or_((Session.student_id == user_id) & in_window, (Session.teacher_id == user_id) & in_window)
+
+
+def session_end(session):
+    return session.scheduled_date + timedelta(hours=session.duration_hours)
+
+
+def find_conflict(user_id, start, duration_hours):
+    end = start + timedelta(hours=duration_hours)
+    for existing in sessions_in_window([user_id], start, end):
+        if existing.scheduled_date < end and session_end(existing) > start:
+            return existing
+    return None
+
+
+def free_slots(user_id, start, end, min_hours):
+    busy = []
+    for existing in sessions_in_window([user_id], start, end):
+        busy_start, busy_end = max(existing.scheduled_date, start), min(session_end(existing), end)
+        if busy_end <= start:
+            continue
+        if busy and busy_start <= busy[-1][1]:
+            busy[-1][1] = max(busy[-1][1], busy_end)
+        else:
+            busy.append([busy_start, busy_end])
+
+    free = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start - cursor >= timedelta(hours=min_hours):
+            free.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if end - cursor >= timedelta(hours=min_hours):
+        free.append((cursor, end))
+    return busy, free
+
+
+class BusyCalendar:
+    """Booked intervals per user, for checking a batch of bookings against
+    the database and against each other without a query per item."""
+
+    def __init__(self, sessions=()):
+        self.busy = {}
+        for session in sessions:
+            self.add((session.teacher_id, session.student_id), session.scheduled_date, session_end(session))
+
+    def add(self, user_ids, start, end):
+        for user_id in set(user_ids):
+            self.busy.setdefault(user_id, []).append((start, end))
+
+    def conflicts(self, user_id, start, end):
+        return any(busy_start < end and busy_end > start for busy_start, busy_end in self.busy.get(user_id, ()))
@@ -0,0 +1,285 @@
+from operator import attrgetter, itemgetter
+from flask import request
+from sqlalchemy.orm import aliased
+from database import db
+from models import User, UserSkill, Skill, Listing, Session, Review, ListingCard
+
+# Every projectable response field names the labeled columns it reads, so
+# ?fields= turns into a column select: a card that skips `description` never
+# fetches the TEXT column, and relationship fields like a profile's listings
+# only run their query when asked for.
+
+
+class FieldsError(ValueError):
+    pass
+
+
+class SortError(ValueError):
+    pass
+
+
+class Field:
+    def __init__(self, columns, value, source=None, convert=None):
+        self.columns = columns
+        self.value = value
+        # Plain columns name their label so encoders can index the row by position
+        self.source = source
+        self.convert = convert
+
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def column(label, expression, convert=None):
+    get = attrgetter(label)
+    if convert is None:
+        return Field({label: expression}, get, source=label)
+    return Field({label: expression}, lambda row: convert(get(row)), source=label, convert=convert)
+
+
+def _compose(keys, indexes, computed):
+    keys = tuple(keys)
+    if len(indexes) == 1:
+        # itemgetter with one index returns the value, not a 1-tuple
+        index = indexes[0]
+        get = lambda row: (row[index],)
+    elif indexes:
+        get = itemgetter(*indexes)
+    else:
+        get = lambda row: ()
+
+    if not computed:
+        return lambda row: dict(zip(keys, get(row)))
+
+    def encode(row):
+        data = dict(zip(keys, get(row)))
+        for name, value in computed:
+            data[name] = value(row)
+        return data
+    return encode
+
+
+def average_rating(rating_sum, rating_count):
+    return round(rating_sum / rating_count, 1) if rating_count else 0
+
+
+class Schema:
+    """The projectable fields of one API resource.
+
+    ``key`` maps labels to the columns that are always selected because the
+    route orders or pages on them; ``joins`` adds the FROM clause the field
+    columns rely on.
+    """
+
+    def __init__(self, name, fields, key, joins=None):
+        self.name = name
+        self.fields = fields
+        self.key = key
+        self.joins = joins
+        self.encoders = {}
+
+    def requested(self):
+        raw = request.args.get('fields')
+        if not raw:
+            return tuple(self.fields)
+        names = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise FieldsError(f"Unknown {self.name} fields: {', '.join(unknown)}; "
+                              f"expected any of: {', '.join(self.fields)}")
+        return self.canonical(names)
+
+    def canonical(self, names):
+        """``names`` in declaration order, so every ordering of the same
+        ?fields= shares one column list and one encoder."""
+        wanted = set(names)
+        return tuple(name for name in self.fields if name in wanted)
+
+    def columns(self, names):
+        columns = dict(self.key)
+        for name in self.canonical(names):
+            columns.update(self.fields[name].columns)
+        return columns
+
+    def query(self, names):
+        columns = self.columns(names)
+        query = db.session.query(*[expression.label(label) for label, expression in columns.items()])
+        return self.joins(query) if self.joins else query
+
+    def order_by(self):
+        return list(self.key.values())
+
+    def cursor_key(self, row):
+        return tuple(getattr(row, label) for label in self.key)
+
+    def encoder(self, names):
+        """A function turning a row of ``query(names)`` into the response dict.
+
+        Plain columns are read by position with one ``itemgetter`` per field
+        selection instead of calling every field's accessor per row; the
+        rest are appended by their own accessors. Datetimes stay datetimes;
+        the app's JSON and MessagePack encoders write them as ISO 8601.
+        """
+        names = self.canonical(names)
+        encoder = self.encoders.get(names)
+        if encoder is None:
+            positions = {label: index for index, label in enumerate(self.columns(names))}
+            plain = [name for name in names
+                     if self.fields[name].source is not None and self.fields[name].convert in (None, isoformat)]
+            indexes = [positions[self.fields[name].source] for name in plain]
+            computed = tuple((name, self.fields[name].value) for name in names if name not in plain)
+            encoder = self.encoders[names] = _compose(plain, indexes, computed)
+        return encoder
+
+    def dump(self, row, names):
+        return self.encoder(names)(row)
+
+
+def _teacher_rating(row):
+    return average_rating(row.teacher_rating_sum, row.teacher_rating_count)
+
+
+# Listings read from the listing_cards projection: no joins, and every sort
+# order below has its own index
+listing_fields = {
+    'id': column('id', ListingCard.listing_id),
+    'title': column('title', ListingCard.title),
+    'description': column('description', ListingCard.description),
+    'price_per_hour': column('price_per_hour', ListingCard.price_per_hour),
+    'user_id': column('user_id', ListingCard.user_id),
+    'skill_id': column('skill_id', ListingCard.skill_id),
+    'created_at': column('created_at', ListingCard.created_at, isoformat),
+    'skill_name': column('skill_name', ListingCard.skill_name),
+    'skill_category': column('skill_category', ListingCard.skill_category),
+    'teacher_username': column('teacher_username', ListingCard.teacher_username),
+    'teacher_id': column('user_id', ListingCard.user_id),
+    'teacher_bio': column('teacher_bio', ListingCard.teacher_bio),
+    'teacher_rating': Field(
+        {'teacher_rating_sum': ListingCard.teacher_rating_sum,
+         'teacher_rating_count': ListingCard.teacher_rating_count},
+        _teacher_rating
+    ),
+    'teacher_review_count': column('teacher_rating_count', ListingCard.teacher_rating_count),
+}
+
+listing_schema = Schema('listing', listing_fields,
+                        key={'created_at': ListingCard.created_at, 'id': ListingCard.listing_id})
+
+LISTING_SORTS = {
+    'created_at': listing_schema,
+    'price': Schema('listing', listing_fields,
+                    key={'price_per_hour': ListingCard.price_per_hour, 'id': ListingCard.listing_id}),
+    'rating': Schema('listing', listing_fields,
+                     key={'teacher_average_rating': ListingCard.teacher_average_rating, 'id': ListingCard.listing_id}),
+}
+
+
+def listing_sort():
+    """The schema and direction for ``?sort=``: a LISTING_SORTS name,
+    prefixed with ``-`` for descending."""
+    raw = request.args.get('sort', '').strip() or 'created_at'
+    descending = raw.startswith('-')
+    schema = LISTING_SORTS.get(raw.lstrip('-'))
+    if schema is None:
+        raise SortError(f"Unknown listing sort: {raw}; expected any of: {', '.join(LISTING_SORTS)} "
+                        f"(prefix with - for descending)")
+    return schema, descending
+
+
+reviewer = aliased(User)
+reviewee = aliased(User)
+
+review_schema = Schema('review', {
+    'id': column('id', Review.id),
+    'rating': column('rating', Review.rating),
+    'comment': column('comment', Review.comment),
+    'reviewer': Field({'reviewer_username': reviewer.username},
+                      lambda row: {'username': row.reviewer_username}),
+    'reviewee': Field({'reviewee_username': reviewee.username},
+                      lambda row: {'username': row.reviewee_username}),
+    'session_id': column('session_id', Review.session_id),
+    'created_at': column('created_at', Review.created_at, isoformat),
+}, key={'created_at': Review.created_at, 'id': Review.id},
+    joins=lambda query: query.select_from(Review)
+        .join(reviewer, Review.reviewer_id == reviewer.id)
+        .join(reviewee, Review.reviewee_id == reviewee.id))
+
+
+student = aliased(User)
+teacher = aliased(User)
+
+session_schema = Schema('session', {
+    'id': column('id', Session.id),
+    'student': Field({'student_id': Session.student_id, 'student_username': student.username},
+                     lambda row: {'id': row.student_id, 'username': row.student_username}),
+    'teacher': Field({'teacher_id': Session.teacher_id, 'teacher_username': teacher.username},
+                     lambda row: {'id': row.teacher_id, 'username': row.teacher_username}),
+    'listing': Field({'listing_id': Session.listing_id, 'listing_title': Listing.title, 'skill_name': Skill.name},
+                     lambda row: {'id': row.listing_id, 'title': row.listing_title, 'skill': {'name': row.skill_name}}),
+    'scheduled_time': column('scheduled_date', Session.scheduled_date, isoformat),
+    'duration_hours': column('duration_hours', Session.duration_hours),
+    'status': column('status', Session.status),
+    'notes': column('notes', Session.notes),
+}, key={'created_at': Session.created_at, 'id': Session.id},
+    joins=lambda query: query.select_from(Session)
+        .join(student, Session.student_id == student.id)
+        .join(teacher, Session.teacher_id == teacher.id)
+        .join(Listing, Session.listing_id == Listing.id)
+        .join(Skill, Listing.skill_id == Skill.id))
+
+# The same fields in calendar order, paged along the (user, scheduled_date) indexes
+calendar_schema = Schema('session', session_schema.fields,
+                         key={'scheduled_date': Session.scheduled_date, 'id': Session.id},
+                         joins=session_schema.joins)
+
+
+def _user_skills(row):
+    rows = db.session.query(
+        Skill.id, Skill.name, Skill.category, UserSkill.proficiency_level, UserSkill.years_experience
+    ).join(Skill, UserSkill.skill_id == Skill.id).filter(UserSkill.user_id == row.id)
+    return [{
+        'id': skill_id,
+        'name': name,
+        'category': category,
+        'proficiency_level': proficiency_level,
+        'years_experience': years_experience
+    } for skill_id, name, category, proficiency_level, years_experience in rows]
+
+
+def _user_listings(row):
+    rows = db.session.query(
+        Listing.id, Listing.title, Listing.description, Listing.price_per_hour, Skill.name
+    ).join(Skill, Listing.skill_id == Skill.id).filter(Listing.user_id == row.id)
+    return [{
+        'id': listing_id,
+        'title': title,
+        'description': description,
+        'price_per_hour': price_per_hour,
+        'skill_name': skill_name
+    } for listing_id, title, description, price_per_hour, skill_name in rows]
+
+
+RATING_BUCKETS = {f'rating_{star}_count': getattr(User, f'rating_{star}_count') for star in range(1, 6)}
+
+user_schema = Schema('user', {
+    'id': column('id', User.id),
+    'username': column('username', User.username),
+    'email': column('email', User.email),
+    'bio': column('bio', User.bio),
+    'created_at': column('created_at', User.created_at, isoformat),
+    'skills': Field({}, _user_skills),
+    'listings': Field({}, _user_listings),
+    'average_rating': Field({'rating_sum': User.rating_sum, 'rating_count': User.rating_count},
+                            lambda row: average_rating(row.rating_sum, row.rating_count)),
+    'total_reviews': column('rating_count', User.rating_count),
+    'rating_histogram': Field(RATING_BUCKETS,
+                              lambda row: {label.split('_')[1]: getattr(row, label) for label in RATING_BUCKETS}),
+}, key={'id': User.id})
+
+SCHEMAS = {
+    'listings': listing_schema,
+    'reviews': review_schema,
+    'sessions': session_schema,
+    'users': user_schema,
+}
@@ -0,0 +1,206 @@
+import re
+from sqlalchemy import Float, Integer, column, event, text
+
+from pagination import decode_cursor, PaginationError
+
+# listing_search is maintained by database triggers rather than the ORM, so
+# every write path (routes, seed, bulk loads) keeps it in sync. SQLite uses an
+# FTS5 table keyed by listing rowid; PostgreSQL a tsvector column with a GIN index.
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS listing_search USING fts5(
+        title, description, skill_name, skill_category,
+        tokenize = 'porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_listing_insert AFTER INSERT ON listings BEGIN
+        INSERT INTO listing_search (rowid, title, description, skill_name, skill_category)
+        SELECT new.id, new.title, new.description, skills.name, skills.category
+        FROM skills WHERE skills.id = new.skill_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_listing_update
+    AFTER UPDATE OF title, description, skill_id ON listings BEGIN
+        DELETE FROM listing_search WHERE rowid = old.id;
+        INSERT INTO listing_search (rowid, title, description, skill_name, skill_category)
+        SELECT new.id, new.title, new.description, skills.name, skills.category
+        FROM skills WHERE skills.id = new.skill_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_listing_delete AFTER DELETE ON listings BEGIN
+        DELETE FROM listing_search WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listing_search_skill_update
+    AFTER UPDATE OF name, category ON skills BEGIN
+        UPDATE listing_search SET skill_name = new.name, skill_category = new.category
+        WHERE rowid IN (SELECT id FROM listings WHERE skill_id = new.id);
+    END""",
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM listing_search",
+    """INSERT INTO listing_search (rowid, title, description, skill_name, skill_category)
+    SELECT listings.id, listings.title, listings.description, skills.name, skills.category
+    FROM listings JOIN skills ON skills.id = listings.skill_id""",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS listing_search_skill_update",
+    "DROP TRIGGER IF EXISTS listing_search_listing_delete",
+    "DROP TRIGGER IF EXISTS listing_search_listing_update",
+    "DROP TRIGGER IF EXISTS listing_search_listing_insert",
+    "DROP TABLE IF EXISTS listing_search",
+]
+
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS listing_search (
+        listing_id INTEGER PRIMARY KEY REFERENCES listings (id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_listing_search_document ON listing_search USING GIN (document)",
+    """CREATE OR REPLACE FUNCTION listing_search_document(title TEXT, description TEXT, skill_name TEXT, skill_category TEXT)
+    RETURNS TSVECTOR AS $$
+        SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(skill_name, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(skill_category, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    $$ LANGUAGE sql IMMUTABLE""",
+    """CREATE OR REPLACE FUNCTION listing_search_refresh_listing() RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO listing_search (listing_id, document)
+        SELECT NEW.id, listing_search_document(NEW.title, NEW.description, skills.name, skills.category)
+        FROM skills WHERE skills.id = NEW.skill_id
+        ON CONFLICT (listing_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION listing_search_refresh_skill() RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE listing_search
+        SET document = listing_search_document(listings.title, listings.description, NEW.name, NEW.category)
+        FROM listings
+        WHERE listings.skill_id = NEW.id AND listing_search.listing_id = listings.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS listing_search_listing ON listings",
+    """CREATE TRIGGER listing_search_listing
+    AFTER INSERT OR UPDATE OF title, description, skill_id ON listings
+    FOR EACH ROW EXECUTE PROCEDURE listing_search_refresh_listing()""",
+    "DROP TRIGGER IF EXISTS listing_search_skill ON skills",
+    """CREATE TRIGGER listing_search_skill
+    AFTER UPDATE OF name, category ON skills
+    FOR EACH ROW EXECUTE PROCEDURE listing_search_refresh_skill()""",
+]
+
+POSTGRES_REBUILD = [
+    "DELETE FROM listing_search",
+    """INSERT INTO listing_search (listing_id, document)
+    SELECT listings.id, listing_search_document(listings.title, listings.description, skills.name, skills.category)
+    FROM listings JOIN skills ON skills.id = listings.skill_id""",
+]
+
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS listing_search_skill ON skills",
+    "DROP TRIGGER IF EXISTS listing_search_listing ON listings",
+    "DROP TABLE IF EXISTS listing_search",
+    "DROP FUNCTION IF EXISTS listing_search_refresh_skill()",
+    "DROP FUNCTION IF EXISTS listing_search_refresh_listing()",
+    "DROP FUNCTION IF EXISTS listing_search_document(TEXT, TEXT, TEXT, TEXT)",
+]
+
+# Results are keyset-paged on (score, listing_id); {after} is empty on the
+# first page or the matching *_AFTER condition. Column weights for bm25():
+# title, description, skill name, skill category (lower scores rank first).
+SQLITE_SEARCH = """
+    SELECT listing_id, score FROM (
+        SELECT rowid AS listing_id, bm25(listing_search, 10.0, 1.0, 8.0, 4.0) AS score
+        FROM listing_search
+        WHERE listing_search MATCH :query
+    )
+    {after}
+    ORDER BY score, listing_id
+    LIMIT :limit
+"""
+SQLITE_AFTER = "WHERE score > :score OR (score = :score AND listing_id > :listing_id)"
+
+# float8 so the score survives the round trip through a cursor exactly
+POSTGRES_SEARCH = """
+    SELECT listing_id, score FROM (
+        SELECT listing_id, ts_rank_cd(document, query)::float8 AS score
+        FROM listing_search, to_tsquery('english', :query) AS query
+        WHERE document @@ query
+    ) AS matches
+    {after}
+    ORDER BY score DESC, listing_id
+    LIMIT :limit
+"""
+POSTGRES_AFTER = "WHERE score < :score OR (score = :score AND listing_id > :listing_id)"
+CURSOR_COLUMNS = (column('score', Float), column('listing_id', Integer))
+
+TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def _statements(dialect, sqlite, postgres):
+    if dialect == 'sqlite':
+        return sqlite
+    if dialect == 'postgresql':
+        return postgres
+    return []
+
+
+def create_search_index(connection):
+    dialect = connection.dialect.name
+    for statement in _statements(dialect, SQLITE_DDL + SQLITE_REBUILD, POSTGRES_DDL + POSTGRES_REBUILD):
+        connection.exec_driver_sql(statement)
+
+
+def drop_search_index(connection):
+    for statement in _statements(connection.dialect.name, SQLITE_DROP, POSTGRES_DROP):
+        connection.exec_driver_sql(statement)
+
+
+def rebuild_search_index(connection):
+    for statement in _statements(connection.dialect.name, SQLITE_REBUILD, POSTGRES_REBUILD):
+        connection.exec_driver_sql(statement)
+
+
+def build_query(dialect, q):
+    # Only word characters reach the engine, so user input can't inject
+    # FTS5 / tsquery operators; every term is a prefix match and all must hit
+    terms = TERM.findall(q.lower())
+    if not terms:
+        return None
+    if dialect == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def decode_search_cursor(cursor):
+    """The ``(score, listing_id)`` pair a search ``?cursor=`` resumes after."""
+    score, listing_id = decode_cursor(cursor, CURSOR_COLUMNS)
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or type(listing_id) is not int:
+        raise PaginationError('Invalid cursor')
+    return score, listing_id
+
+
+def search_listing_matches(session, q, limit, after=None):
+    """``(listing_id, score)`` rows of the best ``limit`` matches for ``q``,
+    resuming after the ``(score, listing_id)`` pair ``after`` if given."""
+    dialect = session.get_bind().dialect.name
+    query = build_query(dialect, q)
+    if query is None:
+        return []
+    sql = _statements(dialect, SQLITE_SEARCH, POSTGRES_SEARCH)
+    if not sql:
+        raise NotImplementedError(f'Full-text search is not supported on {dialect}')
+    params = {'query': query, 'limit': limit}
+    if after is None:
+        sql = sql.format(after='')
+    else:
+        sql = sql.format(after=_statements(dialect, SQLITE_AFTER, POSTGRES_AFTER))
+        params['score'], params['listing_id'] = after
+    return session.execute(text(sql), params).all()
+
+
+def register_search_index(metadata):
+    # Keep db.create_all()/drop_all() (used by seed.py) in step with the migrations
+    event.listen(metadata, 'after_create', lambda target, connection, **kw: create_search_index(connection))
+    event.listen(metadata, 'before_drop', lambda target, connection, **kw: drop_search_index(connection))
@@ -1,5 +1,13 @@
 import sys
 import os
+import io
+import csv
+import time
+import math
+import random
+import argparse
+from array import array
+from itertools import islice
 from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -7,6 +15,30 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from app import app
 from database import db
 from models import User, Skill, Listing, UserSkill, Session, Review
+from ratings import rebuild_rating_aggregates
+from leaderboard import refresh_leaderboard
+from search import create_search_index, drop_search_index
+from listing_cards import create_listing_cards, drop_listing_cards
+
+SKILLS_DATA = [
+    {"name": "Python Programming", "category": "Technology"},
+    {"name": "JavaScript", "category": "Technology"},
+    {"name": "Web Development", "category": "Technology"},
+    {"name": "Graphic Design", "category": "Design"},
+    {"name": "UI/UX Design", "category": "Design"},
+    {"name": "Cooking", "category": "Culinary"},
+    {"name": "Baking", "category": "Culinary"},
+    {"name": "Photography", "category": "Arts"},
+    {"name": "Digital Art", "category": "Arts"},
+    {"name": "Yoga", "category": "Fitness"},
+    {"name": "Meditation", "category": "Fitness"},
+    {"name": "Public Speaking", "category": "Communication"},
+    {"name": "Spanish Language", "category": "Language"},
+    {"name": "French Language", "category": "Language"},
+    {"name": "Financial Planning", "category": "Business"},
+    {"name": "Gardening", "category": "Lifestyle"},
+    {"name": "Home Organization", "category": "Lifestyle"}
+]
 
 def setup_database():
     with app.app_context():
@@ -15,28 +47,8 @@ def setup_database():
             db.create_all()
             print("✅ Database tables created successfully")
             
-            skills_data = [
-                {"name": "Python Programming", "category": "Technology"},
-                {"name": "JavaScript", "category": "Technology"},
-                {"name": "Web Development", "category": "Technology"},
-                {"name": "Graphic Design", "category": "Design"},
-                {"name": "UI/UX Design", "category": "Design"},
-                {"name": "Cooking", "category": "Culinary"},
-                {"name": "Baking", "category": "Culinary"},
-                {"name": "Photography", "category": "Arts"},
-                {"name": "Digital Art", "category": "Arts"},
-                {"name": "Yoga", "category": "Fitness"},
-                {"name": "Meditation", "category": "Fitness"},
-                {"name": "Public Speaking", "category": "Communication"},
-                {"name": "Spanish Language", "category": "Language"},
-                {"name": "French Language", "category": "Language"},
-                {"name": "Financial Planning", "category": "Business"},
-                {"name": "Gardening", "category": "Lifestyle"},
-                {"name": "Home Organization", "category": "Lifestyle"}
-            ]
-            
             skills = []
-            for skill_data in skills_data:
+            for skill_data in SKILLS_DATA:
                 skill = Skill(**skill_data)
                 db.session.add(skill)
                 skills.append(skill)
@@ -281,6 +293,8 @@ def setup_database():
                 db.session.add(review)
             
             db.session.commit()
+            rebuild_rating_aggregates()
+            refresh_leaderboard()
             print("✅ Reviews created successfully")
             
             user_count = User.query.count()
@@ -319,7 +333,271 @@ def setup_database():
             db.session.rollback()
             return False
 
+FIRST_NAMES = ["amina", "brian", "chloe", "daniel", "esther", "felix", "grace", "hassan", "ivy", "james",
+               "kamau", "lena", "moses", "nia", "oscar", "priya", "quinn", "rosa", "samuel", "tariq",
+               "uma", "victor", "wanjiru", "xavier", "yuki", "zawadi"]
+LAST_NAMES = ["otieno", "kim", "smith", "mwangi", "garcia", "park", "njoroge", "lee", "brown", "achieng",
+              "silva", "choi", "wambui", "martin", "ochieng", "lopez", "kariuki", "jung", "wilson", "mutua"]
+BIO_PHRASES = ["Passionate about learning new skills.", "Loves teaching beginners.", "Weekend hobbyist.",
+               "Career changer exploring new fields.", "Professional with years of industry experience.",
+               "Enjoys hands-on, project-based lessons.", "Lifelong learner and mentor."]
+TITLE_PREFIXES = ["Intro to", "Mastering", "Hands-on", "Advanced", "Practical", "Weekend", "Beginner's",
+                  "Professional", "Complete", "Fast-track"]
+TITLE_SUFFIXES = ["Workshop", "Bootcamp", "Masterclass", "Lessons", "Course", "Coaching", "Clinic", "Sessions"]
+DESCRIPTION_PHRASES = ["Learn the fundamentals step by step.", "Build real projects from day one.",
+                       "Personalised feedback every session.", "Suitable for complete beginners.",
+                       "Covers advanced techniques and best practices.", "Flexible pacing around your schedule.",
+                       "Includes practice exercises and resources.", "Taught by an experienced practitioner."]
+REVIEW_COMMENTS = ["Great session, very clear explanations.", "Helpful and patient teacher.",
+                   "Learned a lot, would book again.", "Good content but a bit rushed.",
+                   "Excellent real-world examples.", "Okay overall.", "Exceeded my expectations."]
+PROFICIENCY_LEVELS = ["beginner", "intermediate", "advanced", "expert"]
+GENERATED_PASSWORD = "password123"
+# Fixed anchor so the same --seed always yields the same rows
+GENERATED_ANCHOR = datetime(2025, 1, 1)
+# Sessions start on the hour between 270 days before and 90 days after the anchor
+SESSION_WINDOW_HOURS = (-270 * 24, 90 * 24)
+SESSION_DURATIONS = [0.5, 1.0, 1.5, 2.0, 3.0]
+SLOT_ATTEMPTS = 100
+BATCH_SIZE = 5000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the SkillSwap database.")
+    parser.add_argument("--users", type=int, help="Generate N synthetic users instead of the demo data")
+    parser.add_argument("--listings", type=int, help="Listings to generate (default: one per user)")
+    parser.add_argument("--sessions", type=int, help="Sessions to generate (default: two per user)")
+    parser.add_argument("--reviews", type=int, help="Reviews to generate, at most one per completed session (default: half the sessions)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per bulk insert batch")
+    return parser.parse_args()
+
+def batched(rows, size):
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def copy_rows(connection, table, columns, rows, batch_size):
+    # PostgreSQL: stream CSV through COPY, far faster than INSERT batches
+    cursor = connection.connection.cursor()
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    count = 0
+    for batch in batched(rows, batch_size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        count += len(batch)
+    return count
+
+def insert_rows(connection, table, columns, rows, batch_size):
+    statement = table.insert()
+    count = 0
+    for batch in batched(rows, batch_size):
+        connection.execute(statement, [dict(zip(columns, row)) for row in batch])
+        count += len(batch)
+    return count
+
+def load_table(connection, model, columns, rows, batch_size):
+    started = time.perf_counter()
+    table = model.__table__
+    if connection.dialect.name == "postgresql":
+        count = copy_rows(connection, table, columns, rows, batch_size)
+    else:
+        count = insert_rows(connection, table, columns, rows, batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {table.name}: {count} rows in {elapsed:.2f}s")
+
+def generate_dataset(users, listings, sessions, reviews, seed, batch_size=BATCH_SIZE):
+    """Bulk-load a generated dataset; returns the number of reviews generated,
+    which is capped at the sessions that were completed."""
+    rng = random.Random(seed)
+    skill_count = len(SKILLS_DATA)
+    # Hash once and share it: bcrypt per user would dominate the load time
+    hasher = User(username="", email="")
+    hasher.set_password(GENERATED_PASSWORD)
+    password_hash = hasher.password_hash
+
+    # Roughly a third of users teach; each teacher covers one to three skills
+    teacher_count = max(1, users // 3)
+    teacher_ids = rng.sample(range(1, users + 1), teacher_count)
+    teacher_skills = {teacher_id: rng.sample(range(1, skill_count + 1), rng.randint(1, 3)) for teacher_id in teacher_ids}
+
+    def user_rows():
+        for user_id in range(1, users + 1):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            created_at = GENERATED_ANCHOR - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+            yield (user_id, f"{first}{last}{user_id}", f"{first}.{last}{user_id}@example.com",
+                   password_hash, rng.choice(BIO_PHRASES), created_at)
+
+    def skill_rows():
+        for skill_id, skill in enumerate(SKILLS_DATA, start=1):
+            yield (skill_id, skill["name"], skill["category"], None)
+
+    def user_skill_rows():
+        user_skill_id = 0
+        for user_id in range(1, users + 1):
+            if user_id in teacher_skills:
+                skills = [(skill_id, rng.choice(PROFICIENCY_LEVELS[2:])) for skill_id in teacher_skills[user_id]]
+            else:
+                skills = [(skill_id, rng.choice(PROFICIENCY_LEVELS[:2]))
+                          for skill_id in rng.sample(range(1, skill_count + 1), rng.randint(1, 3))]
+            for skill_id, level in skills:
+                user_skill_id += 1
+                years = rng.randint(3, 20) if level in PROFICIENCY_LEVELS[2:] else rng.randint(0, 3)
+                yield (user_skill_id, user_id, skill_id, level, years, GENERATED_ANCHOR, GENERATED_ANCHOR)
+
+    listing_teacher = array("i")
+
+    def listing_rows():
+        for listing_id in range(1, listings + 1):
+            teacher_id = rng.choice(teacher_ids)
+            skill_id = rng.choice(teacher_skills[teacher_id])
+            listing_teacher.append(teacher_id)
+            skill_name = SKILLS_DATA[skill_id - 1]["name"]
+            title = f"{rng.choice(TITLE_PREFIXES)} {skill_name} {rng.choice(TITLE_SUFFIXES)}"
+            description = " ".join(rng.sample(DESCRIPTION_PHRASES, 3))
+            created_at = GENERATED_ANCHOR - timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+            yield (listing_id, title, description, float(rng.randrange(100, 1000, 25)),
+                   teacher_id, skill_id, created_at)
+
+    session_student = array("i")
+    session_teacher = array("i")
+    # Hours (from the anchor) each user is booked for, so no teacher or
+    # student is generated into two sessions at once
+    busy_hours = {}
+    completed = []
+
+    def free_slot(teacher_id, student_id):
+        teacher_busy = busy_hours.setdefault(teacher_id, set())
+        student_busy = busy_hours.setdefault(student_id, set())
+        for _ in range(SLOT_ATTEMPTS):
+            start = rng.randint(*SESSION_WINDOW_HOURS)
+            duration = rng.choice(SESSION_DURATIONS)
+            hours = range(start, start + math.ceil(duration))
+            if not any(hour in teacher_busy or hour in student_busy for hour in hours):
+                teacher_busy.update(hours)
+                student_busy.update(hours)
+                return start, duration
+        raise ValueError(f"No free slot left for teacher {teacher_id} and student {student_id}; "
+                         f"generate fewer sessions per user")
+
+    def session_rows():
+        for session_id in range(1, sessions + 1):
+            listing_id = rng.randint(1, listings)
+            teacher_id = listing_teacher[listing_id - 1]
+            student_id = rng.randint(1, users)
+            if student_id == teacher_id:
+                student_id = student_id % users + 1
+            session_student.append(student_id)
+            session_teacher.append(teacher_id)
+            start, duration = free_slot(teacher_id, student_id)
+            scheduled_date = GENERATED_ANCHOR + timedelta(hours=start)
+            end = scheduled_date + timedelta(hours=duration)
+            if end <= GENERATED_ANCHOR:
+                status = "completed" if rng.random() < 0.9 else "cancelled"
+            else:
+                status = rng.choice(["scheduled", "cancelled"])
+            if status == "completed":
+                completed.append((session_id, end))
+            yield (session_id, student_id, teacher_id, listing_id, scheduled_date,
+                   duration, status, None, scheduled_date - timedelta(days=rng.randint(1, 30)))
+
+    review_count = 0
+
+    def review_rows():
+        # Only sessions that took place get reviewed, some time after they ended
+        nonlocal review_count
+        count = review_count = min(reviews, len(completed))
+        if count < reviews:
+            print(f"⚠️ Only {len(completed)} sessions were completed; generating {count} reviews")
+        reviewed = sorted(rng.sample(completed, count))
+        for review_id, (session_id, end) in enumerate(reviewed, start=1):
+            rating = rng.choices([1, 2, 3, 4, 5], weights=[1, 2, 5, 12, 20])[0]
+            yield (review_id, rating, rng.choice(REVIEW_COMMENTS), session_student[session_id - 1],
+                   session_teacher[session_id - 1], session_id, end + timedelta(hours=rng.randint(1, 72)))
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print("✅ Database tables created successfully")
+
+        with db.engine.begin() as connection:
+            # Triggers would update the search index and listing cards row by
+            # row; rebuild them once at the end
+            drop_search_index(connection)
+            drop_listing_cards(connection)
+            load_table(connection, User, ["id", "username", "email", "password_hash", "bio", "created_at"],
+                       user_rows(), batch_size)
+            load_table(connection, Skill, ["id", "name", "category", "description"], skill_rows(), batch_size)
+            load_table(connection, UserSkill, ["id", "user_id", "skill_id", "proficiency_level", "years_experience", "created_at",
+                                               "updated_at"],
+                       user_skill_rows(), batch_size)
+            load_table(connection, Listing, ["id", "title", "description", "price_per_hour", "user_id", "skill_id", "created_at"],
+                       listing_rows(), batch_size)
+            load_table(connection, Session, ["id", "student_id", "teacher_id", "listing_id", "scheduled_date",
+                                             "duration_hours", "status", "notes", "created_at"],
+                       session_rows(), batch_size)
+            load_table(connection, Review, ["id", "rating", "comment", "reviewer_id", "reviewee_id", "session_id", "created_at"],
+                       review_rows(), batch_size)
+
+            started = time.perf_counter()
+            create_search_index(connection)
+            print(f"✅ Search index built in {time.perf_counter() - started:.2f}s")
+
+            if connection.dialect.name == "postgresql":
+                # Explicit ids leave the serial sequences behind
+                for table in ("users", "skills", "user_skills", "listings", "sessions", "reviews"):
+                    connection.exec_driver_sql(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+                    )
+
+        rebuild_rating_aggregates()
+        refresh_leaderboard()
+        with db.engine.begin() as connection:
+            started = time.perf_counter()
+            create_listing_cards(connection)
+            print(f"✅ Listing cards built in {time.perf_counter() - started:.2f}s")
+            connection.exec_driver_sql("ANALYZE")
+        print(f"✅ Rating aggregates and leaderboard rebuilt; every generated user's password is {GENERATED_PASSWORD}")
+    return review_count
+
+def run_generator(args):
+    listings = args.listings if args.listings is not None else args.users
+    sessions = args.sessions if args.sessions is not None else args.users * 2
+    reviews = args.reviews if args.reviews is not None else sessions // 2
+
+    if args.users < 2:
+        print("❌ --users must be at least 2")
+        return False
+    if sessions and not listings:
+        print("❌ --sessions needs at least one listing")
+        return False
+    if reviews > sessions:
+        print("❌ --reviews cannot exceed --sessions (one review per session)")
+        return False
+
+    started = time.perf_counter()
+    try:
+        reviews = generate_dataset(args.users, listings, sessions, reviews, args.seed, args.batch_size)
+    except Exception as e:
+        print(f"❌ Error during data generation: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    print(f"\n🎉 Generated {args.users} users, {listings} listings, {sessions} sessions and "
+          f"{reviews} reviews in {time.perf_counter() - started:.2f}s (seed {args.seed})")
+    return True
+
 if __name__ == "__main__":
-    success = setup_database()
+    args = parse_args()
+    if args.users is not None:
+        success = run_generator(args)
+    else:
+        success = setup_database()
     if not success:
         sys.exit(1)
\ No newline at end of file
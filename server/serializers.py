@@ -0,0 +1,66 @@
+from datetime import date
+from decimal import Decimal
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Clients asking for MessagePack get JSON
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def encode_default(value):
+    """Values the encoders don't handle natively. Datetimes are left in rows
+    by the schema encoders and come out as ISO 8601 in every format."""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not serializable')
+
+
+def negotiated_mimetype():
+    """``application/msgpack`` when the request prefers it, otherwise JSON."""
+    if msgpack is None or not has_request_context():
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match((JSON_MIMETYPE, MSGPACK_MIMETYPE), JSON_MIMETYPE)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """``app.json`` backed by orjson, answering ``jsonify`` with MessagePack
+    when the client sends ``Accept: application/msgpack``."""
+
+    # Key order is the order the schema declares fields in; sorting every
+    # object was a measurable part of encoding large pages
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('indent'):
+            kwargs.setdefault('default', encode_default)
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=encode_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        mimetype = negotiated_mimetype()
+        if mimetype == JSON_MIMETYPE:
+            response = super().response(*args, **kwargs)
+        else:
+            obj = self._prepare_response_obj(args, kwargs)
+            body = msgpack.packb(obj, default=encode_default)
+            response = self._app.response_class(body, mimetype=MSGPACK_MIMETYPE)
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
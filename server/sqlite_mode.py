@@ -0,0 +1,161 @@
+import os
+import re
+import time
+import threading
+from collections import deque
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads still queue; processes fall back to busy_timeout
+    fcntl = None
+
+# BEGIN IMMEDIATE takes the write lock up front (see scheduling.lock_participants)
+WRITE_STATEMENT = re.compile(r'\s*(INSERT|UPDATE|DELETE|REPLACE|BEGIN\s+IMMEDIATE)\b', re.IGNORECASE)
+FILE_LOCK_POLL_SECONDS = 0.002
+
+
+class WriterQueueTimeout(RuntimeError):
+    pass
+
+
+class WriterQueue:
+    """Writers to one SQLite file take turns instead of contending for its lock.
+
+    Threads of this process are served in arrival order; the holder also
+    takes an exclusive lock on ``<database>-writer.lock`` so gunicorn
+    workers take turns with each other too.
+    """
+
+    def __init__(self, database_path):
+        self.lock_path = database_path + '-writer.lock'
+        self.mutex = threading.Lock()
+        self.waiting = deque()
+        self.held = False
+        self.fd = None
+        self.fd_pid = None
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        turn = threading.Event()
+        with self.mutex:
+            if self.held:
+                self.waiting.append(turn)
+            else:
+                self.held = True
+                turn.set()
+        if not turn.wait(timeout):
+            with self.mutex:
+                # The turn may have been handed over just as the wait timed out
+                if not turn.is_set():
+                    self.waiting.remove(turn)
+                    raise WriterQueueTimeout(f'Waited over {timeout}s for the database writer queue')
+        try:
+            self._lock_file(deadline)
+        except Exception:
+            self._hand_off()
+            raise
+
+    def release(self):
+        if fcntl is not None and self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self._hand_off()
+
+    def _hand_off(self):
+        with self.mutex:
+            if self.waiting:
+                self.waiting.popleft().set()
+            else:
+                self.held = False
+
+    def _lock_file(self, deadline):
+        if fcntl is None:
+            return
+        if self.fd_pid != os.getpid():
+            # flock is shared with the parent through an inherited descriptor,
+            # so every forked worker opens its own
+            self.fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            self.fd_pid = os.getpid()
+        while True:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    raise WriterQueueTimeout('Waited too long for another worker to finish writing')
+                time.sleep(FILE_LOCK_POLL_SECONDS)
+
+
+class SQLiteMode:
+    """Production settings for file-backed SQLite engines.
+
+    Every new connection switches to WAL (readers no longer block behind the
+    writer), ``synchronous=NORMAL``, a larger page cache and mmap window and
+    a ``busy_timeout``. Transactions queue for the writer turn at their first
+    INSERT/UPDATE/DELETE and hand it on when the connection goes back to the
+    pool after commit or rollback. Reads never queue, so a request that reads
+    and then hashes a password doesn't hold up writers.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.queues = {}
+        self.timeout = 5
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db=None):
+        if db is None or not app.config.get('SQLITE_TUNING_ENABLED', True):
+            return
+        self.timeout = app.config.get('SQLITE_BUSY_TIMEOUT', 5)
+        pragmas = [
+            f"journal_mode={app.config.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+            f"synchronous={app.config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+            f"mmap_size={int(app.config.get('SQLITE_MMAP_SIZE', 0))}",
+            # Negative sizes are in KiB rather than pages
+            f"cache_size={-int(app.config.get('SQLITE_CACHE_SIZE_KB', 2000))}",
+            f"busy_timeout={int(self.timeout * 1000)}",
+        ]
+        with app.app_context():
+            for engine in db.engines.values():
+                database = engine.url.database
+                if engine.dialect.name != 'sqlite' or database in (None, '', ':memory:'):
+                    continue
+                queue = None
+                if app.config.get('SQLITE_WRITER_QUEUE', True):
+                    path = os.path.abspath(database)
+                    queue = self.queues.setdefault(path, WriterQueue(path))
+                self._tune(engine, pragmas, queue)
+        app.extensions['sqlite_mode'] = self
+
+    def _tune(self, engine, pragmas, queue):
+        @event.listens_for(engine, 'connect')
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(f'PRAGMA {pragma}')
+            cursor.close()
+
+        if queue is None:
+            return
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def queue_writer(conn, cursor, statement, parameters, context, executemany):
+            if 'sqlite_writer' not in conn.info and WRITE_STATEMENT.match(statement):
+                queue.acquire(self.timeout)
+                conn.info['sqlite_writer'] = queue
+
+        @event.listens_for(engine.pool, 'checkin')
+        def release_writer(dbapi_connection, connection_record):
+            if connection_record is not None:
+                held = connection_record.info.pop('sqlite_writer', None)
+                if held is not None:
+                    held.release()
+
+        @event.listens_for(engine.pool, 'invalidate')
+        def release_invalidated(dbapi_connection, connection_record, exception):
+            held = connection_record.info.pop('sqlite_writer', None)
+            if held is not None:
+                held.release()
+
+
+sqlite_mode = SQLiteMode()
@@ -0,0 +1,79 @@
+from flask import Response, current_app, request, stream_with_context
+
+from pagination import get_limit, keyset, row_cursor
+
+# Rows fetched per round trip. On PostgreSQL yield_per() also switches to a
+# server-side (named) cursor, so neither the driver nor the app ever holds
+# more than one batch.
+STREAM_BATCH_SIZE = 500
+# Rows serialized per chunk written to the socket
+STREAM_CHUNK_ROWS = 100
+
+FORMATS = ('json', 'ndjson')
+
+
+class StreamingError(ValueError):
+    pass
+
+
+def stream_format():
+    """The streaming format requested with ``?stream=json|ndjson``, or None."""
+    value = request.args.get('stream')
+    if not value:
+        return None
+    if value not in FORMATS:
+        raise StreamingError(f"stream must be one of: {', '.join(FORMATS)}")
+    return value
+
+
+def _chunks(rows, limit, cursor, serialize, fmt, collection):
+    dumps = current_app.json.dumps
+    if fmt == 'json':
+        yield '{"%s": [' % collection
+    first = True
+    buffer = []
+    sent = 0
+    last = None
+    next_cursor = None
+    for row in rows:
+        if sent == limit:
+            # The extra row only tells us there is more
+            next_cursor = cursor(last)
+            break
+        item = dumps(serialize(row))
+        if fmt == 'ndjson':
+            buffer.append(item + '\n')
+        else:
+            buffer.append(item if first else ',' + item)
+            first = False
+        sent += 1
+        last = row
+        if len(buffer) >= STREAM_CHUNK_ROWS:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+    if fmt == 'json':
+        yield '], "next_cursor": %s}' % dumps(next_cursor)
+    elif next_cursor is not None:
+        yield dumps({'next_cursor': next_cursor}) + '\n'
+
+
+def stream_rows(query, columns, serialize, fmt, collection, key=None, descending=False):
+    """Stream the rows of ``query`` as a JSON object or NDJSON lines.
+
+    Rows are ordered and resumed like :func:`pagination.paginate`. ``?limit=``
+    is honoured up to ``STREAM_MAX_ROWS``, which is also the default; when
+    rows are left over the stream ends with a cursor to resume from.
+    ``fmt == 'json'`` produces ``{"<collection>": [...], "next_cursor": ...}``,
+    the same shape as the paginated response; ``'ndjson'`` one object per line,
+    followed by a ``{"next_cursor": ...}`` line only if the stream was cut short.
+    The request context (and with it the database session) stays open until
+    the last chunk has been sent.
+    """
+    cap = current_app.config['STREAM_MAX_ROWS']
+    limit = get_limit(default=cap, maximum=cap)
+    rows = keyset(query, columns, descending).limit(limit + 1).yield_per(STREAM_BATCH_SIZE)
+    cursor = lambda row: row_cursor(row, columns, key)
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+    return Response(stream_with_context(_chunks(rows, limit, cursor, serialize, fmt, collection)), mimetype=mimetype)
@@ -0,0 +1,99 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Hash in-process: the spawn pool can't start from under pytest's stdin capture
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+from app import create_app
+from database import db
+from models import User, Skill, Listing, Session
+from flask_jwt_extended import create_access_token
+
+
+def make_app(database_path, **overrides):
+    config = {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'PASSWORD_HASH_WORKERS': 0,
+        'METRICS_ENABLED': False,
+    }
+    config.update(overrides)
+    app = create_app(config)
+    with app.app_context():
+        # Only the primary: replica binds registered by another test's app
+        # stay on the shared metadata
+        db.create_all(bind_key=None)
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path / 'skillswap.db')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(username, **fields):
+        with app.app_context():
+            # A placeholder hash: these tests never log in with a password
+            user = User(username=username, email=f'{username}@example.com', password_hash='x', **fields)
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return make
+
+
+@pytest.fixture
+def auth(app):
+    def headers(user_id):
+        with app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    return headers
+
+
+@pytest.fixture
+def skill(app):
+    with app.app_context():
+        skill = Skill(name='Python', category='Programming')
+        db.session.add(skill)
+        db.session.commit()
+        return skill.id
+
+
+@pytest.fixture
+def make_listing(app, skill):
+    def make(teacher_id, title='Python basics', created_at=None):
+        with app.app_context():
+            listing = Listing(title=title, description='Learn Python', price_per_hour=100.0,
+                              user_id=teacher_id, skill_id=skill, created_at=created_at or datetime.utcnow())
+            db.session.add(listing)
+            db.session.commit()
+            return listing.id
+    return make
+
+
+@pytest.fixture
+def make_session(app):
+    def make(student_id, teacher_id, listing_id, starts_in, status='scheduled'):
+        with app.app_context():
+            session = Session(student_id=student_id, teacher_id=teacher_id, listing_id=listing_id,
+                              scheduled_date=datetime.utcnow() + starts_in, duration_hours=1.0, status=status)
+            db.session.add(session)
+            db.session.commit()
+            return session.id
+    return make
+
@@ -0,0 +1,74 @@
+from flask import request
+
+
+def statuses(response):
+    return [result['status'] for result in response.get_json()['results']]
+
+
+def test_partial_failure_is_207(client, skill):
+    response = client.post('/api/batch', json={'items': [
+        {'method': 'GET', 'path': '/api/skills'},
+        {'method': 'GET', 'path': '/api/listings/999'},
+        {'method': 'GET', 'path': '/api/batch'},
+    ]})
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert statuses(response) == [200, 404, 400]
+    assert results[0]['body']['skills'][0]['id'] == skill
+    assert results[1]['error'] == 'Listing not found'
+
+
+def test_all_ok_is_200(client, skill):
+    response = client.post('/api/batch', json=[{'path': '/api/skills'}, {'path': '/api/listings'}])
+    assert response.status_code == 200
+    assert statuses(response) == [200, 200]
+
+
+def test_item_limit(app, client):
+    limit = app.config['BATCH_MAX_REQUESTS']
+    response = client.post('/api/batch', json=[{'path': '/api/skills'}] * (limit + 1))
+    assert response.status_code == 400
+    assert str(limit) in response.get_json()['error']
+
+
+def test_token_reaches_sub_requests(client, make_user, auth):
+    user = make_user('learner')
+    items = [{'path': '/api/sessions'}, {'path': '/api/sessions/calendar'}]
+
+    response = client.post('/api/batch', headers=auth(user), json=items)
+    assert statuses(response) == [200, 200]
+
+    # Without a token each protected item fails on its own
+    response = client.post('/api/batch', json=items)
+    assert response.status_code == 207
+    assert statuses(response) == [401, 401]
+
+
+def test_bad_token_fails_the_batch(client):
+    response = client.post('/api/batch', headers={'Authorization': 'Bearer not-a-token'},
+                           json=[{'path': '/api/skills'}])
+    assert response.status_code in (401, 422)
+    assert 'results' not in response.get_json()
+
+
+def test_writes_are_seen_by_later_reads(client, make_user, auth):
+    user = make_user('teacher')
+    response = client.post('/api/batch', headers=auth(user), json=[
+        {'method': 'POST', 'path': '/api/skills', 'body': {'name': 'Go', 'category': 'Programming'}},
+        {'path': '/api/skills'},
+        {'path': '/api/skills?limit=1'},
+    ])
+    assert statuses(response)[0] == 201
+    for result in response.get_json()['results'][1:]:
+        assert [skill['name'] for skill in result['body']['skills']] == ['Go']
+
+
+def test_sub_requests_run_request_hooks(app, client, skill):
+    seen = []
+
+    @app.before_request
+    def record():
+        seen.append(request.path)
+
+    client.post('/api/batch', json=[{'path': '/api/skills'}, {'path': '/api/listings'}])
+    assert sorted(seen) == ['/api/batch', '/api/listings', '/api/skills']
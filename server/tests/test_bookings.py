@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from database import db
+from scheduling import MAX_SESSION_HOURS, DurationError, parse_duration
+
+
+def starts_in(days, hours=0):
+    start = datetime.utcnow().replace(hour=10, minute=0, second=0, microsecond=0)
+    return (start + timedelta(days=days, hours=hours)).isoformat()
+
+
+@pytest.fixture
+def people(make_user, make_listing):
+    teacher, student, other = make_user('teacher'), make_user('student'), make_user('other')
+    return teacher, student, other, make_listing(teacher)
+
+
+def book(client, auth, student, listing, scheduled_date, **fields):
+    return client.post('/api/sessions', headers=auth(student),
+                       json={'listing_id': listing, 'scheduled_date': scheduled_date, **fields})
+
+
+def test_teacher_conflict_is_409(client, auth, people):
+    teacher, student, other, listing = people
+    assert book(client, auth, student, listing, starts_in(2), duration_hours=2).status_code == 201
+
+    response = book(client, auth, other, listing, starts_in(2, hours=1))
+    assert response.status_code == 409
+    assert response.get_json()['error'] == 'Teacher already has a session at that time'
+
+    # Back to back is not an overlap
+    assert book(client, auth, other, listing, starts_in(2, hours=2)).status_code == 201
+
+
+def test_student_conflict_is_409(client, auth, make_user, make_listing, people):
+    _, student, _, listing = people
+    second_listing = make_listing(make_user('second teacher'))
+    assert book(client, auth, student, listing, starts_in(3)).status_code == 201
+
+    response = book(client, auth, student, second_listing, starts_in(3))
+    assert response.status_code == 409
+    assert response.get_json()['error'] == 'You already have a session at that time'
+
+
+def test_booking_leaves_users_untouched(app, client, auth, people):
+    _, student, _, listing = people
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        assert book(client, auth, student, listing, starts_in(4)).status_code == 201
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert 'BEGIN IMMEDIATE' in statements
+    assert not [s for s in statements if s.lstrip().upper().startswith('UPDATE')]
+
+
+@pytest.mark.parametrize('duration', [MAX_SESSION_HOURS + 1, 0.25, 'abc', 'nan'])
+def test_booking_duration_is_bounded(client, auth, people, duration):
+    _, student, _, listing = people
+    response = book(client, auth, student, listing, starts_in(5), duration_hours=duration)
+    assert response.status_code == 400
+    assert 'Duration' in response.get_json()['error']
+
+
+def test_booking_longest_session(client, auth, people):
+    _, student, _, listing = people
+    assert book(client, auth, student, listing, starts_in(5), duration_hours=MAX_SESSION_HOURS).status_code == 201
+
+
+@pytest.mark.parametrize('value, hours', [(None, 1.0), ('', 1.0), ('0.5', 0.5), (str(MAX_SESSION_HOURS), MAX_SESSION_HOURS)])
+def test_parse_duration(value, hours):
+    assert parse_duration(value) == hours
+
+
+@pytest.mark.parametrize('value', ['0', '-1', 'nan', 'inf', str(MAX_SESSION_HOURS + 1), 'abc'])
+def test_parse_duration_rejects(value):
+    with pytest.raises(DurationError):
+        parse_duration(value)
+
+
+@pytest.mark.parametrize('duration, status', [('2', 200), ('nan', 400), ('0', 400), (str(MAX_SESSION_HOURS + 1), 400)])
+def test_availability_duration(client, auth, people, duration, status):
+    teacher, student, _, _ = people
+    response = client.get(f'/api/sessions/availability?teacher_id={teacher}&duration_hours={duration}',
+                          headers=auth(student))
+    assert response.status_code == status
+    if status == 400:
+        assert 'duration_hours' in response.get_json()['error']
@@ -0,0 +1,78 @@
+from flask import jsonify
+
+import cache
+from cache import response_cache, FileBackend, MemoryBackend
+from conftest import make_app
+from database import db
+from models import Skill
+
+
+def add_skill(app, name):
+    with app.app_context():
+        db.session.add(Skill(name=name, category='Programming'))
+        db.session.commit()
+
+
+def skill_names(response):
+    return [skill['name'] for skill in response.get_json()['skills']]
+
+
+def test_committed_write_invalidates(app, client):
+    add_skill(app, 'Python')
+    assert client.get('/api/skills').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/skills').headers['X-Cache'] == 'HIT'
+
+    add_skill(app, 'Rust')
+    response = client.get('/api/skills')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert skill_names(response) == ['Python', 'Rust']
+
+
+def test_generation_moves_on_commit_only(app):
+    backend = response_cache.backend
+    with app.app_context():
+        before = backend.generation('skills')
+        db.session.add(Skill(name='Python', category='Programming'))
+        db.session.flush()
+        assert backend.generation('skills') == before
+        db.session.rollback()
+        assert backend.generation('skills') == before
+
+        db.session.add(Skill(name='Rust', category='Programming'))
+        db.session.commit()
+        assert backend.generation('skills') == before + 1
+
+
+def test_key_is_taken_before_the_read(app, client):
+    # A write committed while the view runs must not be hidden behind a page
+    # stored under the new generation
+    @app.route('/api/test/racing-skills')
+    @response_cache.cached('skills')
+    def racing_skills():
+        names = [skill.name for skill in Skill.query.order_by(Skill.id)]
+        db.session.add(Skill(name=f'Skill {len(names)}', category='Programming'))
+        db.session.commit()
+        return jsonify({'skills': names})
+
+    assert client.get('/api/test/racing-skills').get_json() == {'skills': []}
+    response = client.get('/api/test/racing-skills')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json() == {'skills': ['Skill 0']}
+
+
+def test_workers_share_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'SHARED_DIRECTORY', str(tmp_path / 'shared'))
+    make_app(tmp_path / 'worker.db', WEB_CONCURRENCY=2)
+    worker = response_cache.backend
+    assert isinstance(worker, FileBackend)
+
+    # Another worker process sees this one's writes through the directory
+    other = FileBackend(str(tmp_path / 'shared'), 16)
+    before = other.generation('skills')
+    worker.bump('skills')
+    assert other.generation('skills') == before + 1
+
+
+def test_single_worker_keeps_memory_cache(tmp_path):
+    make_app(tmp_path / 'worker.db', WEB_CONCURRENCY=1)
+    assert isinstance(response_cache.backend, MemoryBackend)
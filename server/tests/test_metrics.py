@@ -0,0 +1,27 @@
+import pytest
+
+from conftest import make_app
+
+
+@pytest.fixture
+def metrics_client(tmp_path):
+    return make_app(tmp_path / 'metrics.db', METRICS_ENABLED=True, METRICS_TOKEN='scrape-me').test_client()
+
+
+@pytest.mark.parametrize('headers', [{}, {'Authorization': 'Bearer wrong'}, {'Authorization': 'scrape-me'}])
+def test_metrics_need_the_token(metrics_client, headers):
+    response = metrics_client.get('/api/metrics', headers=headers)
+    assert response.status_code == 401
+    assert b'skillswap_' not in response.data
+
+
+def test_metrics_with_the_token(metrics_client):
+    metrics_client.get('/api/skills')
+    response = metrics_client.get('/api/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert b'skillswap_http_requests_total' in response.data
+
+
+def test_no_metrics_endpoint_without_a_token(tmp_path):
+    client = make_app(tmp_path / 'metrics.db', METRICS_ENABLED=True).test_client()
+    assert client.get('/api/metrics').status_code == 404
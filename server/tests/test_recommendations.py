@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from database import db
+from models import Skill, UserSkill
+from recommendations import recommendation_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(app):
+    # The index is a process-wide singleton; start each test from nothing
+    recommendation_index.snapshot = None
+    recommendation_index.refresh_seconds = 0
+    yield recommendation_index
+    if recommendation_index.worker is not None:
+        recommendation_index.worker.join()
+
+
+@pytest.fixture
+def people(app, make_user, make_listing, skill):
+    with app.app_context():
+        rust = Skill(name='Rust', category='Programming')
+        db.session.add(rust)
+        db.session.commit()
+        rust = rust.id
+    learner, python_teacher, rust_teacher = make_user('learner'), make_user('pythonista'), make_user('rustacean')
+    with app.app_context():
+        db.session.add_all([
+            UserSkill(user_id=learner, skill_id=skill, proficiency_level='beginner'),
+            UserSkill(user_id=python_teacher, skill_id=skill, proficiency_level='expert', years_experience=10),
+            UserSkill(user_id=rust_teacher, skill_id=rust, proficiency_level='expert', years_experience=10),
+        ])
+        db.session.commit()
+    make_listing(python_teacher)
+    return learner, python_teacher, rust_teacher
+
+
+def test_recommends_teachers_of_wanted_skills(client, auth, people, skill):
+    learner, python_teacher, _ = people
+    body = client.get(f'/api/users/{learner}/recommendations', headers=auth(learner)).get_json()
+    first = body['recommendations'][0]
+    assert first['teacher']['id'] == python_teacher
+    assert first['shared_skills'] == [{'id': skill, 'name': 'Python'}]
+    assert learner not in [r['teacher']['id'] for r in body['recommendations']]
+
+
+def test_recommendations_are_private(client, auth, people):
+    learner, python_teacher, _ = people
+    response = client.get(f'/api/users/{learner}/recommendations', headers=auth(python_teacher))
+    assert response.status_code == 403
+
+
+def update_in_another_worker(app, user_id, level, updated_at):
+    # Raw SQL: nothing in this process hears about the write
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(text('UPDATE user_skills SET proficiency_level = :level, updated_at = :updated_at '
+                                'WHERE user_id = :user_id'),
+                           {'level': level, 'updated_at': updated_at, 'user_id': user_id})
+
+
+def interests(snapshot, user_id):
+    return snapshot.interest_row(user_id)[0].tolist()
+
+
+def test_refresh_runs_in_background_and_sees_updates(app, people, fresh_index):
+    learner = people[0]
+    with app.test_request_context():
+        before = fresh_index.current()
+    assert interests(before, learner) != []
+
+    update_in_another_worker(app, learner, 'expert', datetime.utcnow())
+    with app.test_request_context():
+        # The request is answered from the current snapshot
+        assert fresh_index.current() is before
+    fresh_index.worker.join()
+    assert interests(fresh_index.snapshot, learner) == []
+
+
+def test_refresh_sees_updates_committed_out_of_order(app, people, fresh_index):
+    learner, python_teacher, _ = people
+    with app.test_request_context():
+        fresh_index.current()
+    update_in_another_worker(app, python_teacher, 'advanced', datetime.utcnow())
+    with app.test_request_context():
+        fresh_index.current()
+    fresh_index.worker.join()
+
+    # Stamped before the last mark but committed after it
+    update_in_another_worker(app, learner, 'expert', datetime.utcnow() - timedelta(seconds=10))
+    with app.test_request_context():
+        fresh_index.current()
+    fresh_index.worker.join()
+    assert interests(fresh_index.snapshot, learner) == []
@@ -0,0 +1,36 @@
+import sqlite3
+
+from database import db
+from models import Skill
+from conftest import make_app
+
+
+def add_skill(app, name):
+    with app.app_context():
+        db.session.add(Skill(name=name, category='Programming'))
+        db.session.commit()
+
+
+def skill_names(response):
+    return [skill['name'] for skill in response.get_json()['skills']]
+
+
+def test_replica_pages_are_not_stored(tmp_path):
+    primary_path, replica_path = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = make_app(primary_path, REPLICA_DATABASE_URLS=[f'sqlite:///{replica_path}'],
+                   SQLALCHEMY_BINDS={'replica_0': f'sqlite:///{replica_path}'})
+    add_skill(app, 'Python')
+    with app.app_context():
+        db.session.remove()
+    with sqlite3.connect(primary_path) as source, sqlite3.connect(replica_path) as target:
+        source.backup(target)
+
+    client = app.test_client()
+    try:
+        first, second = client.get('/api/skills'), client.get('/api/skills')
+        assert [first.headers['X-Cache'], second.headers['X-Cache']] == ['BYPASS', 'BYPASS']
+        assert skill_names(second) == ['Python']
+    finally:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
@@ -0,0 +1,44 @@
+import pytest
+
+from pagination import encode_cursor
+
+
+@pytest.fixture
+def matches(make_user, make_listing):
+    teacher = make_user('teacher')
+    # Identical titles score the same, so the id tie-break has to carry across pages
+    titles = ['Python', 'Python', 'Python', 'Advanced Python for data work', 'Python']
+    return [make_listing(teacher, title) for title in titles]
+
+
+def ids(body):
+    return [listing['id'] for listing in body['listings']]
+
+
+def test_search_pages_follow_next_cursor(client, matches):
+    everything = client.get('/api/listings/search?q=python&fields=id').get_json()
+    assert everything['next_cursor'] is None
+    assert sorted(ids(everything)) == sorted(matches)
+
+    seen, cursor = [], None
+    while True:
+        query = '/api/listings/search?q=python&fields=id&limit=2' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(query).get_json()
+        assert len(page['listings']) <= 2
+        seen += ids(page)
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == ids(everything)
+
+
+def test_search_without_matches(client, matches):
+    assert client.get('/api/listings/search?q=haskell').get_json() == {'listings': [], 'next_cursor': None}
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', encode_cursor([1.5]), encode_cursor(['best', 1]), encode_cursor([1.5, 'x'])])
+def test_search_bad_cursor(client, matches, cursor):
+    response = client.get(f'/api/listings/search?q=python&cursor={cursor}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
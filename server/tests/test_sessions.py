@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def booked(make_user, make_listing, make_session):
+    teacher, student = make_user('teacher'), make_user('student')
+    listing = make_listing(teacher)
+    sessions = {
+        'past': make_session(student, teacher, listing, -timedelta(days=400), status='completed'),
+        'soon': make_session(student, teacher, listing, timedelta(days=3)),
+        'later': make_session(student, teacher, listing, timedelta(days=200)),
+    }
+    return teacher, student, sessions
+
+
+@pytest.mark.parametrize('path', ['/api/sessions', '/api/sessions/my-sessions'])
+def test_session_list_is_unbounded(client, auth, booked, path):
+    _, student, sessions = booked
+    body = client.get(path, headers=auth(student)).get_json()
+    assert sorted(session['id'] for session in body['sessions']) == sorted(sessions.values())
+    assert body['next_cursor'] is None
+
+
+@pytest.mark.parametrize('path', ['/api/sessions', '/api/sessions/my-sessions'])
+def test_session_list_pages(client, auth, booked, path):
+    _, student, sessions = booked
+    first = client.get(f'{path}?limit=2', headers=auth(student)).get_json()
+    rest = client.get(f"{path}?limit=2&cursor={first['next_cursor']}", headers=auth(student)).get_json()
+    ids = [session['id'] for session in first['sessions'] + rest['sessions']]
+    assert sorted(ids) == sorted(sessions.values())
+    assert rest['next_cursor'] is None
+
+
+def test_calendar_is_windowed(client, auth, booked):
+    teacher, student, sessions = booked
+    body = client.get('/api/sessions/calendar', headers=auth(student)).get_json()
+    assert [session['id'] for session in body['sessions']] == [sessions['soon']]
+
+    body = client.get('/api/sessions/calendar?role=student', headers=auth(teacher)).get_json()
+    assert body['sessions'] == []
+
+
+def test_calendar_rejects_oversized_window(client, auth, booked):
+    _, student, _ = booked
+    response = client.get('/api/sessions/calendar?from=2025-01-01&to=2027-01-01', headers=auth(student))
+    assert response.status_code == 400
@@ -0,0 +1,43 @@
+from database import db
+from models import UserSkill
+
+
+def stored_years(app, user_id, skill_id):
+    with app.app_context():
+        return db.session.query(UserSkill.years_experience).filter_by(user_id=user_id, skill_id=skill_id).scalar()
+
+
+def test_partial_update_keeps_years_experience(app, client, make_user, auth, skill):
+    user = make_user('learner')
+    headers = auth(user)
+
+    response = client.post('/api/users/me/skills/batch', headers=headers, json=[
+        {'skill_id': skill, 'proficiency_level': 'beginner', 'years_experience': 2}
+    ])
+    assert response.status_code == 201
+    assert stored_years(app, user, skill) == 2
+
+    # Only the level changes; the stored years stay
+    response = client.post('/api/users/me/skills/batch', headers=headers, json=[
+        {'skill_id': skill, 'proficiency_level': 'intermediate'}
+    ])
+    assert response.status_code == 200
+    assert stored_years(app, user, skill) == 2
+
+    # An explicit null still clears them
+    client.post('/api/users/me/skills/batch', headers=headers, json=[
+        {'skill_id': skill, 'proficiency_level': 'intermediate', 'years_experience': None}
+    ])
+    assert stored_years(app, user, skill) is None
+
+
+def test_numeric_string_ids(app, client, make_user, auth, skill):
+    user = make_user('learner')
+    response = client.post('/api/users/me/skills/batch', headers=auth(user), json=[
+        {'skill_id': str(skill), 'proficiency_level': 'beginner'},
+        {'skill_id': 'python', 'proficiency_level': 'beginner'},
+    ])
+    results = response.get_json()['results']
+    assert response.status_code == 207
+    assert results[0]['status'] == 201 and results[0]['skill_id'] == skill
+    assert results[1]['status'] == 400
@@ -0,0 +1,76 @@
+import json
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import make_app
+from database import db
+from models import User, Skill, Listing
+
+
+@pytest.fixture
+def listings(make_user, make_listing):
+    teacher = make_user('teacher')
+    start = datetime(2025, 1, 1)
+    return [make_listing(teacher, f'Listing {n}', start + timedelta(hours=n)) for n in range(5)]
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_sends_everything_by_default(client, listings):
+    body = client.get('/api/listings?stream=json&fields=id').get_json()
+    assert sorted(listing['id'] for listing in body['listings']) == sorted(listings)
+    assert body['next_cursor'] is None
+
+
+def test_stream_honours_limit_and_resumes(client, listings):
+    paged = [listing['id'] for listing in client.get('/api/listings?fields=id').get_json()['listings']]
+
+    first = client.get('/api/listings?stream=json&fields=id&limit=3').get_json()
+    assert [listing['id'] for listing in first['listings']] == paged[:3]
+    rest = client.get(f"/api/listings?stream=json&fields=id&limit=3&cursor={first['next_cursor']}").get_json()
+    assert [listing['id'] for listing in rest['listings']] == paged[3:]
+    assert rest['next_cursor'] is None
+
+
+def test_ndjson_ends_with_cursor_only_when_cut_short(client, listings):
+    lines = ndjson(client.get('/api/listings?stream=ndjson&fields=id&limit=4'))
+    assert len(lines) == 5
+    assert list(lines[-1]) == ['next_cursor']
+
+    lines = ndjson(client.get('/api/listings?stream=ndjson&fields=id&limit=5'))
+    assert [list(line) for line in lines] == [['id']] * 5
+
+
+def test_stream_cap_applies_to_rows(tmp_path):
+    app = make_app(tmp_path / 'capped.db', STREAM_MAX_ROWS=2)
+    with app.app_context():
+        teacher = User(username='teacher', email='teacher@example.com', password_hash='x')
+        skill = Skill(name='Python', category='Programming')
+        db.session.add_all([teacher, skill])
+        db.session.flush()
+        db.session.add_all([Listing(title=f'Listing {n}', description='', price_per_hour=10.0,
+                                    user_id=teacher.id, skill_id=skill.id) for n in range(3)])
+        db.session.commit()
+
+    body = app.test_client().get('/api/listings?stream=json&fields=id&limit=50').get_json()
+    assert len(body['listings']) == 2
+    assert body['next_cursor'] is not None
+    assert app.test_client().get('/api/listings?stream=json&limit=0').status_code == 400
+
+
+def test_instrumentation_counts_streamed_queries(tmp_path, caplog):
+    app = make_app(tmp_path / 'instrumented.db', SQL_INSTRUMENTATION_ENABLED=True)
+    client = app.test_client()
+    with caplog.at_level(logging.INFO, logger=app.logger.name):
+        response = client.get('/api/reviews?stream=ndjson')
+        assert '0 queries before streaming' in response.headers['Server-Timing']
+        response.get_data()
+        response.close()
+
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.getMessage().startswith('{"event": "sql_stats"')]
+    assert [record['path'] for record in records] == ['/api/reviews']
+    assert records[0]['queries'] >= 1